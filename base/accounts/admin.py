@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import CustomUser
+from .models import CustomUser, OutboxMessage
 
 
 @admin.register(CustomUser)
@@ -16,3 +16,10 @@ class ProductAdmin(admin.ModelAdmin):
     ]
 
     list_filter = ["role", "is_active"]
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ["task", "date_created", "date_dispatched", "attempts", "last_error"]
+    list_filter = ["task"]
+    search_fields = ["dedup_key"]
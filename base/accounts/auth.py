@@ -1,6 +1,22 @@
+import functools
+
+from base.identity import remember_user
 from django.contrib.auth.decorators import user_passes_test
 
 
+def remembering_user(view_func):
+    """
+    Registers the user of the request in its identity map before the view runs, see base/identity.py.
+    """
+
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        remember_user(request)
+        return view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
 def company_required(view_func):
     """
     This function is a decorator that requires a user to have the role of 'company' to access a particular view.
@@ -13,7 +29,7 @@ def company_required(view_func):
     """
     decorated_view_func = user_passes_test(
         lambda user: user.role == "company", login_url="accounts:login"
-    )(view_func)
+    )(remembering_user(view_func))
     return decorated_view_func
 
 
@@ -29,5 +45,5 @@ def user_required(view_func):
     """
     decorated_view_func = user_passes_test(
         lambda user: user.role == "user", login_url="accounts:login"
-    )(view_func)
+    )(remembering_user(view_func))
     return decorated_view_func
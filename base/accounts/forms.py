@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import AuthenticationForm
 
+from . import outbox
 from .models import CustomUser
 from .tasks import send_email_task
 
@@ -41,12 +42,15 @@ class CustomUserForm(forms.ModelForm):
             raise forms.ValidationError("Email already exists")
         return email
 
-    def send_email(self, message):
+    def send_email(self, user, message):
         """
         A method that sends an activation email to the user's provided email address, using an asynchronous task.
+        The task is written to the outbox, in the transaction that creates the user.
         """
-        send_email_task.delay(
-            self.cleaned_data["email"], subject="Activate your account", message=message
+        outbox.enqueue(
+            send_email_task,
+            (self.cleaned_data["email"], "Activate your account", message),
+            dedup_key=f"activation:{user.pk}",
         )
 
 
@@ -0,0 +1,219 @@
+"""
+Password hashers whose cost is calibrated to the host.
+
+The calibrate_hashers command benchmarks every available hasher and writes the parameters that take about
+PASSWORD_HASHING_TARGET_MS to the JSON file at PASSWORD_HASHER_PARAMETERS. The hashers below read their cost
+from that file, falling back to Django's defaults, which are also the lowest parameters ever calibrated. A stored
+hash with weaker parameters is reported by must_update(), so Django rehashes it with the calibrated ones on the
+next successful login. A stronger one is kept, a slower calibration never downgrades stored hashes.
+"""
+import functools
+import hashlib
+import json
+import time
+
+from base.metrics import Histogram
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    must_update_salt,
+)
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+PASSWORD_HASHING_TIME = Histogram(
+    "password_hashing_seconds",
+    "Time spent hashing a password, by algorithm and operation (encode, verify).",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def load_parameters() -> dict:
+    """
+    Returns the calibrated parameters keyed by algorithm, empty if the hashers were never calibrated.
+    """
+    try:
+        with open(settings.PASSWORD_HASHER_PARAMETERS) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+@receiver(setting_changed)
+def clear_parameters(setting, **kwargs):
+    if setting == "PASSWORD_HASHER_PARAMETERS":
+        load_parameters.cache_clear()
+
+
+def get_parameter(algorithm, name, default):
+    return load_parameters().get(algorithm, {}).get(name, default)
+
+
+class TimedHasherMixin:
+    """
+    Records the time a password hasher spends hashing.
+    """
+
+    def encode(self, password, salt, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().encode(password, salt, *args, **kwargs)
+        finally:
+            PASSWORD_HASHING_TIME.observe(
+                time.perf_counter() - start,
+                algorithm=self.algorithm,
+                operation="encode",
+            )
+
+    def verify(self, password, encoded):
+        start = time.perf_counter()
+        try:
+            return super().verify(password, encoded)
+        finally:
+            PASSWORD_HASHING_TIME.observe(
+                time.perf_counter() - start,
+                algorithm=self.algorithm,
+                operation="verify",
+            )
+
+
+class CalibratedPBKDF2PasswordHasher(TimedHasherMixin, PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return get_parameter(self.algorithm, "iterations", super().iterations)
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return decoded["iterations"] < self.iterations or must_update_salt(
+            decoded["salt"], self.salt_entropy
+        )
+
+
+class CalibratedScryptPasswordHasher(TimedHasherMixin, ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return get_parameter(self.algorithm, "work_factor", super().work_factor)
+
+    @property
+    def maxmem(self):
+        # OpenSSL limits scrypt to 32 MiB by default, which work factors above 2**14 exceed.
+        return 2 * 128 * self.work_factor * self.block_size * self.parallelism
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (
+            decoded["work_factor"] < self.work_factor
+            or decoded["block_size"] != self.block_size
+            or decoded["parallelism"] != self.parallelism
+        )
+
+
+class CalibratedArgon2PasswordHasher(TimedHasherMixin, Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return get_parameter(self.algorithm, "time_cost", super().time_cost)
+
+    @property
+    def memory_cost(self):
+        return get_parameter(self.algorithm, "memory_cost", super().memory_cost)
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        current, new = decoded["params"], self.params()
+        return (
+            current.time_cost < new.time_cost
+            or current.memory_cost < new.memory_cost
+            or (current.type, current.version, current.parallelism, current.hash_len)
+            != (new.type, new.version, new.parallelism, new.hash_len)
+            or must_update_salt(decoded["salt"], self.salt_entropy)
+        )
+
+
+PROBE_PASSWORD = "calibration password"
+# Parameters never calibrated below, however slow the host is: Django's defaults.
+MINIMUM_PARAMETERS = {
+    "pbkdf2_sha256": {"iterations": PBKDF2PasswordHasher.iterations},
+    "scrypt": {"work_factor": ScryptPasswordHasher.work_factor},
+    "argon2": {
+        "time_cost": Argon2PasswordHasher.time_cost,
+        "memory_cost": Argon2PasswordHasher.memory_cost,
+    },
+}
+
+
+def measure(hasher_class, rounds=3, **parameters) -> float:
+    """
+    Returns the median number of seconds the hasher takes to hash a password with the given parameters.
+    """
+    hasher = type("ProbeHasher", (hasher_class,), parameters)()
+    salt = hasher.salt()
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hasher.encode(PROBE_PASSWORD, salt)
+        durations.append(time.perf_counter() - start)
+    return sorted(durations)[len(durations) // 2]
+
+
+def _calibrate_pbkdf2(target, rounds) -> dict:
+    # The time grows linearly with the iterations, one probe estimates them and a second corrects the estimate.
+    iterations = 100_000
+    for _ in range(2):
+        duration = measure(
+            CalibratedPBKDF2PasswordHasher, rounds, iterations=iterations
+        )
+        iterations = int(iterations * target / duration)
+    return {"iterations": round(iterations, -4)}
+
+
+def _calibrate_scrypt(target, rounds) -> dict:
+    # The work factor must be a power of two, it is doubled while the next one still fits the target.
+    work_factor = 2**14
+    while work_factor < 2**22:
+        duration = measure(
+            CalibratedScryptPasswordHasher, rounds, work_factor=work_factor * 2
+        )
+        if duration > target:
+            break
+        work_factor *= 2
+    return {"work_factor": work_factor}
+
+
+def _calibrate_argon2(target, rounds) -> dict:
+    # The memory cost stays at Django's default, the passes over it are scaled to the target.
+    duration = measure(CalibratedArgon2PasswordHasher, rounds, time_cost=1)
+    return {"time_cost": int(target / duration)}
+
+
+def _argon2_available() -> bool:
+    try:
+        Argon2PasswordHasher()._load_library()
+    except ValueError:
+        return False
+    return True
+
+
+CALIBRATIONS = {
+    "pbkdf2_sha256": (_calibrate_pbkdf2, lambda: True),
+    "scrypt": (_calibrate_scrypt, lambda: hasattr(hashlib, "scrypt")),
+    "argon2": (_calibrate_argon2, _argon2_available),
+}
+
+
+def available_algorithms() -> list:
+    return [name for name, (_, available) in CALIBRATIONS.items() if available()]
+
+
+def calibrate(algorithm, target_ms, rounds=3) -> dict:
+    """
+    Returns the parameters with which the algorithm takes about target_ms milliseconds on this host,
+    but not less than MINIMUM_PARAMETERS.
+    """
+    calibrate_algorithm, _ = CALIBRATIONS[algorithm]
+    parameters = calibrate_algorithm(target_ms / 1000, rounds)
+    minimum = MINIMUM_PARAMETERS[algorithm]
+    return {
+        name: max(value, minimum.get(name, value)) for name, value in parameters.items()
+    }
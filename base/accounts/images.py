@@ -0,0 +1,61 @@
+"""
+Resized variants of the images uploaded by users, such as company logos.
+
+Listing pages show logos in a 250x120 box, so they get variants of that size (and twice that size for high
+density screens) instead of the original upload.
+"""
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+LOGO_SIZE = (250, 120)
+DENSITIES = (1, 2)
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+    "jpeg": {"format": "JPEG", "quality": 85, "optimize": True, "progressive": True},
+}
+
+
+def _encode(image: Image.Image, extension: str) -> bytes:
+    options = FORMATS[extension]
+    if options["format"] == "JPEG" and image.mode != "RGB":
+        # JPEG has no alpha channel, transparent logos are put on a white background.
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    output = io.BytesIO()
+    image.save(output, **options)
+    return output.getvalue()
+
+
+def generate_variants(storage, name, size=LOGO_SIZE) -> dict:
+    """
+    Generates the variants of the image stored under name, fitted into size at every density and encoded in
+    every format, and saves them to the same storage.
+    Returns the names of the variants, e.g. {"source": name, "width": 250, "height": 120,
+    "variants": {"1x": {"webp": ..., "jpeg": ...}, "2x": {...}}}.
+    """
+    with storage.open(name) as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA")
+
+    stem = posixpath.splitext(posixpath.basename(name))[0]
+    directory = posixpath.join(posixpath.dirname(name), "variants")
+    variants = {}
+    for density in DENSITIES:
+        box = (size[0] * density, size[1] * density)
+        resized = image.copy()
+        resized.thumbnail(box, Image.Resampling.LANCZOS)
+        # Variants are encoded without the EXIF data, ICC profile and comments of the upload.
+        resized.info.clear()
+        variants[f"{density}x"] = {
+            extension: storage.save(
+                posixpath.join(directory, f"{stem}-{box[0]}x{box[1]}.{extension}"),
+                ContentFile(_encode(resized, extension)),
+            )
+            for extension in FORMATS
+        }
+    return {"source": name, "width": size[0], "height": size[1], "variants": variants}
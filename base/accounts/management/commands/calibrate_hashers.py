@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import hashers
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks the available password hashers on this host and writes the parameters that take about the
+    target time to PASSWORD_HASHER_PARAMETERS. Stored hashes are upgraded to them on the next login.
+    Run it on the hardware the web workers run on, and again after moving to different hardware.
+    """
+
+    help = "Calibrates the cost of the password hashers to the host."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target-ms",
+            type=int,
+            default=settings.PASSWORD_HASHING_TARGET_MS,
+            help="The number of milliseconds hashing one password should take.",
+        )
+        parser.add_argument(
+            "--algorithm",
+            action="append",
+            dest="algorithms",
+            choices=sorted(hashers.CALIBRATIONS),
+            help="Calibrate only this algorithm, can be given several times.",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=3,
+            help="The number of hashes the median time of every probe is taken from.",
+        )
+        parser.add_argument(
+            "--output",
+            default=settings.PASSWORD_HASHER_PARAMETERS,
+            help="The file the parameters are written to.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the parameters without writing them.",
+        )
+
+    def handle(self, *args, **options):
+        available = hashers.available_algorithms()
+        algorithms = options["algorithms"] or available
+        missing = sorted(set(algorithms) - set(available))
+        if missing:
+            raise CommandError(
+                f"Hashers not available on this host: {', '.join(missing)}."
+            )
+
+        try:
+            with open(options["output"]) as file:
+                parameters = json.load(file)
+        except FileNotFoundError:
+            parameters = {}
+
+        for algorithm in algorithms:
+            parameters[algorithm] = hashers.calibrate(
+                algorithm, options["target_ms"], options["rounds"]
+            )
+            self.stdout.write(f"{algorithm}: {parameters[algorithm]}")
+
+        if options["dry_run"]:
+            return
+        directory = os.path.dirname(os.path.abspath(options["output"]))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(parameters, file, indent=4, sort_keys=True)
+        os.replace(tmp_path, options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote the hasher parameters to {options['output']}.")
+        )
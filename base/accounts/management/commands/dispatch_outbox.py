@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts import outbox
+
+PURGE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    """
+    Publishes the tasks written to the outbox to Celery, batch by batch, and reports the outbox lag.
+    Runs until stopped, or until the outbox is drained with --once.
+    """
+
+    help = "Publishes pending outbox messages to Celery."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the outbox and exit instead of polling for new messages.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help="The number of messages published in one transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.OUTBOX_POLL_INTERVAL,
+            help="The number of seconds to sleep when the outbox is drained.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        total = 0
+        last_purge = None
+        while True:
+            dispatched = outbox.dispatch_batch(batch_size)
+            total += dispatched
+            outbox.report_lag()
+            if dispatched == batch_size:
+                continue
+            if options["once"]:
+                break
+            if last_purge is None or time.monotonic() - last_purge > PURGE_INTERVAL:
+                outbox.purge_dispatched()
+                last_purge = time.monotonic()
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Published {total} outbox messages."))
@@ -14,6 +14,8 @@ class CustomUser(AbstractUser):
         phone_number: A PhoneNumberField containing the phone number of the user.
         description: A CharField containing a description of the user.
         image: An ImageField containing an image of the user.
+        image_variants: A JSONField containing the names of the resized variants of the image, generated in the
+        background by generate_image_variants_task, empty until they exist.
     """
 
     ROLE = (("company", "company"), ("user", "user"))
@@ -24,6 +26,7 @@ class CustomUser(AbstractUser):
     phone_number = PhoneNumberField(null=True, blank=True, unique=True)
     description = models.CharField(max_length=500, null=True, blank=True)
     image = models.ImageField(upload_to="images", null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True)
 
     def save(self, *args, **kwargs):
         """
@@ -35,3 +38,49 @@ class CustomUser(AbstractUser):
             self.last_name = None
 
         super().save(*args, **kwargs)
+
+
+class OutboxMessage(models.Model):
+    """
+    A Celery task to be published, written in the same transaction as the rows it is about, so a task is never
+    published for a rolled-back row nor lost when the broker is unreachable. The dispatch_outbox command
+    publishes pending messages in batches (see accounts/outbox.py).
+    Attributes:
+        - task (str): The name of the Celery task.
+        - args (list): The positional arguments of the task.
+        - kwargs (dict): The keyword arguments of the task.
+        - options (dict): The options the task is published with, such as the queue.
+        - dedup_key (str, optional): A key of the message, a second message with the same key is not written.
+        - date_created (datetime.datetime): The date and time the message was written.
+        - date_dispatched (datetime.datetime, optional): The date and time the message was published.
+        - attempts (int): The number of failed attempts to publish the message.
+        - last_error (str): The error of the last failed attempt.
+    """
+
+    task = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    options = models.JSONField(default=dict)
+    dedup_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_dispatched = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.CharField(max_length=255, blank=True)
+
+    @property
+    def task_id(self) -> str:
+        """
+        The id the task is published with, the same for every delivery of the message.
+        """
+        return f"outbox-{self.pk}"
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [
+            models.Index(fields=["date_dispatched", "id"], name="outbox_pending_idx"),
+        ]
+        verbose_name = "Outbox message"
+        verbose_name_plural = "Outbox messages"
+
+    def __str__(self):
+        return f"{self.task} {self.task_id}"
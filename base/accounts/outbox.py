@@ -0,0 +1,147 @@
+"""
+A transactional outbox of Celery tasks.
+
+Views write the tasks they want to run as OutboxMessage rows in the same transaction as their own changes,
+instead of publishing them to the broker during the request. The dispatch_outbox command drains pending
+messages in batches. Messages are delivered at least once: a dispatcher that dies after publishing but
+before committing publishes the batch again. Every delivery of a message carries the same task id, so
+tasks with side effects, such as sending an email, skip deliveries that already ran.
+"""
+import logging
+from datetime import timedelta
+
+from base.metrics import Counter, Gauge
+from celery import current_app
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DISPATCHED = Counter(
+    "outbox_dispatched", "Outbox messages published to the broker, by task."
+)
+OUTBOX_FAILURES = Counter(
+    "outbox_failures", "Failed attempts to publish outbox messages, by task."
+)
+OUTBOX_PENDING = Gauge(
+    "outbox_pending", "Outbox messages not published yet.", multiprocess_mode="max"
+)
+OUTBOX_LAG = Gauge(
+    "outbox_lag_seconds",
+    "Age of the oldest outbox message not published yet.",
+    multiprocess_mode="max",
+)
+
+
+def enqueue(task, args=(), kwargs=None, dedup_key=None, **options):
+    """
+    Writes a task to the outbox, to be published once the current transaction commits.
+    A message with the dedup_key of an existing message is not written, in which case None is returned.
+    Usage:
+        with transaction.atomic():
+            user.save()
+            outbox.enqueue(send_email_task, (user.email, subject, message), dedup_key=f"activation:{user.pk}")
+    """
+    message = OutboxMessage(
+        task=getattr(task, "name", task),
+        args=list(args),
+        kwargs=kwargs or {},
+        options=options,
+        dedup_key=dedup_key,
+    )
+    try:
+        with transaction.atomic():
+            message.save()
+    except IntegrityError:
+        if dedup_key is None:
+            raise
+        return None
+    return message
+
+
+def dispatch_batch(batch_size) -> int:
+    """
+    Publishes up to batch_size pending messages in the order they were written and marks them dispatched.
+    Rows are locked with SKIP LOCKED, so several dispatchers can run side by side. Publishing stops at the
+    first failure, the failed message is retried by the next batch.
+    Returns the number of messages published.
+    """
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True).filter(
+                date_dispatched=None
+            )[:batch_size]
+        )
+        dispatched = []
+        for message in messages:
+            try:
+                current_app.send_task(
+                    message.task,
+                    args=message.args,
+                    kwargs=message.kwargs,
+                    task_id=message.task_id,
+                    **message.options,
+                )
+            except Exception as error:
+                logger.warning(
+                    "Publishing outbox message %s failed.", message.pk, exc_info=True
+                )
+                OUTBOX_FAILURES.inc(task=message.task)
+                message.attempts += 1
+                message.last_error = f"{type(error).__name__}: {error}"[:255]
+                message.save(update_fields=["attempts", "last_error"])
+                break
+            OUTBOX_DISPATCHED.inc(task=message.task)
+            dispatched.append(message.pk)
+        OutboxMessage.objects.filter(pk__in=dispatched).update(
+            date_dispatched=timezone.now()
+        )
+    return len(dispatched)
+
+
+def report_lag():
+    """
+    Sets the outbox metrics from the pending messages and returns the lag in seconds.
+    """
+    pending = OutboxMessage.objects.filter(date_dispatched=None).aggregate(
+        count=Count("id"), oldest=Min("date_created")
+    )
+    oldest = pending["oldest"]
+    lag = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+    OUTBOX_LAG.set(lag)
+    OUTBOX_PENDING.set(pending["count"])
+    return lag
+
+
+def purge_dispatched() -> int:
+    """
+    Deletes the messages dispatched more than OUTBOX_RETENTION seconds ago. Their dedup keys are free again.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.OUTBOX_RETENTION)
+    deleted, _ = OutboxMessage.objects.filter(date_dispatched__lt=cutoff).delete()
+    return deleted
+
+
+def _delivered_key(task_id) -> str:
+    return f"outbox:delivered:{task_id}"
+
+
+def was_delivered(task_id) -> bool:
+    """
+    Returns True if a task published from the outbox with this id already ran to completion.
+    """
+    if not task_id:
+        return False
+    return bool(caches[settings.OUTBOX_CACHE].get(_delivered_key(task_id)))
+
+
+def mark_delivered(task_id):
+    if task_id:
+        caches[settings.OUTBOX_CACHE].set(
+            _delivered_key(task_id), True, settings.OUTBOX_RETENTION
+        )
@@ -0,0 +1,44 @@
+"""
+Deletion of expired sessions in small batches.
+
+clearsessions deletes every expired session in one statement, which holds locks on django_session for as long
+as it runs. Here every batch is a short statement by primary key, and the deletion pauses between batches,
+so logins and session writes are never blocked for long.
+"""
+import time
+
+from base.metrics import Counter
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+SESSIONS_DELETED = Counter("sessions_deleted", "Expired sessions deleted.")
+
+
+def delete_expired_sessions(batch_size=None, pause=None, time_limit=None) -> int:
+    """
+    Deletes expired sessions batch by batch until none are left or time_limit seconds have passed.
+    The defaults come from the SESSION_CLEANUP_* settings.
+    Returns the number of sessions deleted.
+    """
+    batch_size = batch_size or settings.SESSION_CLEANUP_BATCH_SIZE
+    pause = settings.SESSION_CLEANUP_PAUSE if pause is None else pause
+    time_limit = time_limit or settings.SESSION_CLEANUP_TIME_LIMIT
+    deadline = time.monotonic() + time_limit
+    now = timezone.now()
+    deleted = 0
+    while True:
+        keys = list(
+            Session.objects.filter(expire_date__lt=now).values_list(
+                "session_key", flat=True
+            )[:batch_size]
+        )
+        if keys:
+            count, _ = Session.objects.filter(
+                session_key__in=keys, expire_date__lt=now
+            ).delete()
+            deleted += count
+            SESSIONS_DELETED.inc(count)
+        if len(keys) < batch_size or time.monotonic() >= deadline:
+            return deleted
+        time.sleep(pause)
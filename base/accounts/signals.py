@@ -0,0 +1,34 @@
+from base.enqueue import enqueue
+from django.db import transaction
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from .models import CustomUser
+from .tasks import generate_image_variants_task
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_image(sender, instance, **kwargs):
+    """
+    Stores the loaded name of the image, so a save can tell whether a new image was uploaded.
+    """
+    image = instance.__dict__.get("image")
+    instance._loaded_image = getattr(image, "name", image) or None
+
+
+@receiver(post_save, sender=CustomUser)
+def queue_image_variants(sender, instance, raw=False, **kwargs):
+    """
+    Clears the variants of a replaced image and queues the generation of new ones once the upload is committed.
+    """
+    name = instance.image.name or None
+    if raw or name == instance._loaded_image:
+        return
+    instance._loaded_image = name
+    if instance.image_variants:
+        instance.image_variants = {}
+        CustomUser.objects.filter(pk=instance.pk).update(image_variants={})
+    if name:
+        transaction.on_commit(
+            lambda: enqueue(generate_image_variants_task, instance.pk, name)
+        )
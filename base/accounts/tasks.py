@@ -1,15 +1,50 @@
+from base.fairshare import FairShareTask
 from celery import shared_task
 from django.conf import settings
 from django.core.mail import send_mail
 
 
-@shared_task()
-def send_email_task(email, subject, message):
+@shared_task(base=FairShareTask, bind=True)
+def send_email_task(self, email, subject, message, company_id=None):
     """
     A Celery task that sends an email to a specified email address with a given subject and message.
     Parameters:
         email: A string containing the email address to send the email to.
         subject: A string containing the subject of the email.
         message: A string containing the message to be included in the email.
+        company_id: The primary key of the company the email is sent on behalf of, if any.
+            The emails of one company are sent one at a time, see base/fairshare.py.
+    An email published from the outbox more than once is only sent once.
     """
+    from .outbox import mark_delivered, was_delivered
+
+    if was_delivered(self.request.id):
+        return
     send_mail(subject, message, settings.EMAIL_HOST_USER, [email])
+    mark_delivered(self.request.id)
+
+
+@shared_task(acks_late=True)
+def generate_image_variants_task(user_id, name):
+    """
+    A Celery task that generates the resized variants of a user's image and stores their names on the user.
+    Parameters:
+        user_id: The primary key of the user.
+        name: The name of the image the variants are generated for, nothing is stored if it was replaced since.
+    """
+    from .images import generate_variants
+    from .models import CustomUser
+
+    storage = CustomUser._meta.get_field("image").storage
+    variants = generate_variants(storage, name)
+    CustomUser.objects.filter(pk=user_id, image=name).update(image_variants=variants)
+
+
+@shared_task()
+def clear_expired_sessions_task():
+    """
+    A periodic Celery task that deletes expired sessions in small batches, see accounts/sessions.py.
+    """
+    from .sessions import delete_expired_sessions
+
+    delete_expired_sessions()
@@ -0,0 +1,47 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+
+def _srcset(storage, variants, extension) -> list:
+    return [
+        (storage.url(sizes[extension]), density) for density, sizes in variants.items()
+    ]
+
+
+@register.simple_tag
+def responsive_image(user, alt="", css_class="", style=""):
+    """
+    Renders the image of a user as a <picture> with WebP and JPEG srcsets of its resized variants.
+    Falls back to an <img> of the original upload until the variants have been generated.
+    Usage:
+        {% load images %}
+        {% responsive_image object.company alt=object.company.username css_class="mx-auto d-block" %}
+    """
+    image = user.image
+    variants = user.image_variants or {}
+    if variants.get("source") != image.name:
+        return format_html(
+            '<img src="{}" class="{}" style="{}" alt="{}">',
+            image.url,
+            css_class,
+            style,
+            alt,
+        )
+
+    storage = image.storage
+    webp = _srcset(storage, variants["variants"], "webp")
+    jpeg = _srcset(storage, variants["variants"], "jpeg")
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">'
+        '<img src="{}" srcset="{}" width="{}" height="{}" class="{}" style="{}" alt="{}"></picture>',
+        format_html_join(", ", "{} {}", webp),
+        storage.url(variants["variants"]["1x"]["jpeg"]),
+        format_html_join(", ", "{} {}", jpeg),
+        variants["width"],
+        variants["height"],
+        css_class,
+        style,
+        alt,
+    )
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from accounts import hashers
+from accounts.models import CustomUser
+from base import metrics
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+class CalibratedHashersTestCase(TestCase):
+    """
+    Test cases for password hashers calibrated to the host.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "hashers.json")
+        settings = override_settings(PASSWORD_HASHER_PARAMETERS=self.path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def write_parameters(self, parameters) -> None:
+        with open(self.path, "w") as file:
+            json.dump(parameters, file)
+        hashers.load_parameters.cache_clear()
+
+    def test_hasher_uses_the_calibrated_parameters(self) -> None:
+        """
+        Test that new hashes use the calibrated iterations, and Django's defaults before calibration.
+        """
+        hasher = hashers.CalibratedPBKDF2PasswordHasher()
+        self.assertEqual(hasher.iterations, 600_000)
+
+        self.write_parameters({"pbkdf2_sha256": {"iterations": 1000}})
+
+        self.assertTrue(make_password("secret").startswith("pbkdf2_sha256$1000$"))
+
+    def test_login_upgrades_the_stored_hash(self) -> None:
+        """
+        Test that a successful login rehashes a password stored with other parameters and records the time.
+        """
+        self.write_parameters({"pbkdf2_sha256": {"iterations": 1000}})
+        user = CustomUser.objects.create(username="test_user", role="user")
+        user.password = make_password("test123@")
+        user.save()
+        self.write_parameters({"pbkdf2_sha256": {"iterations": 2000}})
+
+        self.assertTrue(self.client.login(username="test_user", password="test123@"))
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
+        self.assertIn(
+            'password_hashing_seconds_count{algorithm="pbkdf2_sha256",operation="verify"}',
+            metrics.REGISTRY.exposition(),
+        )
+
+    def test_calibration_writes_the_parameters_of_the_target_time(self) -> None:
+        """
+        Test that the command scales the iterations to the target time and writes them to the file.
+        """
+
+        def measure(hasher_class, rounds, iterations):
+            # 100 000 iterations take 50 ms on this imaginary host.
+            return iterations / 2_000_000
+
+        with mock.patch("accounts.hashers.measure", side_effect=measure):
+            call_command(
+                "calibrate_hashers",
+                algorithms=["pbkdf2_sha256"],
+                target_ms=400,
+                stdout=mock.Mock(),
+            )
+
+        with open(self.path) as file:
+            self.assertEqual(
+                json.load(file), {"pbkdf2_sha256": {"iterations": 800_000}}
+            )
+
+    def test_stronger_hashes_are_never_downgraded(self) -> None:
+        """
+        Test that calibration never goes below Django's defaults and that stronger stored hashes are kept.
+        """
+        with mock.patch("accounts.hashers.measure", return_value=1.0):
+            self.assertEqual(
+                hashers.calibrate("pbkdf2_sha256", target_ms=100),
+                {"iterations": 600_000},
+            )
+
+        self.write_parameters({"pbkdf2_sha256": {"iterations": 2000}})
+        stronger = make_password("secret")
+        self.write_parameters({"pbkdf2_sha256": {"iterations": 500}})
+        weaker = make_password("secret")
+        self.write_parameters({"pbkdf2_sha256": {"iterations": 1000}})
+        hasher = hashers.CalibratedPBKDF2PasswordHasher()
+
+        self.assertFalse(hasher.must_update(stronger))
+        self.assertTrue(hasher.must_update(weaker))
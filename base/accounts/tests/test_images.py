@@ -0,0 +1,104 @@
+import io
+import tempfile
+from unittest import mock
+
+from accounts.images import generate_variants
+from accounts.models import CustomUser
+from accounts.tasks import generate_image_variants_task
+from base.storage import ContentAddressedStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase
+from PIL import Image
+
+
+def create_logo(size=(1000, 480)) -> bytes:
+    """
+    Returns a JPEG image with EXIF data, like a photo taken with a camera.
+    """
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    output = io.BytesIO()
+    Image.new("RGB", size, "red").save(output, format="JPEG", exif=exif.tobytes())
+    return output.getvalue()
+
+
+class ImageVariantsTestCase(TestCase):
+    """
+    Test cases for the resized variants of user images.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        image_field = CustomUser._meta.get_field("image")
+        original_storage = image_field.storage
+        self.storage = image_field.storage = ContentAddressedStorage(
+            location=directory.name
+        )
+        self.addCleanup(setattr, image_field, "storage", original_storage)
+
+        with mock.patch("accounts.signals.enqueue"):
+            self.company = CustomUser.objects.create(
+                role="company",
+                username="Nokia",
+                email="nokia123@wp.pl",
+                image=SimpleUploadedFile("logo.jpg", create_logo()),
+            )
+
+    def test_variants_are_resized_without_metadata(self) -> None:
+        """
+        Test if a WebP and a JPEG variant is generated for every density, fitted into the logo box.
+        """
+        variants = generate_variants(self.storage, self.company.image.name)
+
+        self.assertEqual(variants["source"], self.company.image.name)
+        expected_sizes = {"1x": (250, 120), "2x": (500, 240)}
+        for density, names in variants["variants"].items():
+            for extension, name in names.items():
+                with self.storage.open(name) as file:
+                    image = Image.open(file)
+                    self.assertEqual(image.size, expected_sizes[density])
+                    self.assertEqual(image.format, extension.upper())
+                    self.assertFalse(image.getexif())
+
+    def test_new_image_queues_variants_after_commit(self) -> None:
+        """
+        Test if uploading a new image clears the old variants and queues the generation of new ones.
+        """
+        CustomUser.objects.filter(pk=self.company.pk).update(
+            image_variants={"source": "old"}
+        )
+        company = CustomUser.objects.get(pk=self.company.pk)
+
+        with mock.patch(
+            "accounts.signals.enqueue"
+        ) as enqueue, self.captureOnCommitCallbacks(execute=True):
+            company.image = SimpleUploadedFile("logo.jpg", create_logo((800, 400)))
+            company.save()
+
+        enqueue.assert_called_once_with(
+            generate_image_variants_task, company.pk, company.image.name
+        )
+        company.refresh_from_db()
+        self.assertEqual(company.image_variants, {})
+
+    def test_template_tag_falls_back_to_the_original(self) -> None:
+        """
+        Test if the template tag renders the original image until its variants exist, and srcsets afterwards.
+        """
+        template = Template(
+            "{% load images %}{% responsive_image company alt='logo' %}"
+        )
+
+        html = template.render(Context({"company": self.company}))
+        self.assertIn(f'src="{self.company.image.url}"', html)
+        self.assertNotIn("srcset", html)
+
+        self.company.image_variants = generate_variants(
+            self.storage, self.company.image.name
+        )
+        html = template.render(Context({"company": self.company}))
+        self.assertIn('<source type="image/webp" srcset="', html)
+        self.assertIn(" 2x", html)
+        self.assertIn('width="250" height="120"', html)
@@ -0,0 +1,138 @@
+from unittest import mock
+
+from accounts import outbox
+from accounts.models import OutboxMessage
+from accounts.tasks import send_email_task
+from dashboard.forms import ReturnApplicationFeedbackForm
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+
+
+class OutboxTestCase(TestCase):
+    """
+    Test cases for publishing tasks through the transactional outbox.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_registration_writes_the_activation_email_to_the_outbox(self) -> None:
+        """
+        Test that registering writes the activation email to the outbox instead of publishing it.
+        """
+        with mock.patch("celery.app.base.Celery.send_task") as send_task:
+            self.client.post(
+                reverse("accounts:register"),
+                {
+                    "username": "new_user",
+                    "email": "new@example.com",
+                    "password": "test123@",
+                    "role": "user",
+                },
+            )
+
+        send_task.assert_not_called()
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.task, send_email_task.name)
+        self.assertEqual(message.args[0], "new@example.com")
+        self.assertIsNone(message.date_dispatched)
+
+    def test_rolled_back_transaction_discards_the_message(self) -> None:
+        """
+        Test that a message written in a transaction that rolls back is never published.
+        """
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            outbox.enqueue(send_email_task, ("user@example.com", "Subject", "Text"))
+            raise RuntimeError
+
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_dedup_key_writes_a_message_once(self) -> None:
+        """
+        Test that a second message with the same dedup key is not written.
+        """
+        first = outbox.enqueue(send_email_task, ("a@example.com",), dedup_key="key")
+        second = outbox.enqueue(send_email_task, ("a@example.com",), dedup_key="key")
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_feedback_email_is_written_with_its_queue_and_company(self) -> None:
+        """
+        Test that feedback emails are written to the outbox for the bulk queue, with the company.
+        """
+        form = ReturnApplicationFeedbackForm(
+            data={"email": "user@example.com", "subject": "Subject", "message": "Text"}
+        )
+        self.assertTrue(form.is_valid())
+
+        form.send_email("user@example.com", company_id=1)
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.args, ["user@example.com", "Subject", "Text"])
+        self.assertEqual(message.kwargs, {"company_id": 1})
+        self.assertEqual(message.options, {"queue": "bulk"})
+
+    def test_dispatcher_publishes_pending_messages_in_order(self) -> None:
+        """
+        Test that the dispatcher publishes every pending message with its id and options, then marks it.
+        """
+        first = outbox.enqueue(send_email_task, ("a@example.com",), queue="bulk")
+        second = outbox.enqueue(send_email_task, ("b@example.com",))
+
+        with mock.patch("celery.app.base.Celery.send_task") as send_task:
+            call_command("dispatch_outbox", once=True, batch_size=1, stdout=mock.Mock())
+
+        self.assertEqual(
+            send_task.call_args_list,
+            [
+                mock.call(
+                    send_email_task.name,
+                    args=["a@example.com"],
+                    kwargs={},
+                    task_id=first.task_id,
+                    queue="bulk",
+                ),
+                mock.call(
+                    send_email_task.name,
+                    args=["b@example.com"],
+                    kwargs={},
+                    task_id=second.task_id,
+                ),
+            ],
+        )
+        self.assertFalse(OutboxMessage.objects.filter(date_dispatched=None).exists())
+        self.assertEqual(outbox.report_lag(), 0.0)
+
+    def test_failed_publish_is_retried_by_the_next_batch(self) -> None:
+        """
+        Test that a message stays pending with its error while the broker is unreachable.
+        """
+        message = outbox.enqueue(send_email_task, ("a@example.com",))
+
+        with mock.patch(
+            "celery.app.base.Celery.send_task", side_effect=ConnectionError("down")
+        ), self.assertLogs("accounts.outbox", "WARNING"):
+            self.assertEqual(outbox.dispatch_batch(10), 0)
+
+        message.refresh_from_db()
+        self.assertIsNone(message.date_dispatched)
+        self.assertEqual(message.attempts, 1)
+        self.assertEqual(message.last_error, "ConnectionError: down")
+        self.assertGreater(outbox.report_lag(), 0.0)
+
+    def test_redelivered_email_is_sent_once(self) -> None:
+        """
+        Test that an email published twice with the same task id is only sent once.
+        """
+        for _ in range(2):
+            send_email_task.apply(
+                ("user@example.com", "Subject", "Text"), task_id="outbox-1"
+            )
+
+        self.assertEqual(len(mail.outbox), 1)
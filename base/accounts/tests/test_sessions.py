@@ -0,0 +1,60 @@
+import itertools
+from datetime import timedelta
+from unittest import mock
+
+from accounts.sessions import delete_expired_sessions
+from django.contrib.sessions.models import Session
+from django.test import TestCase
+from django.utils import timezone
+
+
+class ExpiredSessionsTestCase(TestCase):
+    """
+    Test cases for deleting expired sessions in batches.
+    """
+
+    def setUp(self) -> None:
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [
+                Session(
+                    session_key=f"expired{number}",
+                    session_data="",
+                    expire_date=now - timedelta(days=1),
+                )
+                for number in range(5)
+            ]
+            + [
+                Session(
+                    session_key="active",
+                    session_data="",
+                    expire_date=now + timedelta(days=1),
+                )
+            ]
+        )
+
+    def test_expired_sessions_are_deleted_in_batches(self) -> None:
+        """
+        Test that every expired session is deleted, batch by batch with a pause in between, and others are kept.
+        """
+        with mock.patch("accounts.sessions.time.sleep") as sleep:
+            deleted = delete_expired_sessions(batch_size=2, pause=0.5)
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(
+            list(Session.objects.values_list("session_key", flat=True)), ["active"]
+        )
+
+    def test_deletion_stops_at_the_time_limit(self) -> None:
+        """
+        Test that a run stops after the time limit and leaves the remaining sessions to the next run.
+        """
+        with mock.patch(
+            "accounts.sessions.time.monotonic",
+            side_effect=itertools.chain([0.0], itertools.repeat(10.0)),
+        ), mock.patch("accounts.sessions.time.sleep"):
+            deleted = delete_expired_sessions(batch_size=2, time_limit=5)
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(Session.objects.count(), 4)
@@ -3,6 +3,7 @@ from django import views
 from django.contrib.auth import login, logout
 from django.contrib.auth.views import LogoutView
 from django.contrib.sites.shortcuts import get_current_site
+from django.db import transaction
 from django.http import HttpResponse, HttpRequest
 from django.shortcuts import render, redirect
 from django.template.loader import render_to_string
@@ -13,7 +14,7 @@ from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.views.generic import UpdateView, TemplateView
 from django.views.generic.edit import FormView
 from dotenv import load_dotenv
-from offers.models import CustomUser
+from offers.models import CustomUser, OfferRecommendation
 
 from .auth import user_required
 from .forms import CustomUserForm, LoginForm, ChangePasswordForm
@@ -45,18 +46,20 @@ class RegisterUserView(FormView):
         user = form.save(commit=False)
         user.is_active = False
         user.set_password(form.cleaned_data["password"])
-        user.save()
-        form.send_email(
-            message=render_to_string(
-                "auth/acc_active_email.html",
-                {
-                    "user": user,
-                    "domain": get_current_site(self.request),
-                    "uid": urlsafe_base64_encode(force_bytes(user.pk)),
-                    "token": account_activation_token.make_token(user),
-                },
+        with transaction.atomic():
+            user.save()
+            form.send_email(
+                user,
+                message=render_to_string(
+                    "auth/acc_active_email.html",
+                    {
+                        "user": user,
+                        "domain": get_current_site(self.request),
+                        "uid": urlsafe_base64_encode(force_bytes(user.pk)),
+                        "token": account_activation_token.make_token(user),
+                    },
+                ),
             )
-        )
         return super().form_valid(form)
 
 
@@ -220,11 +223,18 @@ class UserProfileView(views.View):
     def get(self, request, *args, **kwargs):
         """
         Retrieves the user's email from the logged-in user's request, filters the applications that
-        belong to that user, and returns a rendered user profile template with the retrieved data.
+        belong to that user and reads the offers recommended to them, and returns a rendered user profile
+        template with the retrieved data.
         """
         user_id = request.user.email
         applications = Application.objects.filter(email=user_id)
+        # Precomputed from the applications in batch, see offers/recommender.py.
+        recommendations = (
+            OfferRecommendation.objects.filter(user=request.user)
+            .select_related("offer__company", "offer__localization")
+            .order_by("rank")
+        )
 
-        context = {"applications": applications}
+        context = {"applications": applications, "recommendations": recommendations}
 
         return render(request, "profile/user_profile.html", context=context)
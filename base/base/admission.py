@@ -0,0 +1,155 @@
+"""
+Admission control: load shedding with a stale-content fallback.
+
+Every process tracks its in-flight requests and a time-decayed average of recent query latency. While either is
+over its threshold the process is overloaded, and AdmissionControlMiddleware:
+    - serves anonymous GETs of public pages from the last known good rendering, without running the view,
+    - rejects low-priority requests with a 503 before they reach the database,
+    - admits everything else, in particular authenticated writes.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from .metrics import Counter, Gauge
+
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions",
+    "Admission decisions, by URL name and decision (admitted, stale, rejected).",
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Requests in flight per process.", multiprocess_mode="max"
+)
+ADMISSION_DB_LATENCY = Gauge(
+    "admission_db_latency_seconds",
+    "Decayed average query latency per process.",
+    multiprocess_mode="max",
+)
+
+# Seconds after which an old latency sample has lost about two thirds of its weight.
+LATENCY_DECAY = 5.0
+LATENCY_SMOOTHING = 0.2
+
+
+class LoadTracker:
+    """
+    The load of the current process: the number of requests in flight and the recent query latency.
+    The latency decays while no queries run, so a process that sheds everything recovers on its own.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.latency = 0.0
+        self.updated = time.monotonic()
+
+    def _decayed(self, now) -> float:
+        # A clock read before the last update, e.g. from another clock in tests, counts as no time passed.
+        elapsed = max(0.0, now - self.updated)
+        return self.latency * math.exp(-elapsed / LATENCY_DECAY)
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+            ADMISSION_IN_FLIGHT.set(self.in_flight)
+
+    def exit(self):
+        with self.lock:
+            self.in_flight -= 1
+            ADMISSION_IN_FLIGHT.set(self.in_flight)
+
+    def observe_query(self, duration):
+        with self.lock:
+            now = time.monotonic()
+            latency = self._decayed(now)
+            self.latency = latency + LATENCY_SMOOTHING * (duration - latency)
+            self.updated = now
+
+    def db_latency(self) -> float:
+        with self.lock:
+            return self._decayed(time.monotonic())
+
+    def overloaded(self) -> bool:
+        latency = self.db_latency()
+        ADMISSION_DB_LATENCY.set(latency)
+        return (
+            self.in_flight > settings.ADMISSION_MAX_IN_FLIGHT
+            or latency > settings.ADMISSION_DB_LATENCY_THRESHOLD
+        )
+
+    def query_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.observe_query(time.perf_counter() - start)
+
+
+tracker = LoadTracker()
+
+
+def is_anonymous(request) -> bool:
+    # Decided from the cookie alone, loading the session would already query the database.
+    return settings.SESSION_COOKIE_NAME not in request.COOKIES
+
+
+def _stale_key(request):
+    """
+    Returns the cache key of the stale copy of a page, or None when the request's copy is never kept.
+    Only the bare path and a page number are part of the key, so clients cannot add copies by varying the
+    query string. Filtered and searched pages have no stale copy and are always rendered.
+    """
+    query = request.GET
+    if not query:
+        return f"admission:stale:{request.path}"
+    page = query.get("page", "")
+    if list(query) == ["page"] and page.isascii() and page.isdigit():
+        return f"admission:stale:{request.path}?page={int(page)}"
+    return None
+
+
+def get_stale_response(request):
+    """
+    Returns the last known good rendering of the requested page, or None if there is none.
+    """
+    key = _stale_key(request)
+    stored = caches[settings.ADMISSION_CACHE].get(key) if key else None
+    if stored is None:
+        return None
+    content, content_type = stored
+    response = HttpResponse(content, content_type=content_type)
+    response["X-Stale-Content"] = "1"
+    return response
+
+
+def store_stale_response(request, response):
+    """
+    Keeps the rendering of a public page for overload, at most once per ADMISSION_STALE_REFRESH seconds.
+    Responses that set cookies, such as a CSRF token, are personal and never kept.
+    """
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return
+    key = _stale_key(request)
+    if key is None:
+        return
+    cache = caches[settings.ADMISSION_CACHE]
+    if cache.add(f"{key}:fresh", True, settings.ADMISSION_STALE_REFRESH):
+        cache.set(
+            key,
+            (response.content, response["Content-Type"]),
+            settings.ADMISSION_STALE_TTL,
+        )
+
+
+def service_unavailable() -> HttpResponse:
+    response = HttpResponse(
+        "The service is under heavy load, please try again shortly.",
+        status=503,
+        content_type="text/plain",
+    )
+    response["Retry-After"] = str(settings.ADMISSION_RETRY_AFTER)
+    return response
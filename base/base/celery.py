@@ -3,6 +3,8 @@ import os
 from celery import Celery
 from django.conf import settings
 
+from .metrics import instrument_celery
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "base.settings")
 
 app = Celery("base")
@@ -10,3 +12,5 @@ app = Celery("base")
 app.config_from_object(settings, namespace="CELERY")
 
 app.autodiscover_tasks()
+
+instrument_celery()
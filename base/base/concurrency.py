@@ -0,0 +1,38 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+
+def _in_own_connection(func):
+    """
+    Wraps a function so it runs on a connection of its own thread, which is released afterwards the same way
+    Django releases connections at the end of a request.
+    """
+
+    def wrapper():
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+
+    return wrapper
+
+
+async def gather_queries(*funcs):
+    """
+    Runs independent, synchronous ORM functions concurrently and returns their results in order.
+    Each function gets a worker thread and database connection of its own. With ASYNC_CONCURRENT_QUERIES
+    disabled they run one after another on the shared ORM thread instead, which is needed when the
+    callers' uncommitted data must be visible, e.g. inside a test transaction.
+    """
+    if not settings.ASYNC_CONCURRENT_QUERIES:
+        return [await sync_to_async(func)() for func in funcs]
+    return await asyncio.gather(
+        *(
+            sync_to_async(_in_own_connection(func), thread_sensitive=False)()
+            for func in funcs
+        )
+    )
@@ -0,0 +1,273 @@
+"""
+Non-blocking publishing of Celery tasks.
+
+enqueue() hands a task to a bounded buffer in the memory of the process and returns at once. A background
+thread publishes the buffer to the broker, so a slow or unreachable broker never stalls the request thread.
+After ENQUEUE_BREAKER_THRESHOLD consecutive broker errors the circuit breaker opens and the thread stops
+publishing for ENQUEUE_BREAKER_RESET seconds, then lets one attempt through to probe the broker.
+A full buffer overflows according to ENQUEUE_OVERFLOW:
+    - "spill": tasks are appended to a file in ENQUEUE_SPILL_DIR, replayed once the broker is healthy again,
+    - "drop": tasks are discarded and counted.
+The buffer is flushed when the process exits, tasks that cannot be published by then overflow as well.
+"""
+import atexit
+import collections
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from celery import current_app, signals
+from django.conf import settings
+
+from .metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+ENQUEUE_BUFFER_LENGTH = Gauge(
+    "enqueue_buffer_length", "Tasks waiting in the publish buffer of the process."
+)
+ENQUEUE_PUBLISH_ERRORS = Counter(
+    "enqueue_publish_errors", "Broker errors while publishing buffered tasks."
+)
+ENQUEUE_OVERFLOWS = Counter(
+    "enqueue_overflows", "Tasks that did not fit the buffer, by policy (spill, drop)."
+)
+ENQUEUE_CIRCUIT_OPEN = Gauge(
+    "enqueue_circuit_open",
+    "1 while the broker circuit breaker of the process is open.",
+    multiprocess_mode="max",
+)
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing dependency for a while after threshold consecutive failures.
+    Attributes:
+        - threshold (int): The number of consecutive failures that open the circuit.
+        - reset_timeout (float): The number of seconds the circuit stays open before a probe is let through.
+    """
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    def wait_time(self) -> float:
+        """
+        Returns the number of seconds until the next call may be attempted, 0 if it may be attempted now.
+        """
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        ENQUEUE_CIRCUIT_OPEN.set(0)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            # Also restarts the timeout after a failed probe.
+            self.opened_at = time.monotonic()
+            ENQUEUE_CIRCUIT_OPEN.set(1)
+
+
+class BufferedPublisher:
+    """
+    A bounded buffer of tasks drained by a background thread, see the module docstring.
+    The thread is started on the first submit() of every process, so forked workers get their own.
+    """
+
+    def __init__(self):
+        self.lock = threading.Condition()
+        self.spill_lock = threading.Lock()
+        self.pid = None
+        self.thread = None
+        self.stopping = False
+
+    def _start(self):
+        self.pid = os.getpid()
+        self.buffer = collections.deque()
+        self.stopping = False
+        self.breaker = CircuitBreaker(
+            settings.ENQUEUE_BREAKER_THRESHOLD, settings.ENQUEUE_BREAKER_RESET
+        )
+        self.thread = threading.Thread(
+            target=self._run, name="enqueue-publisher", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, name, args=(), kwargs=None, options=None):
+        """
+        Adds a task to the buffer without waiting for the broker.
+        """
+        message = {
+            "task": name,
+            "args": list(args),
+            "kwargs": kwargs or {},
+            "options": options or {},
+        }
+        with self.lock:
+            if self.pid != os.getpid():
+                self._start()
+            if len(self.buffer) < settings.ENQUEUE_BUFFER_SIZE and not self.stopping:
+                self.buffer.append(message)
+                ENQUEUE_BUFFER_LENGTH.set(len(self.buffer))
+                self.lock.notify()
+                return
+        self._overflow([message])
+
+    def publish(self, message):
+        current_app.send_task(
+            message["task"],
+            args=message["args"],
+            kwargs=message["kwargs"],
+            # Fails fast instead of retrying the connection, the breaker decides when to try again.
+            retry=False,
+            **message["options"],
+        )
+
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self.buffer and not self.stopping:
+                    if not self.lock.wait(settings.ENQUEUE_SPILL_REPLAY_INTERVAL):
+                        break
+                if self.stopping:
+                    return
+                message = self.buffer[0] if self.buffer else None
+
+            wait = self.breaker.wait_time()
+            if wait:
+                with self.lock:
+                    if not self.stopping:
+                        self.lock.wait(wait)
+                    if self.stopping:
+                        return
+                continue
+            if message is None:
+                self.replay_spilled()
+                continue
+            try:
+                self.publish(message)
+            except Exception:
+                logger.warning(
+                    "Publishing task %s failed.", message["task"], exc_info=True
+                )
+                ENQUEUE_PUBLISH_ERRORS.inc()
+                self.breaker.record_failure()
+                continue
+            self.breaker.record_success()
+            with self.lock:
+                if self.buffer and self.buffer[0] is message:
+                    self.buffer.popleft()
+                ENQUEUE_BUFFER_LENGTH.set(len(self.buffer))
+
+    def flush(self, timeout=None):
+        """
+        Publishes what the buffer holds, waiting at most timeout seconds (ENQUEUE_FLUSH_TIMEOUT by default),
+        and stops the thread. Tasks left in the buffer overflow.
+        """
+        if self.thread is None or self.pid != os.getpid():
+            return
+        timeout = settings.ENQUEUE_FLUSH_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            while self.buffer and self.breaker.wait_time() == 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.lock.wait(min(remaining, 0.05))
+            self.stopping = True
+            self.lock.notify_all()
+        self.thread.join(max(0.0, deadline - time.monotonic()))
+        with self.lock:
+            # A publish still running in the thread is lost from the buffer here, it may be published twice.
+            left = list(self.buffer)
+            self.buffer.clear()
+            ENQUEUE_BUFFER_LENGTH.set(0)
+        if left:
+            self._overflow(left)
+        self.thread = None
+        self.pid = None
+
+    def _spill_path(self) -> str:
+        return os.path.join(settings.ENQUEUE_SPILL_DIR, f"spill-{os.getpid()}.jsonl")
+
+    def _overflow(self, messages):
+        policy = settings.ENQUEUE_OVERFLOW
+        if policy == "spill":
+            try:
+                with self.spill_lock:
+                    os.makedirs(settings.ENQUEUE_SPILL_DIR, exist_ok=True)
+                    with open(self._spill_path(), "a") as file:
+                        for message in messages:
+                            file.write(json.dumps(message) + "\n")
+            except OSError:
+                logger.exception("Spilling %d tasks failed.", len(messages))
+                policy = "drop"
+        if policy == "drop":
+            logger.error("Dropped %d tasks, the publish buffer is full.", len(messages))
+        ENQUEUE_OVERFLOWS.inc(len(messages), policy=policy)
+
+    def replay_spilled(self) -> int:
+        """
+        Publishes the tasks spilled by any process. A file is claimed by renaming it, so every spilled task is
+        replayed by one process only. Tasks that fail to publish are spilled again.
+        Returns the number of tasks published.
+        """
+        published = 0
+        pattern = os.path.join(settings.ENQUEUE_SPILL_DIR, "spill-*.jsonl")
+        for path in glob.glob(pattern):
+            claimed = f"{path}.replay-{os.getpid()}"
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+            with open(claimed) as file:
+                messages = [json.loads(line) for line in file if line.strip()]
+            failed = []
+            for message in messages:
+                if failed or self.breaker.wait_time():
+                    failed.append(message)
+                    continue
+                try:
+                    self.publish(message)
+                except Exception:
+                    ENQUEUE_PUBLISH_ERRORS.inc()
+                    self.breaker.record_failure()
+                    failed.append(message)
+                else:
+                    self.breaker.record_success()
+                    published += 1
+            if failed:
+                with self.spill_lock, open(self._spill_path(), "a") as file:
+                    for message in failed:
+                        file.write(json.dumps(message) + "\n")
+            os.remove(claimed)
+        return published
+
+
+publisher = BufferedPublisher()
+atexit.register(publisher.flush)
+# Celery's pool processes exit without running atexit handlers.
+signals.worker_process_shutdown.connect(lambda **kwargs: publisher.flush(), weak=False)
+
+
+def enqueue(task, *args, **kwargs):
+    """
+    Publishes a task in the background, like task.delay(*args, **kwargs) but without waiting for the broker.
+    Publishing options such as the queue can be passed as a dict in the "options" keyword argument.
+    Usage:
+        transaction.on_commit(lambda: enqueue(index_application_cv_task, application.pk))
+    """
+    options = kwargs.pop("options", None)
+    if not settings.ENQUEUE_BUFFERED:
+        task.apply_async(args, kwargs, **(options or {}))
+        return
+    publisher.submit(task.name, args, kwargs, options)
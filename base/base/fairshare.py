@@ -0,0 +1,44 @@
+"""
+Fair sharing of Celery workers between companies.
+
+A task using FairShareTask as its base runs at most TASK_FAIR_SHARE_LIMIT instances per company at a time.
+Further instances are retried after TASK_FAIR_SHARE_RETRY_DELAY seconds, which puts them at the back of the
+queue, so the tasks of other companies get the free worker slots in between.
+"""
+from celery import Task
+from django.conf import settings
+from django.core.cache import caches
+
+
+class FairShareTask(Task):
+    """
+    A base class of tasks that are fairly shared between companies.
+    The company is read from the "company_id" keyword argument, tasks without it are not limited.
+    """
+
+    def fair_share_key(self, args, kwargs):
+        return kwargs.get("company_id")
+
+    def __call__(self, *args, **kwargs):
+        # Calls run() rather than Task.__call__(), which would push an empty request over the worker's one
+        # and lose the task id, so retry() could not publish the task again.
+        company_id = self.fair_share_key(args, kwargs)
+        if company_id is None:
+            return self.run(*args, **kwargs)
+
+        cache = caches[settings.TASK_FAIR_SHARE_CACHE]
+        key = f"fairshare:{self.name}:{company_id}"
+        # The counter expires, so slots of killed workers are not lost for good.
+        cache.add(key, 0, settings.TASK_FAIR_SHARE_TIMEOUT)
+        if cache.incr(key) > settings.TASK_FAIR_SHARE_LIMIT:
+            cache.decr(key)
+            raise self.retry(
+                countdown=settings.TASK_FAIR_SHARE_RETRY_DELAY, max_retries=None
+            )
+        try:
+            return self.run(*args, **kwargs)
+        finally:
+            try:
+                cache.decr(key)
+            except ValueError:
+                pass
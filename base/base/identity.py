@@ -0,0 +1,100 @@
+"""
+A request-scoped identity map.
+
+Views and permission checks that need the same row during one request, e.g. the application in test_func(),
+get_initial() and form_valid(), share one instance of it instead of querying it again each time. Related
+objects are registered too, so application.offer.company is the very instance of request.user when the
+company itself is logged in. IdentityMapMiddleware (see base/middleware.py) clears the map when the response is returned.
+"""
+from django.contrib.auth import get_user_model
+from django.http import Http404
+
+
+class IdentityMap:
+    """
+    Model instances loaded during a request, at most one per model and primary key.
+    Attributes:
+        - objects (dict): The instances keyed by model label and primary key.
+    """
+
+    def __init__(self):
+        self.objects = {}
+
+    @staticmethod
+    def _key(model, pk) -> tuple:
+        meta = model._meta.concrete_model._meta
+        return meta.label, meta.pk.to_python(pk)
+
+    def add(self, instance):
+        """
+        Registers an instance and returns the instance registered for its row, which is the given one unless
+        the row was registered before.
+        """
+        return self.objects.setdefault(self._key(type(instance), instance.pk), instance)
+
+    def get(self, model, pk, select_related=()):
+        """
+        Returns the instance of a row, querying it only if it was not loaded during this request yet.
+        The forward relations in select_related, such as "offer" or "offer__company", are loaded with it,
+        or afterwards through the map when the instance was registered without them.
+        Raises model.DoesNotExist like QuerySet.get().
+        """
+        instance = self.objects.get(self._key(model, pk))
+        if instance is None:
+            queryset = model._default_manager.all()
+            if select_related:
+                # select_related() without fields would follow every relation.
+                queryset = queryset.select_related(*select_related)
+            instance = self.add(queryset.get(pk=pk))
+        for path in select_related:
+            self._load_relation(instance, path)
+        return instance
+
+    def get_or_404(self, model, pk, select_related=()):
+        try:
+            return self.get(model, pk, select_related)
+        except model.DoesNotExist:
+            raise Http404(f"No {model._meta.object_name} matches the given query.")
+
+    def _load_relation(self, instance, path):
+        name, _, rest = path.partition("__")
+        field = instance._meta.get_field(name)
+        if field.is_cached(instance):
+            related = field.get_cached_value(instance)
+            if related is not None:
+                canonical = self.add(related)
+                if canonical is not related:
+                    field.set_cached_value(instance, canonical)
+                related = canonical
+        else:
+            value = getattr(instance, field.attname)
+            related = None if value is None else self.get(field.related_model, value)
+            field.set_cached_value(instance, related)
+        if rest and related is not None:
+            self._load_relation(related, rest)
+
+    def clear(self):
+        self.objects.clear()
+
+
+def get_identity_map(request) -> IdentityMap:
+    """
+    Returns the identity map of a request, creating it when the request did not pass IdentityMapMiddleware.
+    """
+    try:
+        return request.identity_map
+    except AttributeError:
+        request.identity_map = IdentityMap()
+        return request.identity_map
+
+
+def remember_user(request):
+    """
+    Registers the authenticated user of a request, so loading the same user through the map is free.
+    """
+    user = request.user
+    if user.is_authenticated:
+        # Registers the user itself rather than the lazy object of AuthenticationMiddleware.
+        user = getattr(user, "_wrapped", user)
+        if isinstance(user, get_user_model()):
+            get_identity_map(request).add(user)
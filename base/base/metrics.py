@@ -0,0 +1,449 @@
+"""
+A small metrics registry that exposes counters, gauges and histograms in the Prometheus text format.
+
+Every process keeps its samples in memory and periodically writes them to ``METRICS_DIR`` as one JSON
+file per process. The exposition endpoint merges all of those files, so the numbers it reports cover
+every web worker and every Celery worker process, not only the one that happened to serve the scrape.
+When ``METRICS_DIR`` is not set the registry is process local, which is what the test suite uses.
+
+Each process holds an exclusive lock on a ``.lock`` file next to its samples for as long as it lives, which
+works across the containers sharing ``METRICS_DIR`` where process ids mean nothing. When a file's lock can be
+taken its process is gone: the exposition folds its counters and histograms into ``metrics-archive.json``,
+so totals never go down, drops its gauges and deletes its files.
+"""
+import atexit
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ARCHIVE_FILENAME = "metrics-archive.json"
+
+
+class Registry:
+    """
+    A registry of metric families and their samples for the current process.
+    Attributes:
+        - metrics (dict): Registered metric families keyed by name.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._reset()
+        atexit.register(self.flush)
+
+    def _reset(self):
+        """
+        Starts a fresh set of samples owned by the current process.
+        Called on creation and again in a forked child, so the child does not report its parent's values twice.
+        """
+        # A forked child shares its parent's lock, closing its copy lets the parent's files be pruned.
+        lock_file = getattr(self, "_lock_file", None)
+        if lock_file is not None:
+            lock_file.close()
+        self._lock_file = None
+        self._pid = os.getpid()
+        self._started = time.time_ns()
+        self._values = {}
+        self._last_flush = time.monotonic()
+
+    def register(self, metric):
+        """
+        Adds a metric family to the registry.
+        """
+        self.metrics[metric.name] = metric
+
+    def add(self, name, labels, amount, mode="sum"):
+        """
+        Adds an amount to a sample, or sets it when ``mode`` is "set".
+        """
+        with self._lock:
+            if os.getpid() != self._pid:
+                self._reset()
+            key = (name, tuple(sorted(labels.items())))
+            if mode == "set":
+                self._values[key] = amount
+            else:
+                self._values[key] = self._values.get(key, 0.0) + amount
+        self._maybe_flush()
+
+    def _directory(self):
+        return getattr(settings, "METRICS_DIR", None)
+
+    def _filename(self):
+        return os.path.join(
+            self._directory(), f"metrics-{self._pid}-{self._started}.json"
+        )
+
+    def _hold_lock(self, directory):
+        """
+        Takes the lock that marks this process as alive. The lock file is locked under a temporary name
+        first, so no other process ever sees it unlocked.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        lock_file = os.fdopen(fd, "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.replace(tmp_path, _lock_filename(self._filename()))
+        self._lock_file = lock_file
+
+    def _maybe_flush(self):
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the samples of this process to ``METRICS_DIR``, replacing the previous snapshot atomically.
+        """
+        directory = self._directory()
+        if not directory:
+            return
+        with self._lock:
+            if os.getpid() != self._pid:
+                return
+            samples = [
+                [name, list(labels), value]
+                for (name, labels), value in self._values.items()
+            ]
+            self._last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        if self._lock_file is None:
+            self._hold_lock(directory)
+        _write_samples(directory, self._filename(), samples)
+
+    def collect(self):
+        """
+        Returns the samples of every process merged together, as a dict keyed by (name, labels).
+        """
+        merged = {}
+        own_file = None
+        directory = self._directory()
+        if directory:
+            own_file = self._filename()
+            self.prune(directory, own_file)
+            for filename in _list_metric_files(directory):
+                if filename == own_file:
+                    continue
+                for name, labels, value in _read_samples(filename) or []:
+                    key = (name, tuple(tuple(label) for label in labels))
+                    self._merge(merged, key, value)
+        with self._lock:
+            own_values = dict(self._values) if os.getpid() == self._pid else {}
+        for key, value in own_values.items():
+            self._merge(merged, key, value)
+        return merged
+
+    def prune(self, directory, own_file=None):
+        """
+        Archives and deletes the files of processes that are no longer alive.
+        Returns the number of processes pruned.
+        """
+        dead = [
+            filename
+            for filename in _list_metric_files(directory)
+            if filename != own_file and not _is_alive(filename)
+        ]
+        if not dead:
+            return 0
+        archive_path = os.path.join(directory, ARCHIVE_FILENAME)
+        # Concurrent scrapes must not archive the same file twice.
+        with open(_lock_filename(archive_path), "a") as archive_lock:
+            fcntl.flock(archive_lock, fcntl.LOCK_EX)
+            archive = {}
+            for name, labels, value in _read_samples(archive_path) or []:
+                archive[(name, tuple(tuple(label) for label in labels))] = value
+            for filename in dead:
+                for name, labels, value in _read_samples(filename) or []:
+                    metric = self.metrics.get(name.rsplit(":", 1)[0])
+                    if metric is not None and metric.kind == "gauge":
+                        continue
+                    key = (name, tuple(tuple(label) for label in labels))
+                    archive[key] = archive.get(key, 0.0) + value
+            _write_samples(directory, archive_path, archive)
+            for filename in dead:
+                for path in (filename, _lock_filename(filename)):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+        return len(dead)
+
+    def _merge(self, merged, key, value):
+        metric = self.metrics.get(key[0].rsplit(":", 1)[0])
+        if key in merged and metric is not None and metric.multiprocess_mode == "max":
+            merged[key] = max(merged[key], value)
+        else:
+            merged[key] = merged.get(key, 0.0) + value
+
+    def exposition(self):
+        """
+        Renders every registered metric family in the Prometheus text exposition format.
+        """
+        samples = self.collect()
+        by_family = {}
+        for (name, labels), value in samples.items():
+            family, _, suffix = name.partition(":")
+            by_family.setdefault(family, []).append((suffix, labels, value))
+
+        lines = []
+        for family in sorted(set(self.metrics) | set(by_family)):
+            metric = self.metrics.get(family)
+            if metric is not None:
+                lines.append(f"# HELP {family} {metric.documentation}")
+                lines.append(f"# TYPE {family} {metric.kind}")
+            for suffix, labels, value in sorted(
+                by_family.get(family, []), key=_sample_sort_key
+            ):
+                sample_name = f"{family}_{suffix}" if suffix else family
+                lines.append(
+                    f"{sample_name}{_format_labels(labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _list_metric_files(directory):
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return [
+        os.path.join(directory, name)
+        for name in names
+        if name.startswith("metrics-") and name.endswith(".json")
+    ]
+
+
+def _lock_filename(filename):
+    return filename[: -len(".json")] + ".lock"
+
+
+def _is_alive(filename):
+    """
+    Returns whether the process that writes a metrics file still holds its lock.
+    A file without a lock file was written before locks were taken, or by a process that died before locking.
+    """
+    if os.path.basename(filename) == ARCHIVE_FILENAME:
+        return True
+    try:
+        fd = os.open(_lock_filename(filename), os.O_RDWR)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+    return False
+
+
+def _read_samples(filename):
+    try:
+        with open(filename) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_samples(directory, filename, samples):
+    """
+    Writes samples, as a list or a dict keyed by (name, labels), replacing the file atomically.
+    """
+    if isinstance(samples, dict):
+        samples = [
+            [name, list(labels), value] for (name, labels), value in samples.items()
+        ]
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as file:
+        json.dump(samples, file)
+    os.replace(tmp_path, filename)
+
+
+def _sample_sort_key(sample):
+    suffix, labels, _ = sample
+    other = tuple(label for label in labels if label[0] != "le")
+    le = [float(value) for key, value in labels if key == "le"]
+    return other, suffix != "bucket", le[0] if le else 0.0
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for key, value in labels
+    )
+    return "{" + rendered + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """
+    Base class for metric families.
+    Attributes:
+        - name (str): The metric family name.
+        - documentation (str): The help text shown in the exposition.
+        - multiprocess_mode (str): How samples from several processes are combined, "sum" or "max".
+    """
+
+    kind = "untyped"
+    multiprocess_mode = "sum"
+
+    def __init__(self, name, documentation, registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+
+class Counter(Metric):
+    """
+    A monotonically increasing counter.
+    """
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        self.registry.add(f"{self.name}:total", labels, amount)
+
+
+class Gauge(Metric):
+    """
+    A value that can go up and down.
+    Gauges set from several processes are combined with ``multiprocess_mode``.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, registry=None, multiprocess_mode="sum"):
+        super().__init__(name, documentation, registry)
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value, **labels):
+        self.registry.add(self.name, labels, value, mode="set")
+
+    def inc(self, amount=1, **labels):
+        self.registry.add(self.name, labels, amount)
+
+    def dec(self, amount=1, **labels):
+        self.registry.add(self.name, labels, -amount)
+
+
+class Histogram(Metric):
+    """
+    A histogram with fixed, cumulative buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, registry=None, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, registry)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        for bound in self.buckets:
+            bucket_labels = dict(labels, le=_format_value(bound))
+            self.registry.add(
+                f"{self.name}:bucket", bucket_labels, 1 if value <= bound else 0
+            )
+        self.registry.add(f"{self.name}:sum", labels, value)
+        self.registry.add(f"{self.name}:count", labels, 1)
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time spent handling a request, by URL name."
+)
+REQUEST_COUNT = Counter(
+    "http_requests", "Handled requests, by URL name, method and status code."
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds", "Time spent in database queries per request."
+)
+REQUEST_DB_QUERIES = Counter(
+    "http_request_db_queries", "Database queries executed, by URL name."
+)
+
+TASK_QUEUE_WAIT = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time between publishing a task and a worker starting it.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+TASK_RUNTIME = Histogram("celery_task_runtime_seconds", "Time spent running a task.")
+TASK_COUNT = Counter("celery_tasks", "Finished tasks, by task name and state.")
+TASK_FAILURES = Counter("celery_task_failures", "Tasks that raised, by task name.")
+
+
+class QueryTimer:
+    """
+    A database execute wrapper that accumulates the time and number of queries run through it.
+    """
+
+    def __init__(self):
+        self.duration = 0.0
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.queries += 1
+
+
+_task_started = {}
+
+
+def _before_task_publish(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+def _task_prerun(task_id=None, task=None, **kwargs):
+    published_at = getattr(task.request, "published_at", None)
+    if published_at:
+        TASK_QUEUE_WAIT.observe(max(time.time() - published_at, 0.0), task=task.name)
+    _task_started[task_id] = time.perf_counter()
+
+
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_RUNTIME.observe(time.perf_counter() - started, task=task.name)
+    TASK_COUNT.inc(task=task.name, state=state or "UNKNOWN")
+
+
+def _task_failure(sender=None, **kwargs):
+    TASK_FAILURES.inc(task=sender.name)
+
+
+def instrument_celery():
+    """
+    Connects the Celery signal handlers that record queue wait time, run time and failures of every task.
+    """
+    from celery import signals
+
+    signals.before_task_publish.connect(_before_task_publish, weak=False)
+    signals.task_prerun.connect(_task_prerun, weak=False)
+    signals.task_postrun.connect(_task_postrun, weak=False)
+    signals.task_failure.connect(_task_failure, weak=False)
+    signals.worker_process_shutdown.connect(
+        lambda **kwargs: REGISTRY.flush(), weak=False
+    )
@@ -0,0 +1,251 @@
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.urls import Resolver404, resolve
+
+from . import admission, nplusone
+from .identity import IdentityMap
+from .metrics import (
+    QueryTimer,
+    REQUEST_COUNT,
+    REQUEST_DB_QUERIES,
+    REQUEST_DB_TIME,
+    REQUEST_LATENCY,
+)
+
+# Execute wrappers of the current request. A context variable follows the request into the threads
+# that async views run their queries in, where a per-connection execute_wrapper() would not.
+_query_wrappers = ContextVar("query_wrappers", default=())
+
+
+def _dispatch_query(execute, sql, params, many, context):
+    for wrapper in reversed(_query_wrappers.get()):
+        execute = functools.partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def _install_query_dispatch(sender, connection, **kwargs):
+    if _dispatch_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_dispatch_query)
+
+
+@contextmanager
+def observe_queries(wrapper):
+    """
+    Runs every query issued inside the block, in this thread or a thread it hands work to, through wrapper.
+    """
+    for connection in connections.all(initialized_only=True):
+        _install_query_dispatch(None, connection)
+    token = _query_wrappers.set(_query_wrappers.get() + (wrapper,))
+    try:
+        yield
+    finally:
+        _query_wrappers.reset(token)
+
+
+def get_view_name(request) -> str:
+    """
+    Returns the URL name of the view that handled the request, used as the label of per-view metrics.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None or not match.view_name:
+        return "<unresolved>"
+    return match.view_name
+
+
+class AsyncCapableMiddleware:
+    """
+    Base class for middleware that works under both WSGI and ASGI without being adapted,
+    so async views are not pushed back into a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request, self.get_response)
+
+    async def __acall__(self, request):
+        return await self.ahandle(request, self.get_response)
+
+    def handle(self, request, get_response):
+        raise NotImplementedError
+
+    async def ahandle(self, request, get_response):
+        raise NotImplementedError
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware that records request latency, status codes and database time for every request,
+    labelled with the URL name of the view.
+    """
+
+    def handle(self, request, get_response):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with observe_queries(timer):
+            response = get_response(request)
+        self.record(request, response, time.perf_counter() - start, timer)
+        return response
+
+    async def ahandle(self, request, get_response):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with observe_queries(timer):
+            response = await get_response(request)
+        self.record(request, response, time.perf_counter() - start, timer)
+        return response
+
+    def record(self, request, response, duration, timer):
+        view = get_view_name(request)
+        REQUEST_LATENCY.observe(duration, view=view)
+        REQUEST_COUNT.inc(
+            view=view, method=request.method, status=str(response.status_code)
+        )
+        REQUEST_DB_TIME.observe(timer.duration, view=view)
+        REQUEST_DB_QUERIES.inc(timer.queries, view=view)
+
+
+class QueryShapeMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware that reports query shapes repeated more than NPLUSONE_THRESHOLD times within one request.
+    It is meant for development and staging and does nothing unless NPLUSONE_DETECTION is enabled.
+    """
+
+    def handle(self, request, get_response):
+        if not settings.NPLUSONE_DETECTION:
+            return get_response(request)
+
+        collector = nplusone.QueryShapeCollector(settings.NPLUSONE_THRESHOLD)
+        with observe_queries(collector):
+            response = get_response(request)
+        nplusone.report(request, collector)
+        return response
+
+    async def ahandle(self, request, get_response):
+        if not settings.NPLUSONE_DETECTION:
+            return await get_response(request)
+
+        collector = nplusone.QueryShapeCollector(settings.NPLUSONE_THRESHOLD)
+        with observe_queries(collector):
+            response = await get_response(request)
+        nplusone.report(request, collector)
+        return response
+
+
+def resolve_view_name(request) -> str:
+    """
+    Returns the URL name of the view a request will be handled by, before the URL resolver of the handler runs.
+    """
+    try:
+        return resolve(request.path_info).view_name
+    except Resolver404:
+        return "<unresolved>"
+
+
+class AdmissionControlMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware that sheds load while the process is overloaded, see base/admission.py.
+    Anonymous GETs of ADMISSION_STALE_VIEWS get their last known good rendering, ADMISSION_LOW_PRIORITY_VIEWS
+    get a 503, and all other requests are admitted.
+    """
+
+    def shed(self, request, view, public):
+        """
+        Returns the response sent instead of running the view, or None if the request is admitted.
+        """
+        if admission.tracker.overloaded():
+            if public:
+                response = admission.get_stale_response(request)
+                if response is not None:
+                    admission.ADMISSION_DECISIONS.inc(view=view, decision="stale")
+                    return response
+            if view in settings.ADMISSION_LOW_PRIORITY_VIEWS:
+                admission.ADMISSION_DECISIONS.inc(view=view, decision="rejected")
+                return admission.service_unavailable()
+        admission.ADMISSION_DECISIONS.inc(view=view, decision="admitted")
+        return None
+
+    def classify(self, request):
+        view = resolve_view_name(request)
+        public = (
+            request.method == "GET"
+            and view in settings.ADMISSION_STALE_VIEWS
+            and admission.is_anonymous(request)
+        )
+        return view, public
+
+    def handle(self, request, get_response):
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            return get_response(request)
+
+        view, public = self.classify(request)
+        response = self.shed(request, view, public)
+        if response is not None:
+            return response
+
+        admission.tracker.enter()
+        try:
+            with observe_queries(admission.tracker.query_wrapper):
+                response = get_response(request)
+        finally:
+            admission.tracker.exit()
+        if public:
+            admission.store_stale_response(request, response)
+        return response
+
+    async def ahandle(self, request, get_response):
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            return await get_response(request)
+
+        view, public = self.classify(request)
+        response = await sync_to_async(self.shed)(request, view, public)
+        if response is not None:
+            return response
+
+        admission.tracker.enter()
+        try:
+            with observe_queries(admission.tracker.query_wrapper):
+                response = await get_response(request)
+        finally:
+            admission.tracker.exit()
+        if public:
+            await sync_to_async(admission.store_stale_response)(request, response)
+        return response
+
+
+class IdentityMapMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware that gives every request an empty identity map and clears it once the response is returned,
+    so no instance outlives its request.
+    """
+
+    def handle(self, request, get_response):
+        request.identity_map = IdentityMap()
+        try:
+            return get_response(request)
+        finally:
+            request.identity_map.clear()
+
+    async def ahandle(self, request, get_response):
+        request.identity_map = IdentityMap()
+        try:
+            return await get_response(request)
+        finally:
+            request.identity_map.clear()
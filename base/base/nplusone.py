@@ -0,0 +1,139 @@
+"""
+Detection of N+1 query patterns for development and staging.
+
+Every query run during a request is reduced to its shape, the SQL with literal values and the length
+of IN lists removed. A shape that repeats more than ``NPLUSONE_THRESHOLD`` times within one request is
+reported together with the template line and the project code (usually a model property) that issued it.
+"""
+import logging
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+# Frames from the project package itself (middleware, metrics) are never the cause of a query.
+_PROJECT_PACKAGE = os.path.dirname(__file__) + os.sep
+
+
+class NPlusOneError(Exception):
+    """
+    Raised at the end of a request that repeated a query shape more than the allowed number of times,
+    when NPLUSONE_RAISE is enabled.
+    """
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Returns the shape of a SQL statement: literals become placeholders and IN lists collapse to one entry,
+    so queries that only differ in the looked up values share a fingerprint.
+    """
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = shape.replace("%s", "?")
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryShape:
+    """
+    A query shape seen during a request.
+    Attributes:
+        - sql (str): The fingerprint of the query.
+        - count (int): How many times the shape was executed.
+        - template (str): The template file and line rendering when the threshold was crossed.
+        - source (str): The project code that issued the query when the threshold was crossed.
+    """
+
+    sql: str
+    count: int = 0
+    template: str = None
+    source: str = None
+
+    def __str__(self):
+        location = ", ".join(
+            part for part in (self.template, self.source) if part is not None
+        )
+        return f"{self.count}x {self.sql} ({location or 'unknown location'})"
+
+
+def _find_origin(frame):
+    """
+    Walks the stack outwards and returns the innermost template line and project code location.
+    """
+    template = source = None
+    base_dir = str(settings.BASE_DIR) + os.sep
+    while frame is not None and (template is None or source is None):
+        code = frame.f_code
+        if template is None and code.co_name == "render_annotated":
+            node = frame.f_locals.get("self")
+            origin = getattr(node, "origin", None)
+            token = getattr(node, "token", None)
+            if origin is not None and token is not None:
+                template = f"{origin.template_name}:{token.lineno}"
+        elif (
+            source is None
+            and code.co_filename.startswith(base_dir)
+            and os.sep in code.co_filename[len(base_dir) :]
+            and "site-packages" not in code.co_filename
+            and not code.co_filename.startswith(_PROJECT_PACKAGE)
+        ):
+            filename = code.co_filename[len(base_dir) :]
+            source = f"{filename}:{frame.f_lineno} in {code.co_name}"
+        frame = frame.f_back
+    return template, source
+
+
+@dataclass
+class QueryShapeCollector:
+    """
+    A database execute wrapper that counts query shapes for one request.
+    Attributes:
+        - threshold (int): The number of repetitions of a shape that is still allowed.
+        - shapes (dict): The shapes seen so far, keyed by fingerprint.
+    """
+
+    threshold: int
+    shapes: dict = field(default_factory=dict)
+
+    def __call__(self, execute, sql, params, many, context):
+        key = fingerprint(sql)
+        shape = self.shapes.get(key)
+        if shape is None:
+            shape = self.shapes[key] = QueryShape(key)
+        shape.count += 1
+        if shape.count == self.threshold + 1:
+            shape.template, shape.source = _find_origin(sys._getframe(1))
+        return execute(sql, params, many, context)
+
+    @property
+    def repeated(self):
+        """
+        Returns the shapes that were executed more times than the threshold allows.
+        """
+        return [shape for shape in self.shapes.values() if shape.count > self.threshold]
+
+
+def report(request, collector: QueryShapeCollector):
+    """
+    Logs every repeated query shape of a request, and raises NPlusOneError when NPLUSONE_RAISE is enabled.
+    """
+    repeated = collector.repeated
+    if not repeated:
+        return
+    message = "N+1 queries in {} {}:\n{}".format(
+        request.method,
+        request.path,
+        "\n".join(f"  {shape}" for shape in repeated),
+    )
+    logger.warning(message)
+    if settings.NPLUSONE_RAISE:
+        raise NPlusOneError(message)
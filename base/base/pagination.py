@@ -0,0 +1,113 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of counting and skipping rows with OFFSET, every page continues after the ordering values of the
+last row of the previous page. Each page is then an index range scan of the same cost, however deep it is.
+"""
+import base64
+import datetime
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q, QuerySet
+
+
+def _encode_value(value):
+    # Unlike DjangoJSONEncoder this keeps microseconds, a truncated datetime would skip rows.
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+@dataclass
+class KeysetPage:
+    """
+    One page of a keyset paginated queryset.
+    Attributes:
+        - object_list (list): The objects of the page.
+        - next_cursor (str): The cursor of the following page, or None on the last page.
+    """
+
+    object_list: List[Any]
+    next_cursor: Optional[str]
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by the values of its ordering fields.
+    The ordering must be unique, so it should end with the primary key, e.g. ("-date_created", "-id"),
+    and its fields must not be nullable.
+    Attributes:
+        - queryset (QuerySet): The queryset to paginate.
+        - ordering (tuple): The field names to order by, prefixed with "-" for descending order.
+        - per_page (int): The number of objects on a page.
+    """
+
+    def __init__(self, queryset: QuerySet, ordering: Sequence[str], per_page: int):
+        self.queryset = queryset.order_by(*ordering)
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+
+    def _fields(self):
+        return [(name.lstrip("-"), name.startswith("-")) for name in self.ordering]
+
+    def encode_cursor(self, obj) -> str:
+        values = [getattr(obj, name) for name, _ in self._fields()]
+        data = json.dumps(values, default=_encode_value).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, cursor: str) -> list:
+        """
+        Returns the ordering values stored in a cursor, converted back to Python values.
+        Raises InvalidPage for a cursor that was not produced by this paginator.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            fields = self._fields()
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            meta = self.queryset.model._meta
+            return [
+                meta.get_field(meta.pk.name if name == "pk" else name).to_python(value)
+                for (name, _), value in zip(fields, values)
+            ]
+        except Exception:
+            raise InvalidPage("Invalid cursor.")
+
+    def _after(self, values) -> Q:
+        """
+        Returns the condition for rows that come after the given ordering values.
+        """
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self._fields(), values):
+            lookup = "lt" if descending else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """
+        Returns the page that starts after the given cursor, or the first page when cursor is empty.
+        """
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+        objects = list(queryset[: self.per_page + 1])
+        next_cursor = None
+        if len(objects) > self.per_page:
+            objects = objects[: self.per_page]
+            next_cursor = self.encode_cursor(objects[-1])
+        return KeysetPage(objects, next_cursor)
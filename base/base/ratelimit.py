@@ -0,0 +1,209 @@
+"""
+Token bucket rate limiting of write endpoints, per client IP and per user.
+
+Buckets are kept in the shared cache as GCRA state: the "theoretical arrival time" (TAT) at which the bucket
+would be full again. Taking a token is one atomic cache.incr() of the TAT by the emission interval, so
+concurrent requests on several web nodes never read-modify-write the same bucket. When the cache is unreachable
+the limiter falls back to buckets in the memory of the process, which are lock-free and therefore only
+approximate under concurrent requests.
+"""
+import functools
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from .metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+RATELIMIT_REJECTIONS = Counter(
+    "ratelimit_rejections", "Requests rejected by the rate limiter, by scope."
+)
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+@dataclass(frozen=True)
+class Rate:
+    """
+    A bucket of limit tokens, refilled evenly over period seconds.
+    Attributes:
+        - limit (int): The size of the bucket, i.e. the largest burst of requests.
+        - period (int): The number of seconds an empty bucket takes to refill.
+    """
+
+    limit: int
+    period: int
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """
+        Parses rates such as "10/m" or "100/h".
+        """
+        limit, unit = value.split("/")
+        return cls(int(limit), PERIODS[unit])
+
+    @property
+    def interval_ms(self) -> int:
+        # The time one token takes to refill, in integer milliseconds because cache.incr() takes integers.
+        return max(1, self.period * 1000 // self.limit)
+
+    @property
+    def capacity_ms(self) -> int:
+        return self.interval_ms * self.limit
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class CacheBuckets:
+    """
+    Token buckets stored in a Django cache, shared by every process that uses the same cache.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def take(self, key, rate: Rate, now_ms: int) -> int:
+        """
+        Takes a token from the bucket. Returns 0 when it was taken, otherwise the number of milliseconds
+        until one is available.
+        """
+        interval, capacity = rate.interval_ms, rate.capacity_ms
+        # The key outlives its TAT, an expired key is a full bucket.
+        timeout = rate.period + 1
+        if self.cache.add(key, now_ms + interval, timeout):
+            return 0
+        try:
+            tat = self.cache.incr(key, interval)
+        except ValueError:
+            # The key expired between add() and incr().
+            self.cache.add(key, now_ms + interval, timeout)
+            return 0
+
+        if tat <= now_ms + interval:
+            # The bucket was idle long enough to be full again, the TAT restarts from now. Concurrent requests
+            # on an idle bucket may overwrite each other's token here, which errs on the side of allowing.
+            self.cache.set(key, now_ms + interval, timeout)
+            return 0
+        if tat - now_ms > capacity:
+            # Rejected requests do not consume a token.
+            self.cache.decr(key, interval)
+            return tat - capacity - now_ms
+        self.cache.touch(key, timeout)
+        return 0
+
+    def give_back(self, key, rate: Rate):
+        try:
+            self.cache.decr(key, rate.interval_ms)
+        except ValueError:
+            pass
+
+
+class LocalBuckets:
+    """
+    Token buckets in the memory of the process, used while the shared cache is unreachable.
+    There are no locks, every read and write of the dictionary is atomic, but two concurrent requests
+    can occasionally both take the last token.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+
+    def take(self, key, rate: Rate, now_ms: int) -> int:
+        tat = max(self.buckets.get(key, now_ms), now_ms) + rate.interval_ms
+        if tat - now_ms > rate.capacity_ms:
+            return tat - rate.capacity_ms - now_ms
+        self.buckets[key] = tat
+        return 0
+
+    def give_back(self, key, rate: Rate):
+        tat = self.buckets.get(key)
+        if tat is not None:
+            self.buckets[key] = tat - rate.interval_ms
+
+
+local_buckets = LocalBuckets()
+
+
+def get_client_ip(request) -> str:
+    return request.META.get(settings.RATELIMIT_IP_META_KEY, "")
+
+
+def get_bucket_keys(request, scope) -> list:
+    """
+    Returns the keys of the buckets a request takes tokens from: one for the user, if logged in,
+    and one for the client IP.
+    """
+    keys = []
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        keys.append(f"ratelimit:{scope}:user:{user.pk}")
+    keys.append(f"ratelimit:{scope}:ip:{get_client_ip(request)}")
+    return keys
+
+
+def check_rate(request, scope, rate: Rate) -> int:
+    """
+    Takes a token from every bucket of the request. Returns 0 if the request is allowed, otherwise the number
+    of seconds to wait, in which case no token is taken.
+    """
+    buckets = CacheBuckets(caches[settings.RATELIMIT_CACHE])
+    now_ms = _now_ms()
+    taken = []
+    for key in get_bucket_keys(request, scope):
+        try:
+            wait_ms = buckets.take(key, rate, now_ms)
+        except Exception:
+            logger.warning(
+                "Rate limit cache unavailable, using local buckets.", exc_info=True
+            )
+            buckets = local_buckets
+            wait_ms = buckets.take(key, rate, now_ms)
+        if wait_ms:
+            for taken_buckets, taken_key in taken:
+                taken_buckets.give_back(taken_key, rate)
+            return max(1, math.ceil(wait_ms / 1000))
+        taken.append((buckets, key))
+    return 0
+
+
+def too_many_requests(retry_after: int) -> HttpResponse:
+    response = HttpResponse(
+        "Too many requests, please try again later.",
+        status=429,
+        content_type="text/plain",
+    )
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def ratelimit(scope, methods=("POST",)):
+    """
+    A view decorator that limits requests of the given methods with the rate configured in
+    settings.RATELIMITS[scope], such as "10/h", and returns 429 responses with a Retry-After header.
+    Usage:
+        @method_decorator(ratelimit("apply"), name="dispatch")
+        class ApplyForOfferView(CreateView):
+    """
+
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLED and request.method in methods:
+                rate = Rate.parse(settings.RATELIMITS[scope])
+                retry_after = check_rate(request, scope, rate)
+                if retry_after:
+                    RATELIMIT_REJECTIONS.inc(scope=scope)
+                    return too_many_requests(retry_after)
+            return view_func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,37 @@
+"""
+Offloaded file downloads.
+
+Views check permissions and then hand the file to the web server with an X-Accel-Redirect (nginx) or
+X-Sendfile (Apache, lighttpd) header, so no Python worker is tied up streaming it.
+"""
+import mimetypes
+import posixpath
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+
+
+def sendfile(storage, name, filename=None):
+    """
+    Returns a response that downloads the file stored under name as an attachment, with the backend
+    configured by SENDFILE_BACKEND:
+        - "nginx": X-Accel-Redirect to SENDFILE_URL followed by the name of the file.
+        - "xsendfile": X-Sendfile with the path of the file.
+        - "simple": the file streamed by Django, meant for development only.
+    """
+    filename = filename or posixpath.basename(name)
+    backend = settings.SENDFILE_BACKEND
+    if backend == "simple":
+        return FileResponse(storage.open(name), as_attachment=True, filename=filename)
+
+    content_type, _ = mimetypes.guess_type(filename)
+    response = HttpResponse(content_type=content_type or "application/octet-stream")
+    response["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    if backend == "nginx":
+        response["X-Accel-Redirect"] = quote(settings.SENDFILE_URL + name)
+    elif backend == "xsendfile":
+        response["X-Sendfile"] = storage.path(name)
+    else:
+        raise ValueError(f"Unknown SENDFILE_BACKEND {backend!r}.")
+    return response
@@ -46,6 +46,68 @@ CELERY_RESULT_BACKEND = "redis://redis:6379"
 CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+# No task's return value is ever read, so results are not stored.
+CELERY_TASK_IGNORE_RESULT = True
+# Workers reserve one task at a time, so a long task does not hold others back in its prefetch buffer.
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Queues, each consumed by its own worker pool (see docker-compose.yml):
+#   - transactional: mail a user is waiting for, such as account activation,
+#   - bulk: mail sent on behalf of a company and periodic maintenance,
+#   - heavy: CPU and IO bound jobs such as image processing and CV extraction.
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_ROUTES = {
+    "accounts.tasks.send_email_task": {"queue": "transactional"},
+    "accounts.tasks.generate_image_variants_task": {"queue": "heavy"},
+    "dashboard.tasks.index_application_cv_task": {"queue": "heavy"},
+    "dashboard.tasks.score_applications_task": {"queue": "bulk"},
+    "offers.tasks.reconcile_company_stats_task": {"queue": "bulk"},
+    "offers.tasks.recommend_offers_task": {"queue": "heavy"},
+    "offers.tasks.update_similar_offers_task": {"queue": "heavy"},
+    "offers.tasks.rebuild_similar_offers_task": {"queue": "heavy"},
+    "offers.tasks.refresh_salary_benchmarks_task": {"queue": "heavy"},
+    "accounts.tasks.clear_expired_sessions_task": {"queue": "bulk"},
+    "study.tasks.check_resource_links_task": {"queue": "bulk"},
+    "study.tasks.index_resources_task": {"queue": "bulk"},
+    "study.tasks.index_category_resources_task": {"queue": "bulk"},
+    "study.tasks.match_requirements_task": {"queue": "bulk"},
+}
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-company-stats": {
+        "task": "offers.tasks.reconcile_company_stats_task",
+        "schedule": 60 * 60,
+    },
+    "clear-expired-sessions": {
+        "task": "accounts.tasks.clear_expired_sessions_task",
+        "schedule": 60 * 60,
+    },
+    "recommend-offers": {
+        "task": "offers.tasks.recommend_offers_task",
+        "schedule": 6 * 60 * 60,
+    },
+    "rebuild-similar-offers": {
+        "task": "offers.tasks.rebuild_similar_offers_task",
+        "schedule": 24 * 60 * 60,
+    },
+    "refresh-salary-benchmarks": {
+        "task": "offers.tasks.refresh_salary_benchmarks_task",
+        "schedule": 6 * 60 * 60,
+    },
+    "score-applications": {
+        "task": "dashboard.tasks.score_applications_task",
+        "schedule": 15 * 60,
+    },
+    "check-resource-links": {
+        "task": "study.tasks.check_resource_links_task",
+        "schedule": 24 * 60 * 60,
+    },
+}
+
+
+""" Metrics configuration """
+# Directory shared by web and worker processes, each process writes its samples there.
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = 5
+METRICS_ALLOWED_IPS = ["127.0.0.1"]
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -53,6 +115,218 @@ DEBUG = True
 ALLOWED_HOSTS = []
 
 
+""" Cache """
+# A shared Redis cache when REDIS_CACHE_URL is set, e.g. "redis://redis:6379/1", otherwise a per-process cache.
+# Sessions get their own alias. RedisCache.clear() flushes the whole Redis database of an alias whatever its
+# KEY_PREFIX, so REDIS_SESSION_URL, e.g. "redis://redis:6379/2", should point at another database for clearing
+# the default cache to leave the cached sessions alone. Either way nobody is logged out by a lost or cleared
+# cache, cached_db writes sessions through to the database and reads them from there on a cache miss.
+if os.getenv("REDIS_CACHE_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_CACHE_URL"),
+        },
+        "sessions": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_SESSION_URL", os.getenv("REDIS_CACHE_URL")),
+            "KEY_PREFIX": "sessions",
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        "sessions": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "sessions",
+        },
+    }
+
+
+""" Sessions """
+# Sessions are read from the cache and written through to the database, which keeps them when the cache is lost.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "sessions"
+# Expired sessions are deleted by clear_expired_sessions_task in batches, pausing between them.
+SESSION_CLEANUP_BATCH_SIZE = 1000
+SESSION_CLEANUP_PAUSE = 0.1
+# Seconds one run may take, the sessions left are deleted by the next run.
+SESSION_CLEANUP_TIME_LIMIT = 5 * 60
+
+
+""" Rate limiting of write endpoints, see base/ratelimit.py """
+RATELIMIT_ENABLED = True
+RATELIMIT_CACHE = "default"
+# The request.META key holding the client IP, e.g. "HTTP_X_REAL_IP" behind a reverse proxy that sets it.
+RATELIMIT_IP_META_KEY = os.getenv("RATELIMIT_IP_META_KEY", "REMOTE_ADDR")
+RATELIMITS = {
+    "apply": "10/h",
+    "review": "5/h",
+}
+
+
+""" Admission control, see base/admission.py """
+ADMISSION_CONTROL_ENABLED = True
+ADMISSION_CACHE = "default"
+# Per process thresholds above which load is shed.
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+ADMISSION_DB_LATENCY_THRESHOLD = float(
+    os.getenv("ADMISSION_DB_LATENCY_THRESHOLD", "0.25")
+)
+# Public pages served to anonymous users from their last known good rendering while overloaded.
+ADMISSION_STALE_VIEWS = [
+    "offers:home",
+    "offers:offer-detail",
+    "offers:company-detail",
+    "study:study_list",
+]
+ADMISSION_STALE_REFRESH = 60
+ADMISSION_STALE_TTL = 24 * 60 * 60
+# Requests rejected with a 503 while overloaded.
+ADMISSION_LOW_PRIORITY_VIEWS = [
+    "offers:companies-list",
+    "offers:company-offers",
+    "offers:company-reviews",
+    "dashboard:generate-csv",
+    "dashboard:talent-pool",
+]
+ADMISSION_RETRY_AFTER = 10
+
+
+""" Fair sharing of Celery workers, see base/fairshare.py """
+TASK_FAIR_SHARE_CACHE = "default"
+# Tasks running at the same time per task and company, further ones are retried after the delay in seconds.
+TASK_FAIR_SHARE_LIMIT = 1
+TASK_FAIR_SHARE_RETRY_DELAY = 5
+# Seconds after which the count of running tasks is reset, in case a worker died without releasing its slot.
+TASK_FAIR_SHARE_TIMEOUT = 60 * 60
+
+
+""" Transactional outbox, see accounts/outbox.py """
+OUTBOX_CACHE = "default"
+OUTBOX_BATCH_SIZE = 100
+# Seconds the dispatcher sleeps when the outbox is drained.
+OUTBOX_POLL_INTERVAL = 1.0
+# Seconds dispatched messages and their delivery marks are kept, duplicates are detected within this window.
+OUTBOX_RETENTION = 7 * 24 * 60 * 60
+
+
+""" Background publishing of tasks, see base/enqueue.py """
+# Publishes in the request thread when False, e.g. to debug publishing, and in tests (see base/test_settings.py).
+ENQUEUE_BUFFERED = True
+ENQUEUE_BUFFER_SIZE = 1000
+# "spill" to ENQUEUE_SPILL_DIR or "drop" the tasks that do not fit the buffer.
+ENQUEUE_OVERFLOW = "spill"
+ENQUEUE_SPILL_DIR = os.getenv("ENQUEUE_SPILL_DIR", os.path.join(BASE_DIR, ".spill"))
+ENQUEUE_SPILL_REPLAY_INTERVAL = 30
+ENQUEUE_BREAKER_THRESHOLD = 3
+ENQUEUE_BREAKER_RESET = 10
+# Seconds a process waits at exit for its buffer to be published.
+ENQUEUE_FLUSH_TIMEOUT = 5
+
+
+""" Match scores of applications, see dashboard/matchscore.py """
+MATCH_SCORE_CACHE = "default"
+# Seconds new applications are collected before they are scored together.
+MATCH_SCORE_DELAY = 30
+MATCH_SCORE_BATCH_SIZE = 500
+MATCH_SCORE_WEIGHTS = {"skills": 0.7, "pay": 0.3}
+# How far above the top of the salary range, as a share of it, the expected pay lowers the pay part to 0.
+MATCH_SCORE_PAY_TOLERANCE = 0.5
+
+
+""" Link checks of study resources, see study/linkcheck.py """
+# Requests in flight at a time, and per host, each host's requests start at least LINKCHECK_HOST_DELAY seconds apart.
+LINKCHECK_CONCURRENCY = 20
+LINKCHECK_PER_HOST = 2
+LINKCHECK_HOST_DELAY = 1.0
+# Seconds a request may take in total, including redirects and reading the body.
+LINKCHECK_TIMEOUT = 15
+LINKCHECK_MAX_REDIRECTS = 5
+# Bytes read of a page to find its OpenGraph tags, and the largest preview image fetched.
+LINKCHECK_MAX_PAGE_BYTES = 512 * 1024
+LINKCHECK_MAX_IMAGE_BYTES = 5 * 1024 * 1024
+LINKCHECK_PREVIEW_SIZE = (320, 180)
+LINKCHECK_USER_AGENT = "JobsPortalLinkChecker/1.0"
+# Failed checks in a row after which a link is dead and can be hidden from the study page.
+LINKCHECK_DEAD_AFTER = 3
+# Resources checked per event loop run.
+LINKCHECK_BATCH_SIZE = 500
+
+
+""" Bulk import of study resources, see study/importer.py """
+# Resources inserted per INSERT statement.
+STUDY_IMPORT_BATCH_SIZE = 1000
+# Rejected rows listed after an import in the admin, the command prints all of them.
+STUDY_IMPORT_REPORT_LIMIT = 100
+
+
+""" Study resources recommended for offer requirements, see study/matching.py """
+STUDY_MATCH_CACHE = "default"
+# Seconds the matches of a requirement are cached, they are dropped from the cache as soon as they change.
+STUDY_MATCH_CACHE_TIMEOUT = 24 * 60 * 60
+# The weighted share of a requirement's terms a resource must cover to be recommended for it.
+STUDY_MATCH_MIN_SCORE = 0.3
+STUDY_RESOURCES_PER_REQUIREMENT = 10
+# Resources shown on an offer page.
+STUDY_OFFER_RESOURCES = 5
+
+
+""" Offer recommendations for applicants, see offers/recommender.py """
+RECOMMENDER_TOP_N = 10
+# Users scored with one matrix product, the product holds a float for every user of a batch and every offer.
+RECOMMENDER_BATCH_SIZE = 256
+# How much the similarity of the texts and of each attribute of two offers counts, summing to 1.
+RECOMMENDER_FEATURE_WEIGHTS = {
+    "text": 0.6,
+    "position": 0.2,
+    "level": 0.1,
+    "localization": 0.1,
+}
+
+
+""" Similar offers, see offers/similarity.py """
+SIMILAR_OFFERS_K = 5
+SIMILAR_OFFERS_MIN_SCORE = 0.3
+# How much the overlap of the requirements and each attribute of two offers counts, summing to 1.
+SIMILAR_OFFERS_WEIGHTS = {
+    "requirements": 0.4,
+    "position": 0.25,
+    "level": 0.15,
+    "localization": 0.1,
+    "salary": 0.1,
+}
+# Width of the salary bands, offers in the same band count as equally paid and in adjacent ones as half so.
+SIMILAR_OFFERS_SALARY_BAND = 2000
+# Offers compared with all others at a time, the comparison holds a float for every offer of a batch and every offer.
+SIMILAR_OFFERS_BATCH_SIZE = 256
+
+
+""" Salary benchmarks, see offers/salaries.py """
+SALARY_BENCHMARK_CACHE = "default"
+# Longer than the refresh interval of refresh_salary_benchmarks_task, which replaces the cached table.
+SALARY_BENCHMARK_CACHE_TIMEOUT = 12 * 60 * 60
+# Groups with fewer offers are not benchmarked, so no single company's salaries can be read from them.
+SALARY_BENCHMARK_MIN_OFFERS = 3
+
+
+""" N+1 query detection, meant for development and staging """
+# Off in tests, see base/test_settings.py.
+NPLUSONE_DETECTION = DEBUG
+NPLUSONE_THRESHOLD = 5
+# Fail the request instead of only logging, so new N+1 patterns cannot go unnoticed.
+NPLUSONE_RAISE = os.getenv("NPLUSONE_RAISE") == "1"
+
+
+""" Async views """
+# Serve the read-heavy pages with their async views, for deployments behind an ASGI server.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS") == "1"
+# Let async views run independent queries concurrently, each on a connection of its own.
+ASYNC_CONCURRENT_QUERIES = True
+
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -72,11 +346,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "base.middleware.MetricsMiddleware",
+    "base.middleware.QueryShapeMiddleware",
+    "base.middleware.AdmissionControlMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "base.middleware.IdentityMapMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -146,6 +424,20 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# New passwords are hashed with the first hasher, hashes of the others are upgraded on the next login.
+# The cost of the calibrated hashers is read from PASSWORD_HASHER_PARAMETERS, see accounts/hashers.py.
+PASSWORD_HASHERS = [
+    "accounts.hashers.CalibratedPBKDF2PasswordHasher",
+    "accounts.hashers.CalibratedScryptPasswordHasher",
+    "accounts.hashers.CalibratedArgon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+# Written by the calibrate_hashers command on each host.
+PASSWORD_HASHER_PARAMETERS = os.getenv(
+    "PASSWORD_HASHER_PARAMETERS", os.path.join(BASE_DIR, "password_hashers.json")
+)
+PASSWORD_HASHING_TARGET_MS = 100
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -165,6 +457,28 @@ USE_TZ = True
 STATIC_URL = "static/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/media/"
+# Files only downloadable through permission-checked views, such as CVs. Must not be served by the web server
+# directly, set it to a directory shared by all web nodes.
+PRIVATE_MEDIA_ROOT = os.getenv("PRIVATE_MEDIA_ROOT", os.path.join(BASE_DIR, "private"))
+
+STORAGES = {
+    "default": {
+        "BACKEND": "base.storage.ContentAddressedStorage",
+    },
+    "private": {
+        "BACKEND": "base.storage.ContentAddressedStorage",
+        "OPTIONS": {"location": PRIVATE_MEDIA_ROOT},
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+""" Offloaded downloads of private files, see base/sendfile.py """
+# "nginx" (X-Accel-Redirect), "xsendfile" (X-Sendfile) or "simple" (streamed by Django, development only).
+SENDFILE_BACKEND = os.getenv("SENDFILE_BACKEND", "simple" if DEBUG else "nginx")
+# The internal nginx location aliased to PRIVATE_MEDIA_ROOT.
+SENDFILE_URL = "/protected/"
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
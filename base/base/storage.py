@@ -0,0 +1,74 @@
+"""
+Content-addressed file storage.
+
+Uploads are hashed while they are streamed to disk and stored under the SHA-256 of their content, so
+identical files, e.g. the same CV sent by a repeat applicant, are kept only once.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage, storages
+
+_HASHED_NAME = re.compile(r"^[0-9a-f]{64}$")
+
+
+def content_hash(name) -> str:
+    """
+    Returns the SHA-256 a content-addressed file is stored under, or None for other file names.
+    """
+    stem = posixpath.splitext(posixpath.basename(str(name)))[0]
+    return stem if _HASHED_NAME.match(stem) else None
+
+
+def get_private_storage():
+    """
+    Returns the storage of files that must only be downloaded through permission-checked views,
+    configured as STORAGES["private"].
+    """
+    return storages["private"]
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    A file system storage that names files by the hash of their content.
+    The directory given by upload_to is kept, and the hash is split into two levels of subdirectories,
+    e.g. "resumes/ab/cd/abcd...ef.pdf". Files are shared by every row that uploaded the same content,
+    so they must not be deleted together with a single row.
+    The location can be a directory shared by all web nodes, e.g. a network file system.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is chosen by _save() from the content, a name that already exists is reused.
+        return name
+
+    def hashed_name(self, directory, digest, extension) -> str:
+        return posixpath.join(directory, digest[:2], digest[2:4], digest + extension)
+
+    def _save(self, name, content):
+        directory, basename = posixpath.split(name)
+        extension = posixpath.splitext(basename)[1].lower()
+        os.makedirs(self.location, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.location, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            name = self.hashed_name(directory, digest.hexdigest(), extension)
+            path = self.path(name)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                # Atomic, a concurrent upload of the same content writes identical bytes.
+                os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
@@ -0,0 +1,19 @@
+"""
+Django settings for the test suite, "python manage.py test" uses them by default.
+
+Other runners, such as pytest-django or "python -m django test", select them with DJANGO_SETTINGS_MODULE or
+--settings=base.test_settings.
+"""
+
+from .settings import *  # noqa: F401, F403
+
+# Tasks are published to an in-memory broker in the request thread, they never leave the process.
+CELERY_BROKER_URL = "memory://"
+CELERY_RESULT_BACKEND = "cache+memory://"
+ENQUEUE_BUFFERED = False
+# Tests never write spill files, those that test spilling point ENQUEUE_SPILL_DIR at a temporary directory.
+ENQUEUE_OVERFLOW = "drop"
+
+# Off, so a green run prints no warnings. The detector's own tests enable it with override_settings, and view
+# tests guard their query counts with assertNumQueries.
+NPLUSONE_DETECTION = False
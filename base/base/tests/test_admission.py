@@ -0,0 +1,145 @@
+from unittest import mock
+
+from accounts.models import CustomUser
+from base import admission
+from base.admission import LoadTracker
+from dashboard.models import (
+    Level,
+    Position,
+    Country,
+    Localization,
+    Requirements,
+    Offer,
+)
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+
+class LoadTrackerTestCase(SimpleTestCase):
+    """
+    Test cases for tracking the load of a process.
+    """
+
+    def test_slow_queries_overload_until_their_latency_decays(self) -> None:
+        """
+        Test that slow queries mark the process overloaded, and that it recovers once no queries run.
+        """
+        with mock.patch("base.admission.time.monotonic", return_value=100.0):
+            tracker = LoadTracker()
+            for _ in range(10):
+                tracker.observe_query(2.0)
+            self.assertTrue(tracker.overloaded())
+
+        with mock.patch("base.admission.time.monotonic", return_value=160.0):
+            self.assertFalse(tracker.overloaded())
+
+    def test_clock_going_backwards_counts_as_no_time(self) -> None:
+        """
+        Test that a clock reading before the last update neither overflows nor inflates the latency.
+        """
+        with mock.patch("base.admission.time.monotonic", return_value=1e9):
+            tracker = LoadTracker()
+            tracker.observe_query(2.0)
+        with mock.patch("base.admission.time.monotonic", return_value=0.0):
+            tracker.observe_query(2.0)
+            self.assertLessEqual(tracker.db_latency(), 2.0)
+
+    def test_requests_in_flight_overload(self) -> None:
+        """
+        Test that more requests in flight than ADMISSION_MAX_IN_FLIGHT mark the process overloaded.
+        """
+        tracker = LoadTracker()
+        with self.settings(ADMISSION_MAX_IN_FLIGHT=2):
+            for _ in range(3):
+                tracker.enter()
+            self.assertTrue(tracker.overloaded())
+            tracker.exit()
+            self.assertFalse(tracker.overloaded())
+
+
+class AdmissionControlMiddlewareTestCase(TestCase):
+    """
+    Test cases for shedding load while the process is overloaded.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        company = CustomUser.objects.create(
+            role="company", username="Nokia", email="nokia123@wp.pl"
+        )
+        CustomUser.objects.create_user(
+            role="user", username="user", email="user@example.com", password="Test123@"
+        )
+        offer = Offer.objects.create(
+            name="Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Python Developer",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=company,
+            address="Zielona 4",
+        )
+        offer.requirements.add(Requirements.objects.create(name="Git"))
+        self.client = Client()
+        self.overloaded = mock.patch.object(
+            admission.tracker, "overloaded", return_value=True
+        )
+
+    def test_anonymous_users_get_the_last_good_rendering(self) -> None:
+        """
+        Test that an overloaded process serves anonymous users the stored page without querying the database.
+        """
+        fresh = self.client.get(reverse("offers:home"))
+
+        with self.overloaded, self.assertNumQueries(0):
+            stale = self.client.get(reverse("offers:home"))
+
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale["X-Stale-Content"], "1")
+        self.assertEqual(stale.content, fresh.content)
+
+    def test_query_strings_do_not_add_stale_copies(self) -> None:
+        """
+        Test that only the bare page and its page numbers are kept, so varying the query string cannot fill
+        the cache, and that page numbers are normalized.
+        """
+        home = reverse("offers:home")
+        for query in ("?name=Python", "?page=1&utm=1", "?page=x", "?page=1"):
+            self.client.get(home + query)
+
+        with self.overloaded:
+            stale = self.client.get(home + "?page=01")
+            fresh = [
+                self.client.get(home + query)
+                for query in ("?name=Python", "?page=1&utm=1", "?page=x")
+            ]
+
+        self.assertEqual(stale["X-Stale-Content"], "1")
+        for response in fresh:
+            self.assertNotIn("X-Stale-Content", response)
+
+    def test_low_priority_requests_are_rejected(self) -> None:
+        """
+        Test that an overloaded process rejects low-priority requests with a 503 and Retry-After.
+        """
+        with self.overloaded:
+            response = self.client.get(reverse("offers:companies-list"))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+    def test_authenticated_users_are_admitted(self) -> None:
+        """
+        Test that logged in users keep getting fresh pages while the process is overloaded.
+        """
+        self.client.get(reverse("offers:home"))
+        self.client.login(username="user", password="Test123@")
+
+        with self.overloaded:
+            response = self.client.get(reverse("offers:home"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Stale-Content", response)
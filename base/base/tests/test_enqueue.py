@@ -0,0 +1,160 @@
+import json
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from base import enqueue
+from base.enqueue import BufferedPublisher, CircuitBreaker
+from django.conf import settings
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from offers.tasks import update_similar_offers_task
+
+
+class CircuitBreakerTestCase(SimpleTestCase):
+    """
+    Test cases for the circuit breaker of the broker.
+    """
+
+    def test_breaker_opens_after_consecutive_failures_and_closes_on_success(
+        self,
+    ) -> None:
+        """
+        Test that the breaker opens at the threshold, lets a probe through after the timeout and closes on success.
+        """
+        breaker = CircuitBreaker(threshold=2, reset_timeout=10)
+        with mock.patch("base.enqueue.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            self.assertEqual(breaker.wait_time(), 0.0)
+            breaker.record_failure()
+            self.assertEqual(breaker.wait_time(), 10.0)
+
+        with mock.patch("base.enqueue.time.monotonic", return_value=111.0):
+            self.assertEqual(breaker.wait_time(), 0.0)
+            breaker.record_success()
+            breaker.record_failure()
+            self.assertEqual(breaker.wait_time(), 0.0)
+
+
+class BufferedPublisherTestCase(SimpleTestCase):
+    """
+    Test cases for publishing tasks from a buffer in a background thread.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.spill_dir = directory.name
+        settings = override_settings(
+            ENQUEUE_SPILL_DIR=self.spill_dir,
+            ENQUEUE_OVERFLOW="spill",
+            ENQUEUE_BREAKER_RESET=60,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.publisher = BufferedPublisher()
+        self.addCleanup(self.publisher.flush, 0)
+
+    def spilled(self) -> list:
+        messages = []
+        for name in os.listdir(self.spill_dir):
+            with open(os.path.join(self.spill_dir, name)) as file:
+                messages += [json.loads(line) for line in file]
+        return messages
+
+    def test_submit_returns_before_the_task_is_published(self) -> None:
+        """
+        Test that submit() does not wait for the broker, and that the thread publishes the task afterwards.
+        """
+        release = threading.Event()
+        published = []
+
+        def publish(message):
+            release.wait(5)
+            published.append(message["task"])
+
+        with mock.patch.object(self.publisher, "publish", side_effect=publish):
+            self.publisher.submit("accounts.tasks.test_task", (1,))
+            self.assertEqual(published, [])
+            release.set()
+            self.publisher.flush(timeout=5)
+
+        self.assertEqual(published, ["accounts.tasks.test_task"])
+
+    def test_unpublished_tasks_are_spilled_while_the_breaker_is_open(self) -> None:
+        """
+        Test that broker errors open the breaker, and that tasks still buffered at exit are spilled to disk.
+        """
+        with mock.patch.object(
+            self.publisher, "publish", side_effect=ConnectionError
+        ), self.assertLogs("base.enqueue", "WARNING"):
+            self.publisher.submit("accounts.tasks.test_task", (1,))
+            for _ in range(50):
+                if self.publisher.breaker.wait_time():
+                    break
+                threading.Event().wait(0.01)
+            self.publisher.submit("accounts.tasks.test_task", (2,))
+            self.publisher.flush(timeout=1)
+
+        self.assertEqual([message["args"] for message in self.spilled()], [[1], [2]])
+
+    @override_settings(ENQUEUE_BUFFER_SIZE=0, ENQUEUE_OVERFLOW="drop")
+    def test_overflowing_tasks_are_dropped(self) -> None:
+        """
+        Test that tasks that do not fit the buffer are dropped with the drop policy.
+        """
+        with mock.patch.object(self.publisher, "publish") as publish, self.assertLogs(
+            "base.enqueue", "ERROR"
+        ):
+            self.publisher.submit("accounts.tasks.test_task", (1,))
+            self.publisher.flush(timeout=1)
+
+        publish.assert_not_called()
+        self.assertEqual(self.spilled(), [])
+
+    @override_settings(ENQUEUE_BUFFER_SIZE=0)
+    def test_spilled_tasks_are_replayed(self) -> None:
+        """
+        Test that spilled tasks are published by replay_spilled() and removed from disk.
+        """
+        self.publisher.submit("accounts.tasks.test_task", (1,), {"a": 2})
+        self.assertEqual(len(self.spilled()), 1)
+
+        with mock.patch.object(self.publisher, "publish") as publish:
+            self.assertEqual(self.publisher.replay_spilled(), 1)
+
+        publish.assert_called_once_with(
+            {
+                "task": "accounts.tasks.test_task",
+                "args": [1],
+                "kwargs": {"a": 2},
+                "options": {},
+            }
+        )
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+
+class TestSettingsTestCase(TestCase):
+    """
+    Test cases for publishing tasks while the tests run.
+    """
+
+    def test_tasks_never_leave_the_process(self) -> None:
+        """
+        Test that tasks queued on commit are published to the in-memory broker, without the background thread
+        or spill files.
+        """
+        spill_file = os.path.join(
+            settings.ENQUEUE_SPILL_DIR, f"spill-{os.getpid()}.jsonl"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.on_commit(
+                lambda: enqueue.enqueue(update_similar_offers_task, [1])
+            )
+
+        self.assertEqual(settings.SETTINGS_MODULE, "base.test_settings")
+        self.assertEqual(settings.CELERY_BROKER_URL, "memory://")
+        self.assertIsNone(enqueue.publisher.thread)
+        self.assertFalse(os.path.exists(spill_file))
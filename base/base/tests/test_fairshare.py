@@ -0,0 +1,71 @@
+from accounts.tasks import send_email_task
+from base.celery import app
+from celery.exceptions import Retry
+from django.core import mail
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+KEY = f"fairshare:{send_email_task.name}:1"
+
+
+class FairShareTaskTestCase(SimpleTestCase):
+    """
+    Test cases for sharing the workers fairly between companies.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_task_runs_and_releases_its_slot(self) -> None:
+        """
+        Test that a task of a company with a free slot runs and releases the slot afterwards.
+        """
+        send_email_task("user@example.com", "Subject", "Message", company_id=1)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(cache.get(KEY), 0)
+
+    def test_task_is_retried_while_the_company_uses_its_slots(self) -> None:
+        """
+        Test that a task is put back in the queue while the company already runs TASK_FAIR_SHARE_LIMIT tasks.
+        """
+        cache.set(KEY, 1)
+
+        with self.assertRaises(Retry):
+            send_email_task("user@example.com", "Subject", "Message", company_id=1)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(cache.get(KEY), 1)
+
+    def test_other_companies_are_not_limited(self) -> None:
+        """
+        Test that the tasks of one company do not hold back those of another company or without a company.
+        """
+        cache.set(KEY, 1)
+
+        send_email_task("user@example.com", "Subject", "Message", company_id=2)
+        send_email_task("user@example.com", "Subject", "Message")
+
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class TaskRoutingTestCase(SimpleTestCase):
+    """
+    Test cases for routing tasks to their queues.
+    """
+
+    def test_tasks_are_routed_to_their_queues(self) -> None:
+        """
+        Test that mail goes to the transactional queue and image processing to the heavy queue.
+        """
+        router = app.amqp.router
+
+        self.assertEqual(
+            router.route({}, "accounts.tasks.send_email_task")["queue"].name,
+            "transactional",
+        )
+        self.assertEqual(
+            router.route({}, "accounts.tasks.generate_image_variants_task")[
+                "queue"
+            ].name,
+            "heavy",
+        )
@@ -0,0 +1,109 @@
+from accounts.models import CustomUser
+from base.identity import IdentityMap
+from dashboard.models import (
+    Application,
+    Country,
+    Level,
+    Localization,
+    Offer,
+    Position,
+    Requirements,
+)
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class IdentityMapTestCase(TestCase):
+    """
+    Test cases for sharing the rows loaded during a request.
+    """
+
+    def setUp(self) -> None:
+        self.company = CustomUser.objects.create_user(
+            role="company",
+            username="company",
+            email="company@example.com",
+            password="Test123@",
+        )
+        self.offer = Offer.objects.create(
+            name="Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Python Developer",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=self.company,
+            address="Zielona 4",
+        )
+        self.offer.requirements.add(Requirements.objects.create(name="Git"))
+        self.application = Application.objects.create(
+            first_name="Jan",
+            last_name="Kowalski",
+            email="jan@example.com",
+            phone_number="+48500600700",
+            message="Hello",
+            offer=self.offer,
+            expected_pay=5000,
+        )
+
+    def test_rows_are_loaded_once_with_their_relations(self) -> None:
+        """
+        Test that a row and the relations it is loaded with are queried once and shared afterwards.
+        """
+        identity_map = IdentityMap()
+
+        with self.assertNumQueries(1):
+            application = identity_map.get(
+                Application, self.application.pk, ("offer__company",)
+            )
+            again = identity_map.get(
+                Application, str(self.application.pk), ("offer__company",)
+            )
+            offer = identity_map.get(Offer, self.offer.pk)
+
+        self.assertIs(again, application)
+        self.assertIs(offer, application.offer)
+        self.assertEqual(application.offer.company, self.company)
+
+    def test_registered_instances_are_reused_for_relations(self) -> None:
+        """
+        Test that a relation loaded later resolves to the instance registered before, such as request.user.
+        """
+        identity_map = IdentityMap()
+        company = identity_map.add(CustomUser.objects.get(pk=self.company.pk))
+        application = identity_map.get(Application, self.application.pk)
+
+        with self.assertNumQueries(1):
+            identity_map.get(Application, self.application.pk, ("offer__company",))
+
+        self.assertIs(application.offer.company, company)
+
+    def test_feedback_view_loads_the_application_once(self) -> None:
+        """
+        Test that the feedback view loads the application once for its permission check, form and update.
+        """
+        client = Client()
+        client.login(username="company", password="Test123@")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(
+                reverse(
+                    "dashboard:send-feedback",
+                    kwargs={"application_id": self.application.pk},
+                ),
+                {"email": "jan@example.com", "subject": "Hi", "message": "Thanks"},
+            )
+
+        self.assertEqual(response.status_code, 302)
+        application_selects = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "dashboard_application"' in query["sql"]
+        ]
+        self.assertEqual(len(application_selects), 1)
+        self.application.refresh_from_db()
+        self.assertTrue(self.application.answer)
@@ -0,0 +1,212 @@
+import fcntl
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+from base import metrics
+from base.metrics import Counter, Gauge, Histogram, Registry
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+
+class MetricsRegistryTestCase(TestCase):
+    """
+    Test cases for the metrics registry and the Prometheus exposition.
+    """
+
+    def setUp(self) -> None:
+        self.registry = Registry()
+        self.counter = Counter("jobs_test", "Test counter.", registry=self.registry)
+        self.histogram = Histogram(
+            "jobs_test_seconds",
+            "Test histogram.",
+            registry=self.registry,
+            buckets=(1, 5),
+        )
+
+    def write_other_process(self, directory, samples, alive=True):
+        """
+        Writes the samples file of another process, returning its lock file held open while it is alive.
+        """
+        with open(os.path.join(directory, "metrics-1-1.json"), "w") as file:
+            json.dump(samples, file)
+        lock_file = open(os.path.join(directory, "metrics-1-1.lock"), "w")
+        if alive:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.close()
+        return lock_file
+
+    def test_counter_and_histogram_are_rendered_in_prometheus_format(self) -> None:
+        """
+        Test that counters and histogram buckets are rendered with their labels.
+        """
+        self.counter.inc(view="offers:home")
+        self.counter.inc(2, view="offers:home")
+        self.histogram.observe(3, view="offers:home")
+
+        output = self.registry.exposition()
+
+        self.assertIn("# TYPE jobs_test counter", output)
+        self.assertIn('jobs_test_total{view="offers:home"} 3.0', output)
+        self.assertIn(
+            'jobs_test_seconds_bucket{le="1.0",view="offers:home"} 0.0', output
+        )
+        self.assertIn(
+            'jobs_test_seconds_bucket{le="5.0",view="offers:home"} 1.0', output
+        )
+        self.assertIn('jobs_test_seconds_count{view="offers:home"} 1.0', output)
+
+    def test_samples_from_other_processes_are_aggregated(self) -> None:
+        """
+        Test that samples written by other processes to METRICS_DIR are summed with the local ones,
+        and that "max" gauges keep the largest value.
+        """
+        gauge = Gauge(
+            "jobs_test_lag",
+            "Test gauge.",
+            registry=self.registry,
+            multiprocess_mode="max",
+        )
+        with tempfile.TemporaryDirectory() as directory, self.settings(
+            METRICS_DIR=directory
+        ):
+            other_process = self.write_other_process(
+                directory,
+                [
+                    ["jobs_test:total", [["view", "offers:home"]], 4],
+                    ["jobs_test_lag", [], 10],
+                ],
+            )
+            self.counter.inc(view="offers:home")
+            gauge.set(3)
+            self.registry.flush()
+
+            with other_process:
+                output = self.registry.exposition()
+                files = os.listdir(directory)
+
+        self.assertEqual(
+            sorted(name.rsplit(".", 1)[1] for name in files),
+            ["json", "json", "lock", "lock"],
+        )
+        self.assertIn('jobs_test_total{view="offers:home"} 5.0', output)
+        self.assertIn("jobs_test_lag 10.0", output)
+
+    def test_files_of_dead_processes_are_archived_and_deleted(self) -> None:
+        """
+        Test that once a process no longer holds its lock, its counters are kept in the archive, its gauges
+        are dropped and its files are deleted, without counting its samples twice.
+        """
+        gauge = Gauge("jobs_test_lag", "Test gauge.", registry=self.registry)
+        with tempfile.TemporaryDirectory() as directory, self.settings(
+            METRICS_DIR=directory
+        ):
+            self.write_other_process(
+                directory,
+                [
+                    ["jobs_test:total", [["view", "offers:home"]], 4],
+                    ["jobs_test_lag", [], 10],
+                ],
+                alive=False,
+            )
+            self.counter.inc(view="offers:home")
+            gauge.set(3)
+
+            output = self.registry.exposition()
+            files = sorted(os.listdir(directory))
+            self.assertEqual(self.registry.exposition(), output)
+
+        self.assertEqual(files, ["metrics-archive.json", "metrics-archive.lock"])
+        self.assertIn('jobs_test_total{view="offers:home"} 5.0', output)
+        self.assertIn("jobs_test_lag 3.0", output)
+
+    def test_flushing_process_is_not_pruned(self) -> None:
+        """
+        Test that the file of a process that flushed is kept while the process lives, and pruned once the
+        registry lets go of its lock, as a forked child does with its parent's.
+        """
+        with tempfile.TemporaryDirectory() as directory, self.settings(
+            METRICS_DIR=directory
+        ):
+            self.counter.inc(view="offers:home")
+            self.registry.flush()
+            other = Registry()
+
+            kept = other.prune(directory)
+            self.registry._reset()
+            pruned = other.prune(directory)
+
+        self.assertEqual((kept, pruned), (0, 1))
+
+
+class MetricsViewTestCase(TestCase):
+    """
+    Test cases for the metrics middleware and the metrics endpoint.
+    """
+
+    def setUp(self) -> None:
+        self.client = Client()
+
+    def test_requests_are_counted_by_url_name(self) -> None:
+        """
+        Test that a request to a view is counted under its URL name and status code.
+        """
+        self.client.get(reverse("offers:home"))
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'http_requests_total{method="GET",status="200",view="offers:home"}',
+            response.content.decode(),
+        )
+        self.assertIn(
+            'http_request_db_duration_seconds_count{view="offers:home"}',
+            response.content.decode(),
+        )
+
+    @override_settings(METRICS_ALLOWED_IPS=["10.0.0.1"])
+    def test_metrics_endpoint_is_hidden_from_other_addresses(self) -> None:
+        """
+        Test that the metrics endpoint returns 404 for addresses outside METRICS_ALLOWED_IPS.
+        """
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 404)
+
+
+class CeleryMetricsTestCase(TestCase):
+    """
+    Test cases for the Celery signal handlers.
+    """
+
+    def test_task_signals_record_queue_wait_runtime_and_failures(self) -> None:
+        """
+        Test that the task signal handlers record queue wait, run time, state and failures.
+        """
+        headers = {}
+        metrics._before_task_publish(headers=headers)
+        task = SimpleNamespace(
+            name="accounts.tasks.test_task",
+            request=SimpleNamespace(published_at=headers["published_at"]),
+        )
+
+        metrics._task_prerun(task_id="1", task=task)
+        metrics._task_failure(sender=task)
+        metrics._task_postrun(task_id="1", task=task, state="FAILURE")
+        output = metrics.REGISTRY.exposition()
+
+        self.assertIn(
+            'celery_task_queue_wait_seconds_count{task="accounts.tasks.test_task"}',
+            output,
+        )
+        self.assertIn(
+            'celery_task_runtime_seconds_count{task="accounts.tasks.test_task"}', output
+        )
+        self.assertIn(
+            'celery_tasks_total{state="FAILURE",task="accounts.tasks.test_task"}',
+            output,
+        )
+        self.assertIn(
+            'celery_task_failures_total{task="accounts.tasks.test_task"}', output
+        )
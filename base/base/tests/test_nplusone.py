@@ -0,0 +1,87 @@
+from accounts.models import CustomUser
+from base.nplusone import NPlusOneError, fingerprint
+from dashboard.models import (
+    Level,
+    Position,
+    Country,
+    Localization,
+    Requirements,
+    Offer,
+)
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+
+class FingerprintTestCase(TestCase):
+    """
+    Test cases for reducing SQL statements to their shape.
+    """
+
+    def test_queries_differing_only_in_values_share_a_fingerprint(self) -> None:
+        """
+        Test that literals and the length of IN lists do not change the fingerprint.
+        """
+        self.assertEqual(
+            fingerprint('SELECT * FROM "offer" WHERE "id" = 1 AND "name" = \'a\''),
+            fingerprint('SELECT * FROM "offer" WHERE "id" = 25 AND "name" = \'b\''),
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM "offer" WHERE "id" IN (%s, %s, %s)'),
+            fingerprint('SELECT * FROM "offer" WHERE "id" IN (%s)'),
+        )
+
+
+@override_settings(NPLUSONE_DETECTION=True, NPLUSONE_THRESHOLD=3)
+class QueryShapeMiddlewareTestCase(TestCase):
+    """
+    Test cases for the N+1 query detection middleware.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a company with enough offers for the home page to repeat its per-offer queries.
+        """
+        self.client = Client()
+        company = CustomUser.objects.create(
+            role="company", username="Nokia", email="nokia123@wp.pl", password="XXXXXXX"
+        )
+        position = Position.objects.create(position_name="Python")
+        level = Level.objects.create(level_name="Junior")
+        localization = Localization.objects.create(
+            country=Country.objects.create(name="Poland"), city="Warsaw"
+        )
+        requirement = Requirements.objects.create(name="Git")
+        for number in range(5):
+            offer = Offer.objects.create(
+                name=f"Python Developer {number}",
+                position=position,
+                level=level,
+                description="Python Developer",
+                localization=localization,
+                company=company,
+                address="Zielona 4",
+            )
+            offer.requirements.add(requirement)
+
+    @override_settings(NPLUSONE_RAISE=True)
+    def test_repeated_queries_raise_with_template_and_property(self) -> None:
+        """
+        Test that the repeated per-offer queries raise and point at the template line and model property.
+        """
+        with self.assertLogs("base.nplusone", level="WARNING"), self.assertRaises(
+            NPlusOneError
+        ) as error:
+            self.client.get(reverse("offers:home"))
+
+        self.assertIn("home_page.html:", str(error.exception))
+        self.assertIn("in return_requirements", str(error.exception))
+
+    def test_repeated_queries_are_logged_without_raising(self) -> None:
+        """
+        Test that repeated queries are only logged when NPLUSONE_RAISE is disabled.
+        """
+        with self.assertLogs("base.nplusone", level="WARNING") as logs:
+            response = self.client.get(reverse("offers:home"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("N+1 queries in GET /", logs.output[0])
@@ -0,0 +1,48 @@
+from accounts.models import CustomUser
+from base.pagination import KeysetPaginator
+from django.core.paginator import InvalidPage
+from django.test import TestCase
+from offers.models import CompanyReview
+
+
+class KeysetPaginatorTestCase(TestCase):
+    """
+    Test cases for keyset pagination.
+    """
+
+    def setUp(self) -> None:
+        company = CustomUser.objects.create(
+            role="company", username="Nokia", email="nokia123@wp.pl"
+        )
+        for rate in (5, 3, 5, 4, 5, 1, 3):
+            CompanyReview.objects.create(
+                choose_rate=rate,
+                email="user@example.com",
+                short_description="Review",
+                company=company,
+            )
+        self.queryset = CompanyReview.objects.all()
+
+    def test_pages_follow_each_other_without_gaps_or_duplicates(self) -> None:
+        """
+        Test that walking the cursors returns every row once, in order, including rows with equal keys.
+        """
+        paginator = KeysetPaginator(self.queryset, ("-choose_rate", "-id"), 3)
+        seen = []
+        page = paginator.page()
+        while True:
+            seen.extend(page.object_list)
+            if not page.has_next:
+                break
+            page = paginator.page(page.next_cursor)
+
+        expected = list(self.queryset.order_by("-choose_rate", "-id"))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_raises_invalid_page(self) -> None:
+        """
+        Test that a cursor that was not produced by the paginator raises InvalidPage.
+        """
+        paginator = KeysetPaginator(self.queryset, ("-date_created", "-id"), 3)
+        with self.assertRaises(InvalidPage):
+            paginator.page("not-a-cursor")
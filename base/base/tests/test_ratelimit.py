@@ -0,0 +1,135 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from accounts.models import CustomUser
+from base import ratelimit
+from base.ratelimit import CacheBuckets, LocalBuckets, Rate
+from dashboard.models import Country, Level, Localization, Offer, Position
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+
+class TokenBucketTestCase(SimpleTestCase):
+    """
+    Test cases for the token buckets of the rate limiter.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.rate = Rate.parse("5/m")
+
+    def test_rate_is_parsed(self) -> None:
+        """
+        Test that a rate such as "5/m" is parsed into a bucket of 5 tokens refilled every 12 seconds.
+        """
+        self.assertEqual(self.rate, Rate(5, 60))
+        self.assertEqual(self.rate.interval_ms, 12_000)
+
+    def test_bucket_allows_a_burst_and_refills(self) -> None:
+        """
+        Test that the bucket allows limit requests at once, rejects the next one with the time until a
+        token is refilled, and allows it again after that time.
+        """
+        for buckets in (CacheBuckets(cache), LocalBuckets()):
+            with self.subTest(buckets=type(buckets).__name__):
+                now = 1_000_000
+                for _ in range(5):
+                    self.assertEqual(buckets.take("key", self.rate, now), 0)
+                self.assertEqual(buckets.take("key", self.rate, now), 12_000)
+                self.assertEqual(buckets.take("key", self.rate, now + 6_000), 6_000)
+                self.assertEqual(buckets.take("key", self.rate, now + 12_000), 0)
+                self.assertGreater(buckets.take("key", self.rate, now + 12_000), 0)
+
+    def test_idle_bucket_does_not_save_up_tokens(self) -> None:
+        """
+        Test that a bucket idle for longer than its period holds no more than limit tokens.
+        """
+        buckets = CacheBuckets(cache)
+        buckets.take("key", self.rate, 1_000_000)
+        later = 1_000_000 + 10 * 60_000
+        allowed = sum(buckets.take("key", self.rate, later) == 0 for _ in range(10))
+        self.assertEqual(allowed, 5)
+
+    def test_concurrent_requests_take_exactly_limit_tokens(self) -> None:
+        """
+        Test that concurrent requests on a shared bucket never take more tokens than the bucket holds.
+        """
+        buckets = CacheBuckets(cache)
+        rate = Rate.parse("10/m")
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(
+                executor.map(lambda _: buckets.take("key", rate, 1_000_000), range(100))
+            )
+        self.assertEqual(results.count(0), 10)
+
+
+@override_settings(RATELIMITS={"apply": "2/h", "review": "2/h"})
+class RateLimitedViewsTestCase(TestCase):
+    """
+    Test cases for the rate limited write endpoints.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = CustomUser.objects.create(
+            role="company", username="Nokia", email="nokia123@wp.pl"
+        )
+        self.user = CustomUser.objects.create_user(
+            role="user", username="user", email="user@example.com", password="Test123@"
+        )
+        offer = Offer.objects.create(
+            name="Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Python Developer",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=self.company,
+            address="Zielona 4",
+        )
+        self.url = reverse("offers:apply-offer", args=[offer.id])
+        self.review_url = reverse("offers:add-review", args=[self.company.id])
+
+    def test_requests_over_the_limit_return_429_with_retry_after(self) -> None:
+        """
+        Test that posts over the limit of an IP are rejected with a Retry-After header, while GETs are not limited.
+        """
+        client = Client(REMOTE_ADDR="10.0.0.1")
+        for _ in range(2):
+            self.assertNotEqual(client.post(self.url, {}).status_code, 429)
+
+        response = client.post(self.url, {})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertEqual(client.get(self.url).status_code, 200)
+        self.assertNotEqual(
+            Client(REMOTE_ADDR="10.0.0.2").post(self.url, {}).status_code, 429
+        )
+
+    def test_users_are_limited_across_ips(self) -> None:
+        """
+        Test that a logged in user is limited by their own bucket, whichever IP they post from.
+        """
+        for number in range(3):
+            client = Client(REMOTE_ADDR=f"10.0.1.{number}")
+            client.login(username="user", password="Test123@")
+            response = client.post(self.review_url, {})
+        self.assertEqual(response.status_code, 429)
+
+    def test_unreachable_cache_falls_back_to_local_buckets(self) -> None:
+        """
+        Test that the limiter keeps limiting with local buckets when the shared cache raises.
+        """
+        client = Client(REMOTE_ADDR="10.0.2.1")
+        with mock.patch.object(
+            CacheBuckets, "take", side_effect=ConnectionError
+        ), mock.patch.object(
+            ratelimit, "local_buckets", LocalBuckets()
+        ), self.assertLogs(
+            "base.ratelimit", level="WARNING"
+        ):
+            statuses = [client.post(self.url, {}).status_code for _ in range(3)]
+        self.assertEqual(statuses[-1], 429)
+        self.assertNotIn(429, statuses[:-1])
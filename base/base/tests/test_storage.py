@@ -0,0 +1,50 @@
+import hashlib
+import os
+import tempfile
+
+from base.storage import ContentAddressedStorage, content_hash
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+
+class ContentAddressedStorageTestCase(SimpleTestCase):
+    """
+    Test cases for storing files under the hash of their content.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.storage = ContentAddressedStorage(location=self.directory.name)
+
+    def test_file_is_named_by_its_hash(self) -> None:
+        """
+        Test that the name keeps the upload directory and extension and contains the SHA-256 of the content.
+        """
+        digest = hashlib.sha256(b"curriculum vitae").hexdigest()
+
+        name = self.storage.save("resumes/my cv.PDF", ContentFile(b"curriculum vitae"))
+
+        self.assertEqual(name, f"resumes/{digest[:2]}/{digest[2:4]}/{digest}.pdf")
+        self.assertEqual(content_hash(name), digest)
+        with self.storage.open(name) as stored:
+            self.assertEqual(stored.read(), b"curriculum vitae")
+
+    def test_identical_uploads_are_stored_once(self) -> None:
+        """
+        Test that uploading the same content twice returns the same name and leaves no temporary files.
+        """
+        first = self.storage.save("resumes/a.pdf", ContentFile(b"same"))
+        second = self.storage.save("resumes/b.pdf", ContentFile(b"same"))
+        other = self.storage.save("resumes/c.pdf", ContentFile(b"different"))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        files = [name for _, _, names in os.walk(self.directory.name) for name in names]
+        self.assertEqual(len(files), 2)
+
+    def test_content_hash_of_other_names_is_none(self) -> None:
+        """
+        Test that content_hash() returns None for files that were not stored by hash.
+        """
+        self.assertIsNone(content_hash("resumes/cv.pdf"))
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse
+
+from .metrics import REGISTRY
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Returns the metrics of every web and worker process in the Prometheus text format.
+    The endpoint is internal: requests from addresses outside METRICS_ALLOWED_IPS get a 404.
+    """
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(
+        REGISTRY.exposition(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
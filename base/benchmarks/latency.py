@@ -0,0 +1,75 @@
+"""
+Compares the latency of the WSGI and ASGI deployments of the portal under concurrent load.
+
+Start both servers first, for example with docker-compose (``web`` on port 8000 serves the sync views,
+``web-asgi`` on port 8001 serves the async views), then run:
+
+    python benchmarks/latency.py --path / --path /offer/1/ --path /company/1/
+
+Every path is requested ``--requests`` times by ``--concurrency`` clients against each server, and the
+p50, p95 and p99 latencies are printed side by side.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+
+def fetch(url: str) -> float:
+    """
+    Requests a URL, reads the whole body and returns the elapsed time in milliseconds.
+    """
+    start = time.perf_counter()
+    try:
+        with urlopen(url, timeout=30) as response:
+            response.read()
+    except HTTPError as error:
+        error.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def percentile(values, fraction: float) -> float:
+    """
+    Returns the value below which the given fraction of the sorted values falls.
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(base_url: str, path: str, requests: int, concurrency: int):
+    """
+    Sends the requests for one path with the given concurrency and returns the measured latencies.
+    """
+    url = base_url.rstrip("/") + path
+    fetch(url)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(fetch, [url] * requests))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--wsgi", default="http://127.0.0.1:8000")
+    parser.add_argument("--asgi", default="http://127.0.0.1:8001")
+    parser.add_argument("--path", action="append", default=[])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'path':<24}{'server':<8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for path in args.path or ["/"]:
+        for label, base_url in (("wsgi", args.wsgi), ("asgi", args.asgi)):
+            latencies = run(base_url, path, args.requests, args.concurrency)
+            print(
+                f"{path:<24}{label:<8}"
+                f"{statistics.mean(latencies):>10.1f}"
+                f"{percentile(latencies, 0.50):>10.1f}"
+                f"{percentile(latencies, 0.95):>10.1f}"
+                f"{percentile(latencies, 0.99):>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Text extraction and an inverted index of the CVs attached to applications.
+
+Text is extracted once per distinct file (by SHA-256) and stored normalized in CVText. The distinct terms of
+every application's CV are stored in ApplicationTerm together with the company, so a query such as
+"python AND django" over all applicants of a company only intersects a few index ranges.
+"""
+import hashlib
+import io
+import posixpath
+import re
+import unicodedata
+import zipfile
+from xml.etree import ElementTree
+
+from base.storage import content_hash
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Application, ApplicationTerm, CVText
+
+MAX_TEXT_LENGTH = 200_000
+MAX_TERM_LENGTH = 64
+# Keeps terms such as "c++", "c#" and "node.js" in one piece.
+TERM_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+DOCX_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Words of requirements such as "Knowledge of SQL" that say nothing about the skill.
+STOP_WORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "basic",
+        "experience",
+        "for",
+        "good",
+        "in",
+        "knowledge",
+        "of",
+        "or",
+        "skills",
+        "the",
+        "to",
+        "with",
+    }
+)
+
+
+def normalize(text: str) -> str:
+    """
+    Returns the text in NFKC form, lowercased, with runs of whitespace collapsed to single spaces.
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(text.split())[:MAX_TEXT_LENGTH]
+
+
+def tokenize(text: str) -> set:
+    """
+    Returns the distinct terms of a normalized text.
+    """
+    terms = (term.rstrip(".") for term in TERM_PATTERN.findall(text))
+    return {term for term in terms if term and len(term) <= MAX_TERM_LENGTH}
+
+
+def requirement_terms(name: str) -> set:
+    """
+    Returns the terms of a requirement's name that name the skill, without STOP_WORDS.
+    """
+    return tokenize(normalize(name)) - STOP_WORDS
+
+
+def parse_query(query: str) -> list:
+    """
+    Returns the terms that must all occur, from a query such as "python AND django" or "python django".
+    """
+    return sorted(tokenize(normalize(re.sub(r"\bAND\b", " ", query))))
+
+
+def _pdf_text(data: bytes) -> str:
+    # Imported lazily, the web processes never extract text.
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _docx_text(data: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    return "\n".join(
+        "".join(node.text or "" for node in paragraph.iter(f"{DOCX_NAMESPACE}t"))
+        for paragraph in root.iter(f"{DOCX_NAMESPACE}p")
+    )
+
+
+EXTRACTORS = {".pdf": _pdf_text, ".docx": _docx_text}
+
+
+def extract_text(data: bytes, extension: str) -> tuple:
+    """
+    Returns the normalized text of a PDF or DOCX file and an error message, which is empty on success.
+    Runs in worker processes, so it only takes and returns plain values.
+    """
+    extractor = EXTRACTORS.get(extension.lower())
+    if extractor is None:
+        return "", f"Unsupported file type {extension!r}."
+    try:
+        return normalize(extractor(data)), ""
+    except Exception as error:
+        return "", f"{type(error).__name__}: {error}"[:255]
+
+
+def cv_sha256(application) -> str:
+    """
+    Returns the SHA-256 of an application's CV, read from the name of content-addressed files.
+    """
+    digest = content_hash(application.cv.name)
+    if digest is None:
+        with application.cv.open("rb") as file:
+            digest = hashlib.file_digest(file, "sha256").hexdigest()
+    return digest
+
+
+def extract_cvs(applications, executor=None) -> dict:
+    """
+    Extracts the text of the applications' CVs that have not been extracted yet, in the processes of
+    executor when it is given. Returns the SHA-256 of every application's CV, keyed by application id.
+    """
+    hashes = {}
+    pending = {}
+    for application in applications:
+        digest = cv_sha256(application)
+        hashes[application.id] = digest
+        pending.setdefault(digest, application)
+    for digest in CVText.objects.filter(sha256__in=pending).values_list(
+        "sha256", flat=True
+    ):
+        del pending[digest]
+
+    jobs = []
+    for digest, application in pending.items():
+        with application.cv.open("rb") as file:
+            data = file.read()
+        jobs.append((digest, data, posixpath.splitext(application.cv.name)[1]))
+
+    files = [data for _, data, _ in jobs]
+    extensions = [extension for _, _, extension in jobs]
+    if executor is not None and len(jobs) > 1:
+        results = list(executor.map(extract_text, files, extensions))
+    else:
+        results = list(map(extract_text, files, extensions))
+
+    CVText.objects.bulk_create(
+        [
+            CVText(sha256=digest, text=text, error=error)
+            for (digest, _, _), (text, error) in zip(jobs, results)
+        ],
+        ignore_conflicts=True,
+    )
+    return hashes
+
+
+def index_applications(application_ids, executor=None) -> int:
+    """
+    Extracts the CVs of the given applications, using the processes of executor, e.g. a ProcessPoolExecutor,
+    when it is given, and replaces their postings in the inverted index.
+    Idempotent, running it again for the same applications writes the same postings.
+    Returns the number of postings written.
+    """
+    applications = list(
+        Application.objects.filter(pk__in=application_ids)
+        .exclude(cv="")
+        .exclude(cv=None)
+        .select_related("offer")
+    )
+    hashes = extract_cvs(applications, executor)
+    texts = dict(
+        CVText.objects.filter(sha256__in=set(hashes.values())).values_list(
+            "sha256", "text"
+        )
+    )
+    postings = [
+        ApplicationTerm(
+            company_id=application.offer.company_id,
+            term=term,
+            application=application,
+        )
+        for application in applications
+        for term in tokenize(texts.get(hashes[application.id], ""))
+    ]
+    with transaction.atomic():
+        ApplicationTerm.objects.filter(application__in=application_ids).delete()
+        ApplicationTerm.objects.bulk_create(postings, batch_size=1000)
+    return len(postings)
+
+
+def search_applications(company_id, query: str):
+    """
+    Returns the applications of a company whose CV contains every term of the query.
+    """
+    terms = parse_query(query)
+    if not terms:
+        return Application.objects.none()
+    matching = (
+        ApplicationTerm.objects.filter(company=company_id, term__in=terms)
+        .values("application")
+        .annotate(matched=Count("term"))
+        .filter(matched=len(terms))
+    )
+    return Application.objects.filter(pk__in=matching.values("application"))
@@ -1,3 +1,4 @@
+from accounts import outbox
 from accounts.tasks import send_email_task
 from django import forms
 
@@ -15,13 +16,65 @@ class ReturnApplicationFeedbackForm(forms.Form):
     subject = forms.CharField(widget=forms.TextInput)
     message = forms.CharField(widget=forms.Textarea)
 
-    def send_email(self, email):
+    def send_email(self, email, company_id=None):
         """
         A method that sends an email to the provided email address,
         containing the feedback message and subject, using an asynchronous task.
+        The email is sent through the bulk queue, fairly shared between the companies sending feedback.
+        The task is written to the outbox, so it is only published if the current transaction commits.
         """
-        send_email_task.delay(
-            email,
-            self.cleaned_data["subject"],
-            self.cleaned_data["message"],
+        outbox.enqueue(
+            send_email_task,
+            (email, self.cleaned_data["subject"], self.cleaned_data["message"]),
+            {"company_id": company_id},
+            queue="bulk",
         )
+
+
+class ApplicationFilterForm(forms.Form):
+    """
+    A form used for filtering, searching and sorting the applications for an offer.
+    Attributes:
+        search: A CharField matching the applicant's first name, last name or email.
+        answer: A ChoiceField limiting the list to answered or unanswered applications.
+        min_pay: A DecimalField containing the lowest expected pay.
+        max_pay: A DecimalField containing the highest expected pay.
+        date_from: A DateField containing the first day applications were sent on.
+        date_to: A DateField containing the last day applications were sent on.
+        order_by: A ChoiceField containing the sorting order.
+    """
+
+    ANSWER_CHOICES = (
+        ("", "All"),
+        ("yes", "Answered"),
+        ("no", "Not answered"),
+    )
+    ORDER_CHOICES = (
+        ("newest", "Newest"),
+        ("oldest", "Oldest"),
+        ("pay_desc", "Highest expected pay"),
+        ("pay_asc", "Lowest expected pay"),
+        ("match", "Best match"),
+    )
+
+    search = forms.CharField(required=False, label="Name or email")
+    answer = forms.ChoiceField(choices=ANSWER_CHOICES, required=False)
+    min_pay = forms.DecimalField(required=False, min_value=0, label="Expected pay from")
+    max_pay = forms.DecimalField(required=False, min_value=0, label="Expected pay to")
+    date_from = forms.DateField(
+        required=False, widget=forms.DateInput(attrs={"type": "date"})
+    )
+    date_to = forms.DateField(
+        required=False, widget=forms.DateInput(attrs={"type": "date"})
+    )
+    order_by = forms.ChoiceField(choices=ORDER_CHOICES, required=False, label="Sort by")
+
+
+class TalentPoolSearchForm(forms.Form):
+    """
+    A form used for searching the CVs of all applicants of a company.
+    Attributes:
+        query: A CharField containing the terms that must all occur, e.g. "python AND django".
+    """
+
+    query = forms.CharField(required=False, label="Skills, e.g. python AND django")
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from dashboard import rollups
+from dashboard.models import Offer
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the daily application rollups from the applications table, e.g. after deploying the rollups
+    or to correct them after applications were changed without signals.
+    """
+
+    help = "Rebuilds the daily application rollups of the company dashboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--offer",
+            type=int,
+            action="append",
+            dest="offers",
+            help="Rebuild only the rollups of this offer, can be given several times.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="The number of offers rebuilt in one transaction.",
+        )
+
+    def handle(self, *args, **options):
+        offer_ids = options["offers"] or list(
+            Offer.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        batch_size = options["batch_size"]
+        rows = 0
+        for start in range(0, len(offer_ids), batch_size):
+            rows += rollups.backfill(offer_ids[start : start + batch_size])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows} rollup rows for {len(offer_ids)} offers."
+            )
+        )
@@ -0,0 +1,53 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from dashboard import cvindex
+from dashboard.models import Application
+
+
+class Command(BaseCommand):
+    """
+    Extracts the text of the CVs of all applications, or of the applications without postings, and indexes them.
+    CVs are extracted in a pool of worker processes, CVs that were already extracted are skipped.
+    """
+
+    help = "Extracts and indexes the text of application CVs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Index only applications that have no postings yet.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="The number of worker processes extracting text.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="The number of applications indexed in one batch.",
+        )
+
+    def handle(self, *args, **options):
+        applications = Application.objects.exclude(cv="").exclude(cv=None)
+        if options["missing"]:
+            applications = applications.filter(terms__isnull=True)
+        application_ids = list(applications.order_by("pk").values_list("pk", flat=True))
+
+        batch_size = options["batch_size"]
+        postings = 0
+        with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+            for start in range(0, len(application_ids), batch_size):
+                batch = application_ids[start : start + batch_size]
+                postings += cvindex.index_applications(batch, executor)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {len(application_ids)} applications with {postings} postings."
+            )
+        )
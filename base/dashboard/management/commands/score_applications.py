@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from dashboard import matchscore
+from dashboard.models import Application
+
+
+class Command(BaseCommand):
+    """
+    Computes the match scores of the pending applications, or of all applications, e.g. after deploying the
+    scores or changing their settings.
+    """
+
+    help = "Computes the match scores of applications against their offers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Score all applications again, not only the pending ones.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="The number of applications scored in one batch.",
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            matchscore.mark_pending(Application.objects.all())
+        scored = matchscore.score_pending_applications(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Scored {scored} applications."))
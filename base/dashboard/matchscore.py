@@ -0,0 +1,177 @@
+"""
+Match scores of applications against their offers, so companies can sort applicants by how well they fit.
+
+The score is the weighted mean (MATCH_SCORE_WEIGHTS) of two parts, each from 0 to 1:
+    - skills: the share of the offer's requirements whose terms, without filler words such as "knowledge of",
+      all occur in the application's message or in the terms of its CV, read from the inverted index (see
+      dashboard/cvindex.py),
+    - pay: 1 while the expected pay is within the salary range or below it, falling linearly to 0 at
+      MATCH_SCORE_PAY_TOLERANCE above the top of the range. Offers without a salary never lower it.
+
+Scores are computed in the background, never when the applicants are listed. An application is pending while
+date_scored is None: new applications are, and so are applications whose CV was indexed or whose offer changed.
+Marking an application pending also increments its score_version, and a score is only stored if the version is
+still the one read before computing it, so a change during scoring always leaves the application pending.
+Arrivals within MATCH_SCORE_DELAY seconds are collected into one task, which scores all pending applications
+in batches of MATCH_SCORE_BATCH_SIZE with a few queries per batch.
+"""
+import functools
+import operator
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.utils import timezone
+
+from .cvindex import normalize, requirement_terms, tokenize
+from .models import Application, ApplicationTerm, Offer
+
+QUEUED_KEY = "dashboard:match-scoring-queued"
+# Scores stored per UPDATE statement, SQLite allows 999 parameters per statement.
+UPDATE_CHUNK_SIZE = 200
+
+
+def pay_fit(expected_pay, salary_from, salary_to) -> float:
+    """
+    Returns how well an expected pay fits a salary range, the top of the range being salary_to, or salary_from
+    when it is the only bound.
+    """
+    top = salary_to if salary_to is not None else salary_from
+    if not top or expected_pay <= top:
+        return 1.0
+    excess = (float(expected_pay) - top) / top
+    return max(0.0, 1 - excess / settings.MATCH_SCORE_PAY_TOLERANCE)
+
+
+def skills_fit(requirements, terms) -> float:
+    """
+    Returns the share of requirements, given as sets of terms, whose terms are all in terms.
+    An offer without requirements is fully met.
+    """
+    if not requirements:
+        return 1.0
+    return sum(requirement <= terms for requirement in requirements) / len(requirements)
+
+
+def score_applications(application_ids) -> int:
+    """
+    Computes and stores the match scores of the given applications, unless they were marked pending again
+    meanwhile. Returns the number of applications scored.
+    """
+    applications = list(
+        Application.objects.filter(pk__in=application_ids).only(
+            "pk", "offer_id", "message", "expected_pay", "score_version"
+        )
+    )
+    offer_ids = {application.offer_id for application in applications}
+    salaries = {
+        pk: (salary_from, salary_to)
+        for pk, salary_from, salary_to in Offer.objects.filter(
+            pk__in=offer_ids
+        ).values_list("pk", "salary_from", "salary_to")
+    }
+    requirements = defaultdict(list)
+    for offer_id, name in Offer.requirements.through.objects.filter(
+        offer_id__in=offer_ids
+    ).values_list("offer_id", "requirements__name"):
+        terms = requirement_terms(name)
+        if terms:
+            requirements[offer_id].append(terms)
+
+    # Only the CV terms that occur in some requirement are read from the index.
+    vocabulary = set().union(
+        *(terms for offer in requirements.values() for terms in offer)
+    )
+    cv_terms = defaultdict(set)
+    if vocabulary:
+        for application_id, term in ApplicationTerm.objects.filter(
+            application__in=[application.pk for application in applications],
+            term__in=vocabulary,
+        ).values_list("application_id", "term"):
+            cv_terms[application_id].add(term)
+
+    weights = settings.MATCH_SCORE_WEIGHTS
+    for application in applications:
+        terms = tokenize(normalize(application.message)) | cv_terms[application.pk]
+        skills = skills_fit(requirements[application.offer_id], terms)
+        pay = pay_fit(application.expected_pay, *salaries[application.offer_id])
+        application.match_score = round(
+            (weights["skills"] * skills + weights["pay"] * pay)
+            / (weights["skills"] + weights["pay"]),
+            4,
+        )
+    return store_scores(applications)
+
+
+def store_scores(applications) -> int:
+    """
+    Stores the match_score of the applications whose score_version is unchanged, with one UPDATE per chunk.
+    Returns the number of applications stored.
+    """
+    now = timezone.now()
+    stored = 0
+    for start in range(0, len(applications), UPDATE_CHUNK_SIZE):
+        chunk = applications[start : start + UPDATE_CHUNK_SIZE]
+        unchanged = functools.reduce(
+            operator.or_,
+            (
+                Q(pk=application.pk, score_version=application.score_version)
+                for application in chunk
+            ),
+        )
+        stored += Application.objects.filter(unchanged).update(
+            match_score=Case(
+                *(
+                    When(pk=application.pk, then=Value(application.match_score))
+                    for application in chunk
+                ),
+                default=F("match_score"),
+                output_field=FloatField(),
+            ),
+            date_scored=now,
+        )
+    return stored
+
+
+def score_pending_applications(batch_size=None) -> int:
+    """
+    Scores all pending applications, batch_size (MATCH_SCORE_BATCH_SIZE by default) at a time.
+    Returns the number of applications scored.
+    """
+    batch_size = batch_size or settings.MATCH_SCORE_BATCH_SIZE
+    scored = 0
+    while True:
+        batch = list(
+            Application.objects.filter(date_scored__isnull=True)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not batch:
+            return scored
+        scored += score_applications(batch)
+
+
+def mark_pending(applications) -> int:
+    """
+    Marks a queryset of applications to be scored again, also those whose scoring is in progress.
+    Returns the number of applications marked.
+    """
+    return applications.update(date_scored=None, score_version=F("score_version") + 1)
+
+
+def mark_queued() -> bool:
+    """
+    Returns True when no scoring task is queued yet and marks one as queued, so arrivals until it starts are
+    left to it. The mark expires after twice MATCH_SCORE_DELAY, in case the task is lost.
+    """
+    return caches[settings.MATCH_SCORE_CACHE].add(
+        QUEUED_KEY, True, settings.MATCH_SCORE_DELAY * 2
+    )
+
+
+def clear_queued():
+    """
+    Lets the next arrival queue a task again, called when a scoring task starts.
+    """
+    caches[settings.MATCH_SCORE_CACHE].delete(QUEUED_KEY)
@@ -1,4 +1,5 @@
 from accounts.models import CustomUser
+from base.storage import get_private_storage
 from django.db import models
 from phonenumber_field.modelfields import PhoneNumberField
 
@@ -178,17 +179,13 @@ class Offer(models.Model):
     def return_requirements(self) -> str:
         """
         A property that returns a string representation of the first requirement associated with the offer and the
-        count of the remaining requirements.
+        count of the remaining requirements. It reads self.requirements.all(), so lists that prefetch the
+        requirements render it without queries.
         """
-        count = Offer.requirements.through.objects.filter(offer=self).count()
-        if count >= 1:
-            first_requirements = (
-                Offer.requirements.through.objects.filter(offer=self)
-                .first()
-                .requirements.name
-            )
-            return f"{first_requirements} and {count} other requirement/s"
-        return first_requirements
+        requirements = list(self.requirements.all())
+        if requirements:
+            return f"{requirements[0].name} and {len(requirements)} other requirement/s"
+        return ""
 
     @property
     def salary(self) -> str:
@@ -217,6 +214,12 @@ class Offer(models.Model):
 
     class Meta:
         ordering = ("name",)
+        indexes = [
+            models.Index(
+                fields=["company", "-date_created", "-id"],
+                name="offer_company_newest_idx",
+            ),
+        ]
         verbose_name = "Offer"
         verbose_name_plural = "Offers"
 
@@ -240,6 +243,10 @@ class Application(models.Model):
         - linkedin (str, optional): A URL to the applicant's LinkedIn profile.
         - cv (django.core.files.File, optional): A file upload of the applicant's CV/resume.
         - answer (bool): A flag indicating whether the application has been answered by the employer.
+        - match_score (float): How well the application matches its offer, from 0 to 1 (see dashboard/matchscore.py).
+        - date_scored (datetime.datetime, optional): When match_score was computed, None while it is pending.
+        - score_version (int): Incremented whenever the application is marked pending, so a score computed
+          from data that changed meanwhile is not stored.
     """
 
     first_name = models.CharField(max_length=50)
@@ -252,8 +259,13 @@ class Application(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     portfolio = models.URLField(null=True, blank=True)
     linkedin = models.URLField(null=True, blank=True)
-    cv = models.FileField(upload_to="resumes", null=True, blank=True)
+    cv = models.FileField(
+        upload_to="resumes", storage=get_private_storage, null=True, blank=True
+    )
     answer = models.BooleanField(default=False)
+    match_score = models.FloatField(default=0, editable=False)
+    date_scored = models.DateTimeField(null=True, blank=True, editable=False)
+    score_version = models.PositiveIntegerField(default=0, editable=False)
 
     @property
     def return_full_name(self) -> str:
@@ -269,5 +281,116 @@ class Application(models.Model):
         self.answer = answer
         self.save()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["offer", "-date_created", "-id"],
+                name="application_offer_newest_idx",
+            ),
+            models.Index(
+                fields=["offer", "expected_pay", "id"],
+                name="application_offer_pay_idx",
+            ),
+            models.Index(
+                fields=["offer", "answer", "-date_created", "-id"],
+                name="application_offer_answer_idx",
+            ),
+            models.Index(
+                fields=["offer", "-match_score", "-id"],
+                name="application_offer_match_idx",
+            ),
+            models.Index(
+                fields=["id"],
+                condition=models.Q(date_scored__isnull=True),
+                name="application_unscored_idx",
+            ),
+        ]
+
     def __str__(self) -> str:
         return self.return_full_name
+
+
+class DailyApplicationStats(models.Model):
+    """
+    A daily rollup of the applications for an offer, so the company dashboard reads one row per offer and day
+    instead of counting applications.
+    It is incremented by signals when an application is created, answered or deleted (see dashboard/signals.py)
+    and can be rebuilt with the backfill_application_rollups command.
+    Attributes:
+        - offer (Offer): The offer the applications were sent for.
+        - day (datetime.date): The day the applications were created on.
+        - applications (int): The number of applications created on that day.
+        - answered (int): How many of those applications have been answered.
+    """
+
+    offer = models.ForeignKey(
+        Offer, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    day = models.DateField()
+    applications = models.PositiveIntegerField(default=0)
+    answered = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ("day",)
+        constraints = [
+            models.UniqueConstraint(fields=["offer", "day"], name="unique_offer_day")
+        ]
+        verbose_name = "Daily application stats"
+        verbose_name_plural = "Daily application stats"
+
+    def __str__(self):
+        return f"{self.offer} {self.day}"
+
+
+class CVText(models.Model):
+    """
+    The normalized text extracted from a CV file, keyed by the SHA-256 of the file, so identical CVs are
+    extracted only once.
+    Attributes:
+        - sha256 (str): The SHA-256 of the CV file.
+        - text (str): The normalized text of the CV, empty if nothing could be extracted.
+        - error (str): The reason the extraction failed, empty if it succeeded.
+        - date_created (datetime.datetime): The date and time the text was extracted.
+    """
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    text = models.TextField(blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "CV text"
+        verbose_name_plural = "CV texts"
+
+    def __str__(self):
+        return self.sha256
+
+
+class ApplicationTerm(models.Model):
+    """
+    A posting of the inverted index of CVs, one row for every distinct term of an application's CV.
+    The company is stored on the row, so searching the applicants of a company reads one index range per term.
+    Attributes:
+        - company (CustomUser): The company that published the offer the application was sent for.
+        - term (str): A normalized term of the CV.
+        - application (Application): The application whose CV contains the term.
+    """
+
+    company = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    term = models.CharField(max_length=64)
+    application = models.ForeignKey(
+        Application, on_delete=models.CASCADE, related_name="terms"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "term", "application"],
+                name="unique_company_term_application",
+            )
+        ]
+        verbose_name = "Application term"
+        verbose_name_plural = "Application terms"
+
+    def __str__(self):
+        return self.term
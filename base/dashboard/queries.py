@@ -0,0 +1,62 @@
+import datetime
+
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+APPLICATIONS_PER_PAGE = 20
+
+# Every ordering ends with the primary key, so it is unique, and is served by an index starting with offer.
+APPLICATION_ORDERINGS = {
+    "newest": ("-date_created", "-id"),
+    "oldest": ("date_created", "id"),
+    "pay_desc": ("-expected_pay", "-id"),
+    "pay_asc": ("expected_pay", "id"),
+    "match": ("-match_score", "-id"),
+}
+
+
+def _start_of_day(day: datetime.date) -> datetime.datetime:
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def filter_applications(queryset: QuerySet, filters: dict) -> QuerySet:
+    """
+    Filters a queryset of applications by the cleaned data of ApplicationFilterForm, such as:
+    search, answer, min_pay, max_pay, date_from and date_to.
+    """
+    search = filters.get("search")
+    if search:
+        queryset = queryset.filter(
+            Q(first_name__icontains=search)
+            | Q(last_name__icontains=search)
+            | Q(email__icontains=search)
+        )
+
+    answer = filters.get("answer")
+    if answer:
+        queryset = queryset.filter(answer=answer == "yes")
+
+    if filters.get("min_pay") is not None:
+        queryset = queryset.filter(expected_pay__gte=filters["min_pay"])
+
+    if filters.get("max_pay") is not None:
+        queryset = queryset.filter(expected_pay__lte=filters["max_pay"])
+
+    # Compare against the bounds of local days, a __date lookup would hide date_created from the indexes.
+    if filters.get("date_from"):
+        queryset = queryset.filter(
+            date_created__gte=_start_of_day(filters["date_from"])
+        )
+
+    if filters.get("date_to"):
+        next_day = filters["date_to"] + datetime.timedelta(days=1)
+        queryset = queryset.filter(date_created__lt=_start_of_day(next_day))
+
+    return queryset
+
+
+def get_application_sort(value) -> str:
+    """
+    Returns the requested order of applications, falling back to "newest" for unknown values.
+    """
+    return value if value in APPLICATION_ORDERINGS else "newest"
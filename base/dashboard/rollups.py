@@ -0,0 +1,106 @@
+import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Application, DailyApplicationStats
+
+CHART_DAYS = 30
+
+
+def application_day(application) -> datetime.date:
+    """
+    Returns the local day an application was created on, the same day TruncDate() assigns in the database.
+    """
+    return timezone.localdate(application.date_created)
+
+
+def increment(offer_id, day, applications=0, answered=0):
+    """
+    Adds the given amounts to the rollup of an offer and day, creating the row on the first application of the day.
+    Negative amounts only update an existing row.
+    """
+    changes = {
+        "applications": F("applications") + applications,
+        "answered": F("answered") + answered,
+    }
+    rollup = DailyApplicationStats.objects.filter(offer_id=offer_id, day=day)
+    if rollup.update(**changes) or applications < 0:
+        return
+    try:
+        with transaction.atomic():
+            DailyApplicationStats.objects.create(
+                offer_id=offer_id,
+                day=day,
+                applications=applications,
+                answered=answered,
+            )
+    except IntegrityError:
+        # Another request created the row in the meantime.
+        rollup.update(**changes)
+
+
+def backfill(offer_ids=None):
+    """
+    Rebuilds the rollups of the given offers, or of all offers, from the applications table.
+    Returns the number of rollup rows written.
+    """
+    applications = Application.objects.all()
+    rollups = DailyApplicationStats.objects.all()
+    if offer_ids is not None:
+        applications = applications.filter(offer__in=offer_ids)
+        rollups = rollups.filter(offer__in=offer_ids)
+
+    rows = (
+        applications.annotate(day=TruncDate("date_created"))
+        .values("offer", "day")
+        .annotate(applications=Count("id"), answered=Count("id", filter=Q(answer=True)))
+        .order_by()
+    )
+    with transaction.atomic():
+        rollups.delete()
+        created = DailyApplicationStats.objects.bulk_create(
+            [
+                DailyApplicationStats(
+                    offer_id=row["offer"],
+                    day=row["day"],
+                    applications=row["applications"],
+                    answered=row["answered"],
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def get_offer_totals(offers) -> dict:
+    """
+    Returns the number of applications and answered applications of each offer, keyed by offer id.
+    """
+    return {
+        row["offer"]: row
+        for row in DailyApplicationStats.objects.filter(offer__in=offers)
+        .values("offer")
+        .annotate(applications=Sum("applications"), answered=Sum("answered"))
+        .order_by()
+    }
+
+
+def get_daily_applications(offers, days=CHART_DAYS) -> list:
+    """
+    Returns (day, applications) pairs for the last days, including days without applications.
+    """
+    today = timezone.localdate()
+    start = today - datetime.timedelta(days=days - 1)
+    counts = dict(
+        DailyApplicationStats.objects.filter(offer__in=offers, day__gte=start)
+        .values("day")
+        .annotate(total=Sum("applications"))
+        .order_by()
+        .values_list("day", "total")
+    )
+    chart_days = [start + datetime.timedelta(days=offset) for offset in range(days)]
+    return [(day, counts.get(day, 0)) for day in chart_days]
@@ -0,0 +1,135 @@
+from base.enqueue import enqueue
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import matchscore, rollups
+from .models import Application, Offer
+from .tasks import index_application_cv_task, score_applications_task
+
+# Fields of offers that the match scores of their applications are computed from, besides the requirements.
+MATCH_SCORE_FIELDS = ("salary_from", "salary_to")
+
+
+@receiver(post_init, sender=Application)
+def remember_rollup_fields(sender, instance, **kwargs):
+    """
+    Stores the loaded offer and answer of an application, so an update can tell which rollup it affected.
+    """
+    instance._rollup_loaded = (
+        instance.__dict__.get("offer_id"),
+        instance.__dict__.get("answer"),
+    )
+
+
+@receiver(post_save, sender=Application)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Counts a new application in the rollup of its day, and moves an updated application's contribution
+    when its offer or answer changed.
+    """
+    if raw:
+        return
+    current = (instance.offer_id, instance.answer)
+    if created:
+        rollups.increment(
+            instance.offer_id,
+            rollups.application_day(instance),
+            applications=1,
+            answered=int(instance.answer),
+        )
+    elif current != instance._rollup_loaded:
+        offer_id, answer = instance._rollup_loaded
+        day = rollups.application_day(instance)
+        rollups.increment(offer_id, day, applications=-1, answered=-int(answer))
+        rollups.increment(
+            instance.offer_id, day, applications=1, answered=int(instance.answer)
+        )
+    instance._rollup_loaded = current
+
+
+@receiver(post_save, sender=Application)
+def queue_cv_indexing(sender, instance, created, raw=False, **kwargs):
+    """
+    Queues the extraction and indexing of the CV of a new application once it is committed.
+    """
+    if created and not raw and instance.cv:
+        transaction.on_commit(
+            lambda: enqueue(
+                index_application_cv_task,
+                instance.pk,
+                company_id=instance.offer.company_id,
+            )
+        )
+
+
+@receiver(post_delete, sender=Application)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    # The rollup rows of a deleted offer are removed by the cascade, this update then matches nothing.
+    rollups.increment(
+        instance.offer_id,
+        rollups.application_day(instance),
+        applications=-1,
+        answered=-int(instance.answer),
+    )
+
+
+def queue_scoring():
+    """
+    Queues the scoring of the pending applications in MATCH_SCORE_DELAY seconds once the transaction is
+    committed, unless a scoring task is queued already.
+    """
+
+    def queue():
+        if matchscore.mark_queued():
+            enqueue(
+                score_applications_task,
+                options={"countdown": settings.MATCH_SCORE_DELAY},
+            )
+
+    transaction.on_commit(queue)
+
+
+@receiver(post_save, sender=Application)
+def queue_new_application_scoring(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        queue_scoring()
+
+
+def rescore_offers(offer_ids):
+    if matchscore.mark_pending(Application.objects.filter(offer__in=offer_ids)):
+        queue_scoring()
+
+
+@receiver(post_init, sender=Offer)
+def remember_match_score_fields(sender, instance, **kwargs):
+    instance._match_score_loaded = {
+        name: instance.__dict__.get(name) for name in MATCH_SCORE_FIELDS
+    }
+
+
+@receiver(post_save, sender=Offer)
+def rescore_on_offer_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Scores the applications of an offer again when its salary range changed.
+    """
+    if raw:
+        return
+    current = {name: getattr(instance, name) for name in MATCH_SCORE_FIELDS}
+    if not created and current != instance._match_score_loaded:
+        rescore_offers([instance.pk])
+    instance._match_score_loaded = current
+
+
+@receiver(m2m_changed, sender=Offer.requirements.through)
+def rescore_on_requirements(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Scores the applications of the offers whose requirements changed again.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        rescore_offers([instance.pk])
+    elif pk_set:
+        rescore_offers(sorted(pk_set))
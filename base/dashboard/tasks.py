@@ -0,0 +1,29 @@
+from base.fairshare import FairShareTask
+from celery import shared_task
+
+from . import matchscore
+from .cvindex import index_applications
+from .models import Application
+
+
+@shared_task(base=FairShareTask, acks_late=True)
+def index_application_cv_task(application_id, company_id=None):
+    """
+    A Celery task that extracts the text of an application's CV and adds its terms to the company's index.
+    The worker processes of Celery form the process pool the extraction runs in.
+    The CVs of one company are extracted one at a time, see base/fairshare.py.
+    """
+    index_applications([application_id])
+    # The CV terms are part of the application's match score.
+    matchscore.mark_pending(Application.objects.filter(pk=application_id))
+    matchscore.score_applications([application_id])
+
+
+@shared_task()
+def score_applications_task():
+    """
+    A Celery task that computes the match scores of all pending applications in batches.
+    Queued at most once per MATCH_SCORE_DELAY by new applications, and run periodically to catch lost tasks.
+    """
+    matchscore.clear_queued()
+    matchscore.score_pending_applications()
@@ -0,0 +1,206 @@
+import io
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from accounts.models import CustomUser
+from base.storage import ContentAddressedStorage
+from dashboard import cvindex
+from dashboard.models import (
+    Level,
+    Position,
+    Country,
+    Localization,
+    Offer,
+    Application,
+    ApplicationTerm,
+    CVText,
+)
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client
+from django.urls import reverse
+
+
+def create_docx(*paragraphs) -> bytes:
+    """
+    Returns a minimal DOCX file with the given paragraphs.
+    """
+    namespace = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    document = f'<w:document xmlns:w="{namespace}"><w:body>{body}</w:body></w:document>'
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w") as archive:
+        archive.writestr("word/document.xml", document)
+    return output.getvalue()
+
+
+def create_pdf(text) -> bytes:
+    """
+    Returns a minimal one page PDF file with the given line of text.
+    """
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(
+        b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, xref)
+    )
+    return output.getvalue()
+
+
+class CVExtractionTestCase(TestCase):
+    """
+    Test cases for extracting and normalizing the text of CV files.
+    """
+
+    def test_docx_and_pdf_text_is_extracted_and_normalized(self) -> None:
+        """
+        Test that the text of DOCX and PDF files is extracted lowercased with collapsed whitespace.
+        """
+        text, error = cvindex.extract_text(
+            create_docx("Python   Developer", "Django, C++"), ".docx"
+        )
+        self.assertEqual(error, "")
+        self.assertEqual(text, "python developer django, c++")
+
+        text, error = cvindex.extract_text(
+            create_pdf("Senior Django Developer"), ".PDF"
+        )
+        self.assertEqual(error, "")
+        self.assertIn("senior django developer", text)
+
+    def test_broken_and_unsupported_files_return_an_error(self) -> None:
+        """
+        Test that failures are returned as error messages instead of raising.
+        """
+        self.assertEqual(cvindex.extract_text(b"not a zip", ".docx")[0], "")
+        self.assertTrue(cvindex.extract_text(b"not a zip", ".docx")[1])
+        self.assertTrue(cvindex.extract_text(b"text", ".odt")[1])
+
+    def test_query_terms(self) -> None:
+        """
+        Test that AND is treated as a separator and terms such as node.js and c# are kept whole.
+        """
+        self.assertEqual(
+            cvindex.parse_query("Python AND Node.js c#"), ["c#", "node.js", "python"]
+        )
+
+
+class TalentPoolTestCase(TestCase):
+    """
+    Test cases for indexing application CVs and searching the applicants of a company.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cv_field = Application._meta.get_field("cv")
+        original_storage = cv_field.storage
+        cv_field.storage = ContentAddressedStorage(location=directory.name)
+        self.addCleanup(setattr, cv_field, "storage", original_storage)
+
+        self.company = CustomUser.objects.create_user(
+            role="company",
+            username="company",
+            email="company@example.com",
+            password="Test123@",
+        )
+        self.other_company = CustomUser.objects.create(
+            role="company", username="Nokia", email="nokia123@wp.pl"
+        )
+        self.offer = self.create_offer(self.company)
+        self.other_offer = self.create_offer(self.other_company)
+        cv = create_docx("Python developer", "Django REST framework")
+        self.django_applications = [
+            self.create_application(self.offer, cv),
+            self.create_application(self.other_offer, cv),
+        ]
+        self.flask_application = self.create_application(
+            self.offer, create_docx("Python developer", "Flask")
+        )
+
+    def create_offer(self, company) -> Offer:
+        return Offer.objects.create(
+            name="Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Python Developer",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=company,
+            address="Zielona 4",
+        )
+
+    def create_application(self, offer, cv) -> Application:
+        return Application.objects.create(
+            first_name="Jan",
+            last_name="Kowalski",
+            email="jan@example.com",
+            phone_number="+48123456789",
+            offer=offer,
+            expected_pay=5000,
+            cv=SimpleUploadedFile("cv.docx", cv),
+        )
+
+    def index_all(self, executor=None) -> int:
+        return cvindex.index_applications(
+            Application.objects.values_list("pk", flat=True), executor
+        )
+
+    def test_identical_cvs_are_extracted_once_and_indexing_is_idempotent(
+        self,
+    ) -> None:
+        """
+        Test that applications sharing a CV share its extracted text, and indexing twice writes the same postings.
+        """
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            postings = self.index_all(executor)
+
+        self.assertEqual(CVText.objects.count(), 2)
+        self.assertEqual(self.index_all(), postings)
+        self.assertEqual(ApplicationTerm.objects.count(), postings)
+
+    def test_search_requires_every_term_within_the_company(self) -> None:
+        """
+        Test that "python AND django" only matches the company's applicants with both terms.
+        """
+        self.index_all()
+
+        results = cvindex.search_applications(self.company.id, "python AND django")
+        self.assertEqual(list(results), [self.django_applications[0]])
+
+        results = cvindex.search_applications(self.company.id, "python")
+        self.assertEqual(len(results), 2)
+
+    def test_talent_pool_view_lists_matching_applicants(self) -> None:
+        """
+        Test that the talent pool view returns the applicants matching the query.
+        """
+        self.index_all()
+        client = Client()
+        client.login(username="company", password="Test123@")
+
+        response = client.get(reverse("dashboard:talent-pool"), {"query": "flask"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "talent_pool.html")
+        self.assertEqual(
+            list(response.context["object_list"]), [self.flask_application]
+        )
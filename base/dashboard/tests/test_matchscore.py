@@ -0,0 +1,162 @@
+from unittest import mock
+
+from accounts.models import CustomUser
+from dashboard.matchscore import (
+    mark_pending,
+    pay_fit,
+    score_applications,
+    score_pending_applications,
+)
+from dashboard.models import (
+    Application,
+    ApplicationTerm,
+    Country,
+    Level,
+    Localization,
+    Offer,
+    Position,
+    Requirements,
+)
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+
+class MatchScoreTestCase(TestCase):
+    """
+    Test cases for the match scores of applications against their offers.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = CustomUser.objects.create_user(
+            username="company", password="Test123@", role="company"
+        )
+        self.offer = Offer.objects.create(
+            name="Junior Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Junior Python Developer",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=self.company,
+            address="Zielona 4",
+            salary_from=8000,
+            salary_to=10000,
+        )
+        self.offer.requirements.set(
+            [
+                Requirements.objects.create(name="Django"),
+                Requirements.objects.create(name="Knowledge of REST API"),
+            ]
+        )
+        self.fit = self.create_application("I build REST API with Django.", 9000)
+        self.partial = self.create_application("Hello", 12500)
+        self.poor = self.create_application("Hi", 20000)
+        ApplicationTerm.objects.create(
+            company=self.company, term="django", application=self.partial
+        )
+
+    def create_application(self, message, expected_pay):
+        return Application.objects.create(
+            first_name="Jan",
+            last_name="Kowalski",
+            email="jan@example.com",
+            phone_number="+48123456789",
+            message=message,
+            offer=self.offer,
+            expected_pay=expected_pay,
+        )
+
+    def scores(self) -> dict:
+        return dict(Application.objects.values_list("pk", "match_score"))
+
+    def test_pending_applications_are_scored(self) -> None:
+        """
+        Test that requirements found in the message or the CV, ignoring filler words, and the expected pay make up
+        the score.
+        """
+        self.assertEqual(score_pending_applications(batch_size=2), 3)
+
+        self.assertEqual(
+            self.scores(),
+            {self.fit.pk: 1.0, self.partial.pk: 0.5, self.poor.pk: 0.0},
+        )
+        self.assertFalse(Application.objects.filter(date_scored=None).exists())
+        self.assertEqual(score_pending_applications(), 0)
+
+    def test_changes_during_scoring_leave_the_application_pending(self) -> None:
+        """
+        Test that a score computed before its application was marked pending again is not stored.
+        """
+
+        def changed_meanwhile(*args):
+            mark_pending(Application.objects.filter(pk=self.partial.pk))
+            return pay_fit(*args)
+
+        with mock.patch("dashboard.matchscore.pay_fit", side_effect=changed_meanwhile):
+            self.assertEqual(score_applications([self.fit.pk, self.partial.pk]), 1)
+
+        self.assertEqual(
+            list(Application.objects.filter(date_scored=None).order_by("pk")),
+            [self.partial, self.poor],
+        )
+        self.assertEqual(score_pending_applications(), 2)
+        self.assertEqual(self.scores()[self.partial.pk], 0.5)
+
+    def test_arrivals_queue_one_task(self) -> None:
+        """
+        Test that applications arriving together queue a single delayed scoring task.
+        """
+        with mock.patch("dashboard.signals.enqueue") as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_application("Hello", 9000)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_application("Hello", 9000)
+
+        enqueue.assert_called_once()
+        self.assertEqual(enqueue.call_args.kwargs["options"], {"countdown": 30})
+
+    def test_offer_changes_mark_applications_pending(self) -> None:
+        """
+        Test that a changed salary range or requirement list has the applications of the offer scored again.
+        """
+        score_pending_applications()
+        self.offer.salary_to = 20000
+        # Saving the offer also queues the update of its similar offers.
+        with mock.patch("dashboard.signals.enqueue") as enqueue, mock.patch(
+            "offers.signals.enqueue"
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.offer.save()
+
+        enqueue.assert_called_once()
+        score_pending_applications()
+        self.assertEqual(self.scores()[self.poor.pk], 0.3)
+
+        self.offer.requirements.remove(
+            Requirements.objects.get(name="Knowledge of REST API")
+        )
+        score_pending_applications()
+        self.assertEqual(self.scores()[self.partial.pk], 1.0)
+
+    def test_applications_are_sorted_by_match_score(self) -> None:
+        """
+        Test that the applicants list sorts by the stored score, pending applications scoring 0 until scored.
+        """
+        score_pending_applications()
+        pending = self.create_application("Django", 9000)
+        self.client.login(username="company", password="Test123@")
+
+        response = self.client.get(
+            reverse("dashboard:applications", args=[self.offer.id]),
+            {"order_by": "match"},
+        )
+
+        self.assertEqual(
+            list(response.context["object_list"]),
+            [self.fit, self.partial, pending, self.poor],
+        )
+        self.assertContains(response, "100%")
+        self.assertContains(response, "Pending")
@@ -8,8 +8,12 @@ from dashboard.models import (
     Requirements,
     Offer,
     Application,
+    DailyApplicationStats,
 )
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+from io import StringIO
 from offers.models import CompanyReview
 
 
@@ -255,6 +259,52 @@ class ApplicationTestCase(TestCase):
         self.assertEqual(self.application.return_full_name, "Kacper Kowalski")
 
 
+class DailyApplicationStatsTestCase(TestCase):
+    """
+    Test Case for the daily application rollups
+    """
+
+    def setUp(self) -> None:
+        self.application_model = ApplicationTestCase()
+        self.application_model.setUp()
+        self.application = self.application_model.application
+        self.offer = self.application_model.offer
+
+    def get_rollup(self) -> DailyApplicationStats:
+        return DailyApplicationStats.objects.get(
+            offer=self.offer, day=timezone.localdate(self.application.date_created)
+        )
+
+    def test_rollup_counts_created_answered_and_deleted_applications(self) -> None:
+        """
+        Test that signals keep the rollup of the application's day up to date
+        :return: None
+        """
+        self.assertEqual(self.get_rollup().applications, 1)
+        self.assertEqual(self.get_rollup().answered, 0)
+
+        Application.objects.get(pk=self.application.pk).update_answer(True)
+        self.assertEqual(self.get_rollup().answered, 1)
+
+        self.application.refresh_from_db()
+        self.application.delete()
+        self.assertEqual(self.get_rollup().applications, 0)
+        self.assertEqual(self.get_rollup().answered, 0)
+
+    def test_backfill_command_rebuilds_rollups(self) -> None:
+        """
+        Test that the backfill command recomputes rollups that drifted from the applications
+        :return: None
+        """
+        Application.objects.filter(pk=self.application.pk).update(answer=True)
+        DailyApplicationStats.objects.update(applications=7)
+
+        call_command("backfill_application_rollups", stdout=StringIO())
+
+        self.assertEqual(self.get_rollup().applications, 1)
+        self.assertEqual(self.get_rollup().answered, 1)
+
+
 class CompanyReviewTestCase(TestCase):
     def setUp(self) -> None:
         self.company = CustomUser.objects.create(
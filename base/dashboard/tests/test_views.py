@@ -1,3 +1,5 @@
+import tempfile
+
 from accounts.models import CustomUser
 from dashboard.models import (
     Level,
@@ -9,7 +11,9 @@ from dashboard.models import (
     Offer,
     Application,
 )
-from django.test import TestCase, Client
+from base.storage import ContentAddressedStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 
 
@@ -111,3 +115,189 @@ class DashboardViewTestCase(TestCase):
         self.client.login(username="user", password="Test123@")
         response = self.client.get(reverse("dashboard:dashboard"))
         self.assertEqual(response.status_code, 302)
+
+    def test_company_dashboard_shows_application_counts_from_rollups(
+        self,
+    ) -> None:
+        """
+        Test that the company dashboard shows per-offer counts and applications per day from the rollups.
+        """
+        self.offer.company = CustomUser.objects.get(username="company")
+        self.offer.save()
+        self.application.update_answer(True)
+
+        self.client.login(username="company", password="Test123@")
+        response = self.client.get(reverse("dashboard:dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["applications_count"], 1)
+        offer = response.context["offers"][0]
+        self.assertEqual(offer.applications_count, 1)
+        self.assertEqual(offer.answered_ratio, 1)
+        self.assertEqual(response.context["daily_applications"][-1][1], 1)
+
+
+class ApplicationsListViewTestCase(TestCase):
+    """
+    Test case for filtering, sorting and paginating the applications for an offer.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test case by creating a company with an offer and 25 applications with growing expected pay.
+        """
+        self.client = Client()
+        self.company = CustomUser.objects.create_user(
+            role="company",
+            username="company",
+            email="company@example.com",
+            password="Test123@",
+        )
+        self.offer = Offer.objects.create(
+            name="Junior Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Junior Python Developer",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=self.company,
+            address="Zielona 4",
+        )
+        for number in range(25):
+            Application.objects.create(
+                first_name=f"Name{number}",
+                last_name="Kowalski",
+                email=f"candidate{number}@example.com",
+                phone_number="+48123456789",
+                offer=self.offer,
+                expected_pay=1000 + number,
+                answer=number % 2 == 0,
+            )
+        self.client.login(username="company", password="Test123@")
+        self.url = reverse("dashboard:applications", args=[self.offer.id])
+
+    def test_applications_are_paginated_with_cursors(self) -> None:
+        """
+        Test that the second page continues after the first one without repeating applications.
+        """
+        response = self.client.get(self.url, {"order_by": "pay_desc"})
+        first_page = list(response.context["object_list"])
+        self.assertEqual(len(first_page), 20)
+        self.assertEqual(first_page[0].expected_pay, 1024)
+
+        response = self.client.get(f"{self.url}?{response.context['next_page_query']}")
+        second_page = list(response.context["object_list"])
+        self.assertEqual(len(second_page), 5)
+        self.assertEqual(second_page[-1].expected_pay, 1000)
+        self.assertNotIn("next_page_query", response.context)
+
+    def test_applications_are_filtered_and_searched(self) -> None:
+        """
+        Test that the answer, expected pay and search filters are applied together.
+        """
+        response = self.client.get(
+            self.url, {"answer": "yes", "min_pay": 1010, "search": "Name1"}
+        )
+        pays = sorted(app.expected_pay for app in response.context["object_list"])
+        self.assertEqual(pays, [1010, 1012, 1014, 1016, 1018])
+
+    def test_invalid_cursor_returns_404_status_code(self) -> None:
+        """
+        Test that a malformed cursor returns a 404 status code.
+        """
+        response = self.client.get(self.url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 404)
+
+
+class ApplicationCVDownloadTestCase(TestCase):
+    """
+    Test case for the permission-checked download of application CVs.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test case by creating a company, an applicant and an application with a CV stored in a
+        temporary directory.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cv_field = Application._meta.get_field("cv")
+        original_storage = cv_field.storage
+        cv_field.storage = ContentAddressedStorage(location=directory.name)
+        self.addCleanup(setattr, cv_field, "storage", original_storage)
+
+        self.client = Client()
+        self.company = CustomUser.objects.create_user(
+            role="company",
+            username="company",
+            email="company@example.com",
+            password="Test123@",
+        )
+        CustomUser.objects.create_user(
+            role="user",
+            username="applicant",
+            email="applicant@example.com",
+            password="Test123@",
+        )
+        CustomUser.objects.create_user(
+            role="user",
+            username="other",
+            email="other@example.com",
+            password="Test123@",
+        )
+        offer = Offer.objects.create(
+            name="Junior Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Junior Python Developer",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=self.company,
+            address="Zielona 4",
+        )
+        self.application = Application.objects.create(
+            first_name="XXX",
+            last_name="XXX",
+            email="applicant@example.com",
+            phone_number="+48123456789",
+            offer=offer,
+            expected_pay="30000",
+            cv=SimpleUploadedFile("cv.pdf", b"%PDF-1.4 resume"),
+        )
+        self.url = reverse("dashboard:application-cv", args=[self.application.id])
+
+    @override_settings(SENDFILE_BACKEND="nginx")
+    def test_company_download_is_offloaded_to_the_web_server(self) -> None:
+        """
+        Test that the company gets an X-Accel-Redirect response instead of the file content.
+        """
+        self.client.login(username="company", password="Test123@")
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected/{self.application.cv.name}"
+        )
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response.content, b"")
+
+    @override_settings(SENDFILE_BACKEND="simple")
+    def test_applicant_can_download_own_cv(self) -> None:
+        """
+        Test that the applicant can download the CV of their own application.
+        """
+        self.client.login(username="applicant", password="Test123@")
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 resume")
+
+    def test_other_users_get_403_status_code(self) -> None:
+        """
+        Test that users who neither published the offer nor applied cannot download the CV.
+        """
+        self.client.login(username="other", password="Test123@")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
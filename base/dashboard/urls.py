@@ -30,5 +30,11 @@ urlpatterns = [
         views.generate_application_csv,
         name="generate-csv",
     ),
+    path(
+        "application/cv/<int:pk>/",
+        views.download_application_cv,
+        name="application-cv",
+    ),
+    path("talent-pool/", views.TalentPoolView.as_view(), name="talent-pool"),
     path("dashboard/", views.CompanyDashboard.as_view(), name="dashboard"),
 ]
@@ -1,11 +1,19 @@
 import csv
+import posixpath
 from typing import Any, Dict
 
 from accounts.auth import company_required
+from base.identity import get_identity_map, remember_user
+from base.pagination import KeysetPaginator
+from base.sendfile import sendfile
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import InvalidPage
+from django.db import transaction
 from django.db.models import QuerySet
-from django.http import HttpResponse
-from django.shortcuts import render
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 from django.views.generic import (
@@ -16,17 +24,29 @@ from django.views.generic import (
     UpdateView,
     View,
 )
+from offers.salaries import benchmark_choices
 
+from . import cvindex, rollups
 from .forms import (
+    ApplicationFilterForm,
     ReturnApplicationFeedbackForm,
+    TalentPoolSearchForm,
 )
 from .models import Offer, Application
+from .queries import (
+    APPLICATION_ORDERINGS,
+    APPLICATIONS_PER_PAGE,
+    filter_applications,
+    get_application_sort,
+)
 
 
 class ApplicationsListView(UserPassesTestMixin, ListView):
     """
     The ApplicationsListView class is a ListView that displays a list of job applications for a specific job offer.
     It extends the UserPassesTestMixin to restrict access to the view to users with the "company" role.
+    The applications can be filtered, searched and sorted with ApplicationFilterForm, and are paginated with
+    keyset cursors, so deep pages of offers with many applicants are as fast as the first one.
     Attributes:
         - model: The model class to use for this view (Application).
         - paginate_by: The number of items to include in each page of results.
@@ -34,7 +54,7 @@ class ApplicationsListView(UserPassesTestMixin, ListView):
     """
 
     model = Application
-    paginate_by = 20
+    paginate_by = APPLICATIONS_PER_PAGE
     template_name = "applications_list.html"
 
     def test_func(self):
@@ -43,20 +63,94 @@ class ApplicationsListView(UserPassesTestMixin, ListView):
         """
         return self.request.user.role == "company"
 
+    def get_filter_form(self) -> ApplicationFilterForm:
+        if not hasattr(self, "filter_form"):
+            self.filter_form = ApplicationFilterForm(self.request.GET)
+            self.filter_form.is_valid()
+        return self.filter_form
+
     def get_queryset(self) -> QuerySet[Any]:
         """
-        Overrides the parent get_queryset method to filter the queryset by the job offer ID specified in the URL.
+        Overrides the parent get_queryset method to filter the queryset by the job offer ID specified in the URL
+        and by the valid fields of the filter form.
         """
         queryset = super().get_queryset()
-        # queryset = queryset.filter(offer__company=self.kwargs['offer_id'])
         queryset = queryset.filter(offer__id=self.kwargs["offer_id"])
-        return queryset
+        return filter_applications(queryset, self.get_filter_form().cleaned_data)
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Overrides the parent paginate_queryset method to return the page after the "cursor" GET parameter.
+        """
+        order_by = get_application_sort(
+            self.get_filter_form().cleaned_data.get("order_by")
+        )
+        paginator = KeysetPaginator(
+            queryset, APPLICATION_ORDERINGS[order_by], page_size
+        )
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidPage:
+            raise Http404("Invalid cursor.")
+        is_paginated = page.has_next or bool(self.request.GET.get("cursor"))
+        return paginator, page, page.object_list, is_paginated
+
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Overrides the parent get_context_data method to add the filter form and the query string
+        of the next page, which keeps the current filters.
+        """
+        context = super().get_context_data(**kwargs)
+        context["filter_form"] = self.get_filter_form()
+        page = context["page_obj"]
+        if page.has_next:
+            params = self.request.GET.copy()
+            params["cursor"] = page.next_cursor
+            context["next_page_query"] = params.urlencode()
+        params = self.request.GET.copy()
+        params.pop("cursor", None)
+        context["first_page_query"] = params.urlencode()
+        return context
+
+
+class TalentPoolView(UserPassesTestMixin, ListView):
+    """
+    The TalentPoolView class is a ListView that searches the CVs of all applicants of the logged-in company,
+    using the inverted index built in the background (see dashboard/cvindex.py).
+    Attributes:
+        - model: The model class to use for this view (Application).
+        - paginate_by: The number of items to include in each page of results.
+        - template_name: The name of the template to use for rendering the view.
+    """
+
+    model = Application
+    paginate_by = 20
+    template_name = "talent_pool.html"
+
+    def test_func(self):
+        """
+        Overrides the UserPassesTestMixin test_func to check if the logged-in user has the "company" role.
+        """
+        return self.request.user.role == "company"
+
+    def get_queryset(self) -> QuerySet[Any]:
+        """
+        Overrides the parent get_queryset method to return the applications whose CV matches the query,
+        newest first.
+        """
+        query = self.request.GET.get("query", "")
+        return (
+            cvindex.search_applications(self.request.user.id, query)
+            .select_related("offer")
+            .order_by("-date_created", "-id")
+        )
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         """
-        Overrides the parent get_context_data method to add any additional context data required by the template.
+        Overrides the parent get_context_data method to add the search form.
         """
         context = super().get_context_data(**kwargs)
+        context["search_form"] = TalentPoolSearchForm(self.request.GET)
         return context
 
 
@@ -74,13 +168,22 @@ class ReturnApplicationFeedbackView(UserPassesTestMixin, FormView):
     template_name = "return_app_feedback.html"
     success_url = reverse_lazy("offers:home")
 
+    def get_application(self) -> Application:
+        """
+        A function that returns the application in question together with its offer and the offer's company,
+        loaded once per request through the request's identity map.
+        """
+        return get_identity_map(self.request).get(
+            Application, self.kwargs["application_id"], ("offer__company",)
+        )
+
     def test_func(self):
         """
         A function that checks whether the logged-in user is a company user and is associated
         with the offer for the application in question.
         """
-        application = Application.objects.get(pk=self.kwargs["application_id"])
-        offer = application.offer
+        remember_user(self.request)
+        offer = self.get_application().offer
         return (
             self.request.user.role == "company" and self.request.user == offer.company
         )
@@ -90,8 +193,7 @@ class ReturnApplicationFeedbackView(UserPassesTestMixin, FormView):
         A function that pre-populates the feedback form with the email address of the applicant.
         """
         initial = super().get_initial()
-        application = Application.objects.get(pk=self.kwargs["application_id"])
-        initial["email"] = application.email
+        initial["email"] = self.get_application().email
         return initial
 
     def form_valid(self, form):
@@ -99,10 +201,11 @@ class ReturnApplicationFeedbackView(UserPassesTestMixin, FormView):
         A function that sends an email with the feedback to the applicant and updates the application status
         to reflect the feedback was returned.
         """
-        application = Application.objects.get(pk=self.kwargs["application_id"])
+        application = self.get_application()
         email = application.email
-        form.send_email(email)
-        application.update_answer(True)
+        with transaction.atomic():
+            form.send_email(email, company_id=application.offer.company_id)
+            application.update_answer(True)
         return super().form_valid(form)
 
 
@@ -189,6 +292,15 @@ class OfferCreateView(UserPassesTestMixin, CreateView):
         form.instance.company = self.request.user
         return super().form_valid(form)
 
+    def get_context_data(self, **kwargs):
+        """
+        Adds the cached salary benchmarks, shown next to the salary fields for the chosen position, level and
+        localization.
+        """
+        context = super().get_context_data(**kwargs)
+        context["salary_benchmarks"] = benchmark_choices()
+        return context
+
     def get_queryset(self):
         """
         A function that retrieves the queryset used for this view.
@@ -267,6 +379,32 @@ def generate_application_csv(request, pk):
     return response
 
 
+@login_required
+def download_application_cv(request, pk):
+    """
+    View function that downloads the CV of a job application, for the company that published the offer
+    and for the applicant. The file itself is sent by the web server, see base/sendfile.py.
+    Attributes:
+        - request (HttpRequest): The HTTP request object.
+        - pk (int): The primary key of the job application.
+    Returns:
+        - HttpResponse: An HTTP response object.
+    """
+    application = get_object_or_404(Application.objects.select_related("offer"), pk=pk)
+    user = request.user
+    is_company = application.offer.company_id == user.id
+    is_applicant = user.role == "user" and user.email == application.email
+    if not (is_company or is_applicant):
+        raise PermissionDenied
+    if not application.cv:
+        raise Http404("The application has no CV.")
+
+    extension = posixpath.splitext(application.cv.name)[1]
+    return sendfile(
+        application.cv.storage, application.cv.name, f"cv-{application.pk}{extension}"
+    )
+
+
 class CompanyDashboard(View):
     """
     The class CompanyDashboard extends the built-in Django View class
@@ -277,16 +415,30 @@ class CompanyDashboard(View):
     def get(self, request, *args, **kwargs):
         """
         Retrieves the company ID from the logged-in user's request,
-        filters the offers that belong to that company, counts the number of applications for those offers,
-        and returns a rendered dashboard template with the retrieved data.
+        filters the offers that belong to that company, reads their application counts, answered ratios
+        and applications per day from the daily rollups, and returns a rendered dashboard template with the
+        retrieved data.
         """
         company_id = request.user.id
-        offers = Offer.objects.filter(company_id=company_id)
-        applications_count = Application.objects.filter(offer_id__in=offers).count()
+        offers = list(Offer.objects.filter(company_id=company_id))
+        totals = rollups.get_offer_totals(offers)
+        for offer in offers:
+            offer_totals = totals.get(offer.id, {})
+            offer.applications_count = offer_totals.get("applications", 0)
+            offer.answered_count = offer_totals.get("answered", 0)
+            offer.answered_ratio = (
+                offer.answered_count / offer.applications_count
+                if offer.applications_count
+                else None
+            )
+        daily_applications = rollups.get_daily_applications(offers)
+        daily_max = max((count for _, count in daily_applications), default=0)
 
         context = {
             "company": company_id,
             "offers": offers,
-            "applications_count": applications_count,
+            "applications_count": sum(offer.applications_count for offer in offers),
+            "daily_applications": daily_applications,
+            "daily_max": daily_max,
         }
         return render(request, "company_dashboard.html", context=context)
@@ -125,6 +125,29 @@ class SearchForm(forms.Form):
         self.fields["name"].widget.attrs["placeholder"] = "Search by name"
 
 
+class CompanySortingForm(forms.Form):
+    """
+    CompanySortingForm is a Django form used for sorting and filtering the companies list by activity.
+    Attributes:
+        - order_by (ChoiceField): A field that represents a dropdown menu selection of sorting order.
+        - min_rating (IntegerField): A field that hides companies rated lower than the given value.
+        - has_offers (BooleanField): A checkbox that hides companies without any offers.
+    """
+
+    CHOICES = (
+        ("offers", "Most offers"),
+        ("applications", "Most applications"),
+        ("latest", "Latest offer"),
+        ("rating", "Best rated"),
+    )
+
+    order_by = forms.ChoiceField(choices=CHOICES, required=False, label="Sort by")
+    min_rating = forms.IntegerField(
+        min_value=1, max_value=5, required=False, label="Minimum rating"
+    )
+    has_offers = forms.BooleanField(required=False, label="With offers only")
+
+
 class ApplyForm(forms.ModelForm):
     """
     The `ApplyForm` class is a Django ModelForm used to handle user input for creating or updating object.
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from offers.similarity import rebuild_similar_offers
+
+
+class Command(BaseCommand):
+    """
+    Computes the similar offers of all offers from scratch. Changes are applied incrementally afterwards,
+    run it once after deploying, or to repair the table.
+    """
+
+    help = "Computes the similar offers of all offers."
+
+    def handle(self, *args, **options):
+        offers = rebuild_similar_offers()
+        self.stdout.write(
+            self.style.SUCCESS(f"Computed the similar offers of {offers} offers.")
+        )
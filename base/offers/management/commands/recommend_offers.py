@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from offers.recommender import recommend_offers
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the offer recommendations of all users from the offers they applied to.
+    """
+
+    help = "Recomputes the offer recommendations of all applicants."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="The number of users scored with one matrix product.",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            dest="top_n",
+            help="The number of offers recommended to every user.",
+        )
+
+    def handle(self, *args, **options):
+        users = recommend_offers(options["batch_size"], options["top_n"])
+        self.stdout.write(self.style.SUCCESS(f"Recommended offers to {users} users."))
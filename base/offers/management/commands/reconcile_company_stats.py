@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from offers.stats import reconcile_company_stats
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the stats of all companies from scratch. They are kept up to date incrementally and reconciled
+    hourly afterwards, run it once after deploying, so the companies list is complete right away.
+    """
+
+    help = "Recomputes the stats of all companies."
+
+    def handle(self, *args, **options):
+        companies = reconcile_company_stats()
+        self.stdout.write(
+            self.style.SUCCESS(f"Recomputed the stats of {companies} companies.")
+        )
@@ -28,9 +28,165 @@ class CompanyReview(models.Model):
         return f"{self.choose_rate}/5"
 
     class Meta:
-        ordering = ("date_created",)
+        ordering = ("-date_created",)
+        indexes = [
+            models.Index(
+                fields=["company", "-date_created", "-id"],
+                name="review_company_newest_idx",
+            ),
+            models.Index(
+                fields=["company", "-choose_rate", "-date_created", "-id"],
+                name="review_company_rating_idx",
+            ),
+        ]
         verbose_name = "Review"
         verbose_name_plural = "Reviews"
 
     def __str__(self):
         return self.choose_rate
+
+
+class CompanyStats(models.Model):
+    """
+    A materialized summary of a company's activity, used to sort and filter the companies list
+    without aggregating offers, applications and reviews on every request.
+    It is kept up to date by signals (see offers/signals.py) and fully reconciled periodically.
+    Attributes:
+        company: A OneToOneField to the company the stats belong to.
+        active_offer_count: A PositiveIntegerField containing the number of published offers.
+        application_count: A PositiveIntegerField containing the number of applications for those offers.
+        latest_offer_date: A DateField containing the creation date of the newest offer.
+        review_count: A PositiveIntegerField containing the number of reviews.
+        rating_sum: A PositiveIntegerField containing the sum of all review rates.
+        avg_rating: A FloatField containing the average review rate.
+    """
+
+    company = models.OneToOneField(
+        CustomUser, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    active_offer_count = models.PositiveIntegerField(default=0)
+    application_count = models.PositiveIntegerField(default=0)
+    latest_offer_date = models.DateField(null=True, blank=True)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    avg_rating = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-active_offer_count", "-company"],
+                name="stats_offers_idx",
+            ),
+            models.Index(
+                fields=["-application_count", "-company"],
+                name="stats_applications_idx",
+            ),
+            models.Index(
+                fields=["-latest_offer_date", "-company"],
+                name="stats_latest_offer_idx",
+            ),
+            models.Index(fields=["-avg_rating", "-company"], name="stats_rating_idx"),
+        ]
+        verbose_name = "Company stats"
+        verbose_name_plural = "Company stats"
+
+    def __str__(self):
+        return f"{self.company}"
+
+
+class OfferRecommendation(models.Model):
+    """
+    An offer recommended to a user, precomputed in batch from the offers the user applied to (see
+    offers/recommender.py), so the profile page reads a user's recommendations with one query.
+    Attributes:
+        user: A ForeignKey to the user the offer is recommended to.
+        offer: A ForeignKey to the recommended offer.
+        rank: A PositiveSmallIntegerField containing the position of the offer among the user's recommendations.
+        score: A FloatField containing the similarity of the offer to the user's applications.
+        date_computed: A DateTimeField containing when the recommendation was computed.
+    """
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="offer_recommendations"
+    )
+    offer = models.ForeignKey(
+        "dashboard.Offer", on_delete=models.CASCADE, related_name="recommendations"
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    date_computed = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "offer"], name="unique_user_offer_recommendation"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "rank"], name="recommendation_rank_idx")
+        ]
+
+
+class SimilarOffer(models.Model):
+    """
+    One of the nearest neighbours of an offer, by requirements, position, level, localization and salary band
+    (see offers/similarity.py). Computed in the background, so the offer page reads them with one indexed query.
+    Attributes:
+        offer: A ForeignKey to the offer the neighbour belongs to.
+        similar: A ForeignKey to the similar offer.
+        rank: A PositiveSmallIntegerField containing the position of the neighbour, 1 being the most similar.
+        score: A FloatField containing the similarity of the offers, from 0 to 1.
+    """
+
+    offer = models.ForeignKey(
+        "dashboard.Offer", on_delete=models.CASCADE, related_name="similar_offers"
+    )
+    similar = models.ForeignKey(
+        "dashboard.Offer", on_delete=models.CASCADE, related_name="+"
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["offer", "similar"], name="unique_similar_offer"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["offer", "rank"], name="similar_offer_rank_idx")
+        ]
+
+
+class SalaryBenchmark(models.Model):
+    """
+    Salary percentiles of the offers of a position and level in a localization, or in all localizations when
+    localization is empty. Refreshed periodically from the offers (see offers/salaries.py), groups with fewer than
+    SALARY_BENCHMARK_MIN_OFFERS offers are not stored.
+    Attributes:
+        position: A ForeignKey to the position of the offers.
+        level: A ForeignKey to the level of the offers.
+        localization: A ForeignKey to the localization of the offers, empty for all localizations.
+        offer_count: A PositiveIntegerField containing the number of offers with a salary in the group.
+        p25: A PositiveIntegerField containing the 25th percentile of the salaries.
+        p50: A PositiveIntegerField containing the median salary.
+        p75: A PositiveIntegerField containing the 75th percentile of the salaries.
+    """
+
+    position = models.ForeignKey("dashboard.Position", on_delete=models.CASCADE)
+    level = models.ForeignKey("dashboard.Level", on_delete=models.CASCADE)
+    localization = models.ForeignKey(
+        "dashboard.Localization", on_delete=models.CASCADE, null=True, blank=True
+    )
+    offer_count = models.PositiveIntegerField()
+    p25 = models.PositiveIntegerField()
+    p50 = models.PositiveIntegerField()
+    p75 = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["position", "level", "localization"],
+                name="unique_salary_benchmark",
+            )
+        ]
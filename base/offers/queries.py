@@ -0,0 +1,87 @@
+from base.pagination import KeysetPage, KeysetPaginator
+from dashboard.models import Offer
+from django.db.models import QuerySet
+
+from .models import CompanyReview
+
+
+def filter_offers(queryset: QuerySet, params) -> QuerySet:
+    """
+    Filters and orders a queryset of offers by the GET parameters of the home page, such as:
+    name, remote, choose_positions, level, localization, contract and order_by.
+    """
+    name = params.get("name")
+    if name:
+        queryset = queryset.filter(name__icontains=name)
+
+    remote = params.get("remote")
+    if remote:
+        queryset = queryset.filter(remote=True)
+
+    positions = params.getlist("choose_positions")
+    if positions:
+        queryset = queryset.filter(position__in=positions)
+
+    level = params.get("level")
+    if level:
+        queryset = queryset.filter(level=level)
+
+    localization = params.get("localization")
+    if localization:
+        queryset = queryset.filter(localization=localization)
+
+    contract = params.get("contract")
+    if contract:
+        queryset = queryset.filter(contract=contract)
+
+    order_by = params.get("order_by")
+    if order_by:
+        if order_by == "1":
+            queryset = queryset.order_by("date_created")
+        if order_by == "2":
+            queryset = queryset.order_by("-date_created")
+
+    return queryset
+
+
+COMPANY_OFFERS_PER_PAGE = 10
+COMPANY_REVIEWS_PER_PAGE = 10
+
+REVIEW_ORDERINGS = {
+    "newest": ("-date_created", "-id"),
+    "rating": ("-choose_rate", "-date_created", "-id"),
+}
+
+
+def get_company_offers_page(company_id, cursor=None) -> KeysetPage:
+    """
+    Returns a page of a company's offers, newest first, with the requirements shown on the page prefetched.
+    Raises InvalidPage for a malformed cursor.
+    """
+    queryset = (
+        Offer.objects.filter(company=company_id)
+        .select_related("company", "localization")
+        .prefetch_related("requirements")
+    )
+    paginator = KeysetPaginator(
+        queryset, ("-date_created", "-id"), COMPANY_OFFERS_PER_PAGE
+    )
+    return paginator.page(cursor)
+
+
+def get_review_sort(value) -> str:
+    """
+    Returns the requested order of reviews, falling back to "newest" for unknown values.
+    """
+    return value if value in REVIEW_ORDERINGS else "newest"
+
+
+def get_company_reviews_page(company_id, sort="newest", cursor=None) -> KeysetPage:
+    """
+    Returns a page of a company's reviews, sorted by "newest" or by "rating".
+    Raises InvalidPage for a malformed cursor.
+    """
+    ordering = REVIEW_ORDERINGS[get_review_sort(sort)]
+    queryset = CompanyReview.objects.filter(company=company_id)
+    paginator = KeysetPaginator(queryset, ordering, COMPANY_REVIEWS_PER_PAGE)
+    return paginator.page(cursor)
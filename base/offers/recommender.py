@@ -0,0 +1,179 @@
+"""
+Offer recommendations for applicants, computed offline in batch.
+
+Every offer is a row of a sparse feature matrix: the TF-IDF weights of the terms of its name, description and
+requirement names, followed by one-hot columns of its position, level and localization. Every block is L2
+normalized and scaled by the square root of its RECOMMENDER_FEATURE_WEIGHTS weight, so the dot product of two
+rows is the weighted sum of the cosine similarities of their blocks. The profile of a user is the mean row of the
+offers they applied to, matched by email like the profile page, and every other offer is scored by its dot
+product with the profile. RECOMMENDER_BATCH_SIZE users are scored at a time with one sparse matrix product, and
+the best RECOMMENDER_TOP_N offers of each are stored in OfferRecommendation.
+"""
+from collections import Counter, defaultdict
+
+import numpy as np
+from accounts.models import CustomUser
+from dashboard.cvindex import TERM_PATTERN, normalize
+from dashboard.models import Application, Offer
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from scipy import sparse
+
+from .models import OfferRecommendation
+
+
+def term_counts(text: str) -> Counter:
+    """
+    Returns how often every term occurs in a text, tokenized like the CV index.
+    """
+    terms = (term.rstrip(".") for term in TERM_PATTERN.findall(normalize(text)))
+    return Counter(term for term in terms if term)
+
+
+def tfidf(documents) -> sparse.csr_matrix:
+    """
+    Returns the TF-IDF matrix of term counts, one row per document, with sublinear term frequencies and
+    smoothed inverse document frequencies.
+    """
+    vocabulary = {}
+    rows, columns, values = [], [], []
+    for row, counts in enumerate(documents):
+        for term, count in counts.items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+            values.append(count)
+    matrix = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float64), (rows, columns)),
+        shape=(len(documents), len(vocabulary)),
+    )
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1 + matrix.shape[0]) / (1 + document_frequency)) + 1
+    matrix.data = 1 + np.log(matrix.data)
+    return matrix @ sparse.diags(idf)
+
+
+def one_hot(values) -> sparse.csr_matrix:
+    """
+    Returns a matrix with a single one per row, in the column of the row's value.
+    """
+    categories = {}
+    columns = [categories.setdefault(value, len(categories)) for value in values]
+    return sparse.csr_matrix(
+        (np.ones(len(columns)), (np.arange(len(columns)), columns)),
+        shape=(len(columns), len(categories)),
+    )
+
+
+def normalize_rows(matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def offer_features():
+    """
+    Returns the primary keys of all offers and their feature matrix, rows in the same order.
+    """
+    offers = list(
+        Offer.objects.order_by("pk").values_list(
+            "pk", "name", "description", "position_id", "level_id", "localization_id"
+        )
+    )
+    requirements = defaultdict(list)
+    for offer_id, name in Offer.requirements.through.objects.values_list(
+        "offer_id", "requirements__name"
+    ):
+        requirements[offer_id].append(name)
+
+    documents = [
+        term_counts(" ".join([name, description, *requirements[pk]]))
+        for pk, name, description, *_ in offers
+    ]
+    blocks = {
+        "text": tfidf(documents),
+        "position": one_hot([offer[3] for offer in offers]),
+        "level": one_hot([offer[4] for offer in offers]),
+        "localization": one_hot([offer[5] for offer in offers]),
+    }
+    weights = settings.RECOMMENDER_FEATURE_WEIGHTS
+    features = sparse.hstack(
+        [
+            normalize_rows(block) * np.sqrt(weights[name])
+            for name, block in blocks.items()
+        ]
+    ).tocsr()
+    return [offer[0] for offer in offers], features
+
+
+def top_offers(scores, top_n) -> list:
+    """
+    Returns the columns of the top_n positive scores of every row, best first and ties by column.
+    """
+    top_n = min(top_n, scores.shape[1])
+    candidates = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+    result = []
+    for row, columns in zip(scores, candidates):
+        columns = columns[np.lexsort((columns, -row[columns]))]
+        result.append([column for column in columns if row[column] > 0])
+    return result
+
+
+def recommend_offers(batch_size=None, top_n=None) -> int:
+    """
+    Recomputes the recommendations of all users with applications and removes those of users without.
+    Returns the number of users with recommendations.
+    """
+    batch_size = batch_size or settings.RECOMMENDER_BATCH_SIZE
+    top_n = top_n or settings.RECOMMENDER_TOP_N
+    now = timezone.now()
+    offer_ids, features = offer_features()
+    column = {pk: index for index, pk in enumerate(offer_ids)}
+
+    applied = defaultdict(set)
+    for email, offer_id in Application.objects.values_list("email", "offer_id"):
+        applied[email].add(column[offer_id])
+    users = [
+        (pk, sorted(applied[email]))
+        for pk, email in CustomUser.objects.filter(role="user")
+        .order_by("pk")
+        .values_list("pk", "email")
+        if email in applied
+    ]
+
+    for start in range(0, len(users), batch_size):
+        batch = users[start : start + batch_size]
+        rows, columns, values = [], [], []
+        for row, (_, history) in enumerate(batch):
+            rows.extend([row] * len(history))
+            columns.extend(history)
+            values.extend([1 / len(history)] * len(history))
+        histories = sparse.csr_matrix(
+            (values, (rows, columns)), shape=(len(batch), len(offer_ids))
+        )
+        scores = ((histories @ features) @ features.T).toarray()
+        # Offers the user already applied to are never recommended.
+        scores[histories.nonzero()] = -np.inf
+
+        recommendations = [
+            OfferRecommendation(
+                user_id=user_id,
+                offer_id=offer_ids[index],
+                rank=rank,
+                score=float(scores[row, index]),
+                date_computed=now,
+            )
+            for row, ((user_id, _), indexes) in enumerate(
+                zip(batch, top_offers(scores, top_n))
+            )
+            for rank, index in enumerate(indexes, start=1)
+        ]
+        with transaction.atomic():
+            OfferRecommendation.objects.filter(
+                user_id__in=[user_id for user_id, _ in batch]
+            ).delete()
+            OfferRecommendation.objects.bulk_create(recommendations)
+
+    # Users who were not scored now, e.g. because their applications were removed.
+    OfferRecommendation.objects.filter(date_computed__lt=now).delete()
+    return len(users)
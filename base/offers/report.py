@@ -7,3 +7,13 @@ def calculate_avg_rating(company):
         Avg("choose_rate")
     )
     return avg_rating["choose_rate__avg"]
+
+
+def calculate_avg_rating_for_offer(offer_id):
+    """
+    Returns the average rating of the company that published an offer, without loading the offer first.
+    """
+    avg_rating = CompanyReview.objects.filter(company__offer=offer_id).aggregate(
+        Avg("choose_rate")
+    )
+    return avg_rating["choose_rate__avg"]
@@ -0,0 +1,187 @@
+"""
+Salary benchmarks: percentiles of the offered salaries per position, level and localization.
+
+The salary of an offer is the midpoint of its range, or its only bound. The percentiles of all groups are
+computed at once with NumPy: the offers are sorted by group and salary, and the percentiles are interpolated
+between the sorted salaries at each group's boundaries. They are computed for every position × level ×
+localization and, as a fallback for sparse cities, for every position × level. The whole table is small and
+is kept in the cache, so offer pages and the offer form only look a group up in a dict.
+"""
+from dashboard.models import Offer
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+
+from .models import SalaryBenchmark
+
+CACHE_KEY = "offers:salary-benchmarks"
+PERCENTILES = (0.25, 0.5, 0.75)
+
+
+def salary_percentiles(keys, salaries, min_count) -> list:
+    """
+    Returns (key, count, p25, p50, p75) for every distinct row of keys with at least min_count salaries.
+    keys is a sequence of tuples of ints, salaries the salary of each row.
+    """
+    # Imported lazily, only the workers of the heavy queue load NumPy.
+    import numpy as np
+
+    if not len(salaries):
+        return []
+    keys = np.asarray(keys, dtype=np.int64)
+    salaries = np.asarray(salaries, dtype=np.float64)
+    # Sorted by the key columns, the first being the primary one, then by salary.
+    order = np.lexsort((salaries, *keys.T[::-1]))
+    keys, salaries = keys[order], salaries[order]
+    starts = np.flatnonzero(
+        np.concatenate(([True], np.any(keys[1:] != keys[:-1], axis=1)))
+    )
+    counts = np.diff(np.append(starts, len(salaries)))
+
+    columns = []
+    for percentile in PERCENTILES:
+        # Linear interpolation between the closest ranks, like numpy.percentile.
+        position = starts + percentile * (counts - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        fraction = position - lower
+        columns.append(salaries[lower] + (salaries[upper] - salaries[lower]) * fraction)
+
+    return [
+        (
+            tuple(keys[start].tolist()),
+            int(count),
+            *(round(float(column[i])) for column in columns),
+        )
+        for i, (start, count) in enumerate(zip(starts, counts))
+        if count >= min_count
+    ]
+
+
+def refresh_salary_benchmarks() -> int:
+    """
+    Recomputes all benchmarks from the offers, replaces the stored ones and the cached table.
+    Returns the number of benchmarks.
+    """
+    rows = []
+    offers = Offer.objects.filter(
+        Q(salary_from__isnull=False) | Q(salary_to__isnull=False)
+    ).values_list(
+        "position_id", "level_id", "localization_id", "salary_from", "salary_to"
+    )
+    for position, level, localization, salary_from, salary_to in offers:
+        bounds = [value for value in (salary_from, salary_to) if value is not None]
+        rows.append((position, level, localization, sum(bounds) / len(bounds)))
+
+    salaries = [row[3] for row in rows]
+    min_count = settings.SALARY_BENCHMARK_MIN_OFFERS
+    benchmarks = [
+        SalaryBenchmark(
+            position_id=position,
+            level_id=level,
+            localization_id=localization,
+            offer_count=count,
+            p25=p25,
+            p50=p50,
+            p75=p75,
+        )
+        for (position, level, localization), count, p25, p50, p75 in salary_percentiles(
+            [row[:3] for row in rows], salaries, min_count
+        )
+    ]
+    benchmarks.extend(
+        SalaryBenchmark(
+            position_id=position,
+            level_id=level,
+            offer_count=count,
+            p25=p25,
+            p50=p50,
+            p75=p75,
+        )
+        for (position, level), count, p25, p50, p75 in salary_percentiles(
+            [row[:2] for row in rows], salaries, min_count
+        )
+    )
+
+    with transaction.atomic():
+        SalaryBenchmark.objects.all().delete()
+        SalaryBenchmark.objects.bulk_create(benchmarks)
+        transaction.on_commit(lambda: _cache_table(benchmarks))
+    return len(benchmarks)
+
+
+def _cache_table(benchmarks) -> dict:
+    table = {
+        (benchmark.position_id, benchmark.level_id, benchmark.localization_id): (
+            benchmark.offer_count,
+            benchmark.p25,
+            benchmark.p50,
+            benchmark.p75,
+        )
+        for benchmark in benchmarks
+    }
+    caches[settings.SALARY_BENCHMARK_CACHE].set(
+        CACHE_KEY, table, settings.SALARY_BENCHMARK_CACHE_TIMEOUT
+    )
+    return table
+
+
+def benchmark_table() -> dict:
+    """
+    Returns (offer_count, p25, p50, p75) keyed by (position_id, level_id, localization_id), where
+    localization_id is None for the benchmarks of all localizations. Read from the cache, or once from the table.
+    """
+    table = caches[settings.SALARY_BENCHMARK_CACHE].get(CACHE_KEY)
+    if table is None:
+        table = _cache_table(SalaryBenchmark.objects.all())
+    return table
+
+
+def benchmark_for(position_id, level_id, localization_id) -> dict:
+    """
+    Returns the benchmark of a group as a dict of offer_count, p25, p50, p75 and whether it is local to the
+    localization, falling back to all localizations. Returns None when neither has enough offers.
+    """
+    table = benchmark_table()
+    for key, local in (
+        ((position_id, level_id, localization_id), True),
+        ((position_id, level_id, None), False),
+    ):
+        if key in table:
+            offer_count, p25, p50, p75 = table[key]
+            return {
+                "offer_count": offer_count,
+                "p25": p25,
+                "p50": p50,
+                "p75": p75,
+                "local": local,
+            }
+    return None
+
+
+def offer_benchmark(offer) -> dict:
+    """
+    Returns the benchmark of an offer's group with the quartile its salary falls into, from 1 to 4, or None.
+    """
+    benchmark = benchmark_for(offer.position_id, offer.level_id, offer.localization_id)
+    bounds = [
+        value for value in (offer.salary_from, offer.salary_to) if value is not None
+    ]
+    if benchmark and bounds:
+        salary = sum(bounds) / len(bounds)
+        benchmark["quartile"] = 1 + sum(
+            salary > benchmark[name] for name in ("p25", "p50", "p75")
+        )
+    return benchmark
+
+
+def benchmark_choices() -> dict:
+    """
+    Returns the benchmark table for the offer form's script, as [offer_count, p25, p50, p75] keyed by
+    "position-level-localization", the localization being empty for all localizations.
+    """
+    return {
+        f"{position}-{level}-{localization or ''}": list(values)
+        for (position, level, localization), values in benchmark_table().items()
+    }
@@ -0,0 +1,167 @@
+from accounts.models import CustomUser
+from base.enqueue import enqueue
+from dashboard.models import Application, Offer
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from . import stats
+from .models import CompanyReview, CompanyStats, SimilarOffer
+from .tasks import update_similar_offers_task
+
+# Fields whose change moves a row to another company, or changes its contribution to the stats.
+TRACKED_FIELDS = {
+    Offer: ("company_id",),
+    Application: ("offer_id",),
+    CompanyReview: ("company_id", "choose_rate"),
+}
+# Fields of offers that similar offers are computed from, besides the requirements.
+SIMILARITY_FIELDS = (
+    "position_id",
+    "level_id",
+    "localization_id",
+    "salary_from",
+    "salary_to",
+)
+
+
+@receiver(post_init, sender=Offer)
+@receiver(post_init, sender=Application)
+@receiver(post_init, sender=CompanyReview)
+def remember_tracked_fields(sender, instance, **kwargs):
+    """
+    Stores the loaded values of the tracked fields, so an update can tell which companies it affected.
+    """
+    instance._stats_loaded = {
+        name: instance.__dict__.get(name) for name in TRACKED_FIELDS[sender]
+    }
+
+
+def _changed_companies(instance):
+    """
+    Returns the companies before and after an update, for models that belong to a company through an offer
+    the ids of the offers are resolved to their companies.
+    """
+    loaded = instance._stats_loaded
+    current = {name: getattr(instance, name) for name in loaded}
+    if loaded == current:
+        return []
+    if isinstance(instance, Application):
+        offer_ids = [loaded["offer_id"], current["offer_id"]]
+        return list(
+            Offer.objects.filter(pk__in=offer_ids).values_list("company", flat=True)
+        )
+    return [loaded["company_id"], current["company_id"]]
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_role(sender, instance, **kwargs):
+    instance._role_loaded = instance.__dict__.get("role")
+
+
+@receiver(post_save, sender=CustomUser)
+def update_company_stats_on_role(sender, instance, created, raw=False, **kwargs):
+    """
+    Creates the stats of a new company or of a user that became one, and removes them when a company's role
+    changes to another one.
+    """
+    if raw:
+        return
+    was_company = not created and instance._role_loaded == "company"
+    if instance.role == "company" and not was_company:
+        stats.refresh_company_stats([instance.pk])
+    elif instance.role != "company" and was_company:
+        CompanyStats.objects.filter(pk=instance.pk).delete()
+    instance._role_loaded = instance.role
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_save, sender=Application)
+@receiver(post_save, sender=CompanyReview)
+def update_company_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Increments the stats of the company for a new row, and recomputes them when an update moved a row.
+    """
+    if raw:
+        return
+    if created:
+        if sender is Offer:
+            stats.offer_added(instance)
+        elif sender is Application:
+            stats.application_added(instance)
+        else:
+            stats.review_added(instance)
+    else:
+        companies = _changed_companies(instance)
+        if companies:
+            stats.refresh_company_stats(companies)
+    remember_tracked_fields(sender, instance)
+
+
+@receiver(post_delete, sender=Offer)
+@receiver(post_delete, sender=Application)
+@receiver(post_delete, sender=CompanyReview)
+def update_company_stats_on_delete(sender, instance, **kwargs):
+    if sender is Offer:
+        stats.offer_removed(instance)
+    elif sender is Application:
+        stats.application_removed(instance)
+    else:
+        stats.review_removed(instance)
+
+
+@receiver(post_init, sender=Offer)
+def remember_similarity_fields(sender, instance, **kwargs):
+    instance._similarity_loaded = {
+        name: instance.__dict__.get(name) for name in SIMILARITY_FIELDS
+    }
+
+
+def queue_similar_offers_update(offer_ids):
+    if offer_ids:
+        transaction.on_commit(lambda: enqueue(update_similar_offers_task, offer_ids))
+
+
+@receiver(post_save, sender=Offer)
+def update_similar_offers_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Queues the update of the similar offers for a new offer, or when an update changed what they compare.
+    """
+    if raw:
+        return
+    current = {name: getattr(instance, name) for name in SIMILARITY_FIELDS}
+    if created or current != instance._similarity_loaded:
+        queue_similar_offers_update([instance.pk])
+    instance._similarity_loaded = current
+
+
+@receiver(m2m_changed, sender=Offer.requirements.through)
+def update_similar_offers_on_requirements(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        queue_similar_offers_update([instance.pk])
+    elif pk_set:
+        queue_similar_offers_update(sorted(pk_set))
+
+
+@receiver(pre_delete, sender=Offer)
+def update_similar_offers_on_delete(sender, instance, **kwargs):
+    """
+    Queues the update of the offers that list a deleted offer as similar, their rows of it are deleted with it.
+    """
+    queue_similar_offers_update(
+        list(
+            SimilarOffer.objects.filter(similar=instance).values_list(
+                "offer_id", flat=True
+            )
+        )
+    )
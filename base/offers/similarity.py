@@ -0,0 +1,181 @@
+"""
+The nearest neighbours of every offer, shown as "similar offers" on the offer page.
+
+Offers are compared by the Jaccard similarity of their requirement sets, kept as a sparse binary matrix, equal
+position, level and localization, and the distance of their salary bands: the midpoints of their salary ranges
+in steps of SIMILAR_OFFERS_SALARY_BAND. The parts are weighted by SIMILAR_OFFERS_WEIGHTS, and the best
+SIMILAR_OFFERS_K offers scoring at least SIMILAR_OFFERS_MIN_SCORE are stored in SimilarOffer.
+
+Changes are applied incrementally: the neighbours of a changed offer are computed again, and so are those of
+every offer the change may have entered or left, that is the offers whose neighbours include it and the
+offers whose weakest neighbour scores lower than the changed offer now does.
+"""
+import numpy as np
+from dashboard.models import Offer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from scipy import sparse
+
+from .models import SimilarOffer
+from .recommender import top_offers
+
+
+class OfferFeatures:
+    """
+    The comparable attributes of all offers, one entry per offer in the order of ids.
+    Attributes:
+        - ids (list): The primary keys of the offers.
+        - index (dict): The position of every offer, keyed by its primary key.
+        - requirements (scipy.sparse.csr_matrix): A binary matrix of the requirements of every offer.
+        - sizes (numpy.ndarray): The number of requirements of every offer.
+        - position, level, localization (numpy.ndarray): The ids of the attributes of every offer.
+        - salary_band (numpy.ndarray): The salary band of every offer, -1 when it has no salary.
+    """
+
+    def __init__(self):
+        offers = list(
+            Offer.objects.order_by("pk").values_list(
+                "pk",
+                "position_id",
+                "level_id",
+                "localization_id",
+                "salary_from",
+                "salary_to",
+            )
+        )
+        self.ids = [offer[0] for offer in offers]
+        self.index = {pk: row for row, pk in enumerate(self.ids)}
+        self.position = np.array([offer[1] for offer in offers], dtype=np.int64)
+        self.level = np.array([offer[2] for offer in offers], dtype=np.int64)
+        self.localization = np.array([offer[3] for offer in offers], dtype=np.int64)
+        self.salary_band = np.array(
+            [salary_band(offer[4], offer[5]) for offer in offers], dtype=np.int64
+        )
+
+        columns = {}
+        rows, cols = [], []
+        for offer_id, requirement_id in Offer.requirements.through.objects.values_list(
+            "offer_id", "requirements_id"
+        ):
+            if offer_id in self.index:
+                rows.append(self.index[offer_id])
+                cols.append(columns.setdefault(requirement_id, len(columns)))
+        self.requirements = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(self.ids), len(columns))
+        )
+        self.sizes = np.asarray(self.requirements.sum(axis=1)).ravel()
+
+    def similarities(self, rows) -> np.ndarray:
+        """
+        Returns the similarities of the offers at rows to all offers, with -inf for an offer and itself.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        weights = settings.SIMILAR_OFFERS_WEIGHTS
+        common = (self.requirements[rows] @ self.requirements.T).toarray()
+        union = self.sizes[rows][:, None] + self.sizes[None, :] - common
+        jaccard = np.divide(common, union, out=np.zeros_like(common), where=union > 0)
+
+        bands = self.salary_band[rows][:, None]
+        known = (bands >= 0) & (self.salary_band[None, :] >= 0)
+        distance = np.abs(bands - self.salary_band[None, :])
+        salary = np.where(known, np.clip(1 - distance / 2, 0, 1), 0)
+
+        scores = (
+            weights["requirements"] * jaccard
+            + weights["position"] * (self.position[rows][:, None] == self.position)
+            + weights["level"] * (self.level[rows][:, None] == self.level)
+            + weights["localization"]
+            * (self.localization[rows][:, None] == self.localization)
+            + weights["salary"] * salary
+        )
+        scores[np.arange(len(rows)), rows] = -np.inf
+        return scores
+
+
+def salary_band(salary_from, salary_to) -> int:
+    """
+    Returns the band of the midpoint of a salary range, or of its only bound, and -1 without a salary.
+    """
+    bounds = [value for value in (salary_from, salary_to) if value is not None]
+    if not bounds:
+        return -1
+    return int(sum(bounds) / len(bounds)) // settings.SIMILAR_OFFERS_SALARY_BAND
+
+
+def store_neighbours(features, rows):
+    """
+    Computes the neighbours of the offers at rows, in batches, and replaces their stored ones.
+    """
+    batch_size = settings.SIMILAR_OFFERS_BATCH_SIZE
+    rows = sorted(rows)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        scores = features.similarities(batch)
+        neighbours = [
+            SimilarOffer(
+                offer_id=features.ids[row],
+                similar_id=features.ids[column],
+                rank=rank,
+                score=float(scores[position, column]),
+            )
+            for position, (row, columns) in enumerate(
+                zip(batch, top_offers(scores, settings.SIMILAR_OFFERS_K))
+            )
+            for rank, column in enumerate(
+                (
+                    column
+                    for column in columns
+                    if scores[position, column] >= settings.SIMILAR_OFFERS_MIN_SCORE
+                ),
+                start=1,
+            )
+        ]
+        with transaction.atomic():
+            SimilarOffer.objects.filter(
+                offer_id__in=[features.ids[row] for row in batch]
+            ).delete()
+            SimilarOffer.objects.bulk_create(neighbours)
+
+
+def rebuild_similar_offers() -> int:
+    """
+    Computes the neighbours of all offers from scratch. Returns the number of offers.
+    """
+    features = OfferFeatures()
+    store_neighbours(features, range(len(features.ids)))
+    return len(features.ids)
+
+
+def update_similar_offers(offer_ids) -> int:
+    """
+    Updates the neighbours after the offers of offer_ids were created or changed, or lost a deleted neighbour.
+    Returns the number of offers whose neighbours were computed again.
+    """
+    features = OfferFeatures()
+    changed = [features.index[pk] for pk in offer_ids if pk in features.index]
+    affected = set(changed)
+    affected.update(
+        features.index[pk]
+        for pk in SimilarOffer.objects.filter(similar_id__in=offer_ids).values_list(
+            "offer_id", flat=True
+        )
+        if pk in features.index
+    )
+
+    if changed:
+        # The weakest stored neighbour of every offer, an offer with fewer than k takes any match.
+        threshold = np.full(len(features.ids), settings.SIMILAR_OFFERS_MIN_SCORE)
+        for row in (
+            SimilarOffer.objects.values("offer_id")
+            .annotate(count=Count("pk"), weakest=Min("score"))
+            .order_by()
+        ):
+            position = features.index.get(row["offer_id"])
+            if position is not None and row["count"] >= settings.SIMILAR_OFFERS_K:
+                threshold[position] = max(row["weakest"], threshold[position])
+        best = features.similarities(changed).max(axis=0)
+        affected.update(np.flatnonzero(best >= threshold).tolist())
+
+    store_neighbours(features, affected)
+    return len(affected)
@@ -0,0 +1,160 @@
+from accounts.models import CustomUser
+from dashboard.models import Application, Offer
+from django.db.models import Avg, Count, F, FloatField, Max, Sum
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf
+
+from .models import CompanyReview, CompanyStats
+
+RECONCILE_BATCH_SIZE = 500
+
+
+def refresh_company_stats(company_ids):
+    """
+    Recomputes the stats of the given companies from the offer, application and review tables
+    and writes them with a single upsert.
+    """
+    company_ids = list(
+        CustomUser.objects.filter(pk__in=company_ids, role="company").values_list(
+            "pk", flat=True
+        )
+    )
+    if not company_ids:
+        return
+
+    offers = {
+        row["company"]: row
+        for row in Offer.objects.filter(company__in=company_ids)
+        .values("company")
+        .annotate(count=Count("id"), latest=Max("date_created"))
+        .order_by()
+    }
+    applications = dict(
+        Application.objects.filter(offer__company__in=company_ids)
+        .values("offer__company")
+        .annotate(count=Count("id"))
+        .order_by()
+        .values_list("offer__company", "count")
+    )
+    reviews = {
+        row["company"]: row
+        for row in CompanyReview.objects.filter(company__in=company_ids)
+        .values("company")
+        .annotate(count=Count("id"), total=Sum("choose_rate"), avg=Avg("choose_rate"))
+        .order_by()
+    }
+
+    stats = []
+    for company_id in company_ids:
+        offer_row = offers.get(company_id, {})
+        review_row = reviews.get(company_id, {})
+        stats.append(
+            CompanyStats(
+                company_id=company_id,
+                active_offer_count=offer_row.get("count", 0),
+                application_count=applications.get(company_id, 0),
+                latest_offer_date=offer_row.get("latest"),
+                review_count=review_row.get("count", 0),
+                rating_sum=review_row.get("total") or 0,
+                avg_rating=review_row.get("avg"),
+            )
+        )
+    CompanyStats.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=["company"],
+        update_fields=[
+            "active_offer_count",
+            "application_count",
+            "latest_offer_date",
+            "review_count",
+            "rating_sum",
+            "avg_rating",
+        ],
+    )
+
+
+def reconcile_company_stats() -> int:
+    """
+    Recomputes the stats of every company in batches, correcting any drift of the incremental updates, and
+    removes the stats of users that are no longer companies. Returns the number of companies.
+    """
+    CompanyStats.objects.exclude(company__role="company").delete()
+    company_ids = CustomUser.objects.filter(role="company").values_list("pk", flat=True)
+    batch = []
+    count = 0
+    for company_id in company_ids.iterator(chunk_size=RECONCILE_BATCH_SIZE):
+        batch.append(company_id)
+        count += 1
+        if len(batch) == RECONCILE_BATCH_SIZE:
+            refresh_company_stats(batch)
+            batch = []
+    refresh_company_stats(batch)
+    return count
+
+
+def _update_or_refresh(company_id, **changes):
+    """
+    Applies an incremental update to a company's stats, or computes them from scratch if they do not exist yet.
+    """
+    if not CompanyStats.objects.filter(pk=company_id).update(**changes):
+        refresh_company_stats([company_id])
+
+
+def offer_added(offer):
+    _update_or_refresh(
+        offer.company_id,
+        active_offer_count=F("active_offer_count") + 1,
+        latest_offer_date=Greatest(
+            Coalesce(F("latest_offer_date"), offer.date_created), offer.date_created
+        ),
+    )
+
+
+def offer_removed(offer):
+    """
+    Removals only update existing rows, during a cascading delete of the company the row may already be gone.
+    """
+    latest = Offer.objects.filter(company=offer.company_id).aggregate(
+        latest=Max("date_created")
+    )["latest"]
+    CompanyStats.objects.filter(pk=offer.company_id).update(
+        active_offer_count=F("active_offer_count") - 1,
+        latest_offer_date=latest,
+    )
+
+
+def application_added(application):
+    stats = CompanyStats.objects.filter(company__offer=application.offer_id)
+    if not stats.update(application_count=F("application_count") + 1):
+        refresh_company_stats(
+            Offer.objects.filter(pk=application.offer_id).values("company")
+        )
+
+
+def application_removed(application):
+    CompanyStats.objects.filter(company__offer=application.offer_id).update(
+        application_count=F("application_count") - 1
+    )
+
+
+def _rating_changes(rate, delta):
+    review_count = F("review_count") + delta
+    rating_sum = F("rating_sum") + rate * delta
+    return {
+        "review_count": review_count,
+        "rating_sum": rating_sum,
+        "avg_rating": Cast(rating_sum, FloatField()) / NullIf(review_count, 0),
+    }
+
+
+def review_added(review):
+    _update_or_refresh(
+        review.company_id,
+        **_rating_changes(review.choose_rate, 1),
+    )
+
+
+def review_removed(review):
+    CompanyStats.objects.filter(pk=review.company_id).update(
+        **_rating_changes(review.choose_rate, -1)
+    )
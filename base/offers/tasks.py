@@ -0,0 +1,52 @@
+from celery import shared_task
+
+from .stats import reconcile_company_stats
+
+
+@shared_task()
+def reconcile_company_stats_task():
+    """
+    A periodic Celery task that recomputes the stats of every company from scratch.
+    """
+    reconcile_company_stats()
+
+
+@shared_task()
+def recommend_offers_task():
+    """
+    A periodic Celery task that recomputes the offer recommendations of all applicants.
+    """
+    # Imported lazily, only the workers of the heavy queue load NumPy and SciPy.
+    from .recommender import recommend_offers
+
+    recommend_offers()
+
+
+@shared_task()
+def update_similar_offers_task(offer_ids):
+    """
+    A Celery task that updates the similar offers after offers were created, changed or deleted.
+    """
+    from .similarity import update_similar_offers
+
+    update_similar_offers(offer_ids)
+
+
+@shared_task()
+def rebuild_similar_offers_task():
+    """
+    A periodic Celery task that computes the similar offers of all offers from scratch.
+    """
+    from .similarity import rebuild_similar_offers
+
+    rebuild_similar_offers()
+
+
+@shared_task()
+def refresh_salary_benchmarks_task():
+    """
+    A periodic Celery task that recomputes the salary benchmarks from all offers.
+    """
+    from .salaries import refresh_salary_benchmarks
+
+    refresh_salary_benchmarks()
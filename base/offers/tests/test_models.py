@@ -1,8 +1,14 @@
+from unittest import mock
+
 from accounts.models import CustomUser
+from dashboard.models import Application, Country, Level, Localization, Offer, Position
+from django.core.management import call_command
 from django.test import TestCase
 from offers.models import (
     CompanyReview,
+    CompanyStats,
 )
+from offers.stats import reconcile_company_stats
 
 
 class CompanyReviewTestCase(TestCase):
@@ -42,3 +48,133 @@ class CompanyReviewTestCase(TestCase):
         Test if return_formatted_rate() method returns correct value.
         """
         self.assertEqual(self.company_review.return_formatted_rate, "5/5")
+
+
+class CompanyStatsTestCase(TestCase):
+    """
+    Test cases for the incremental maintenance and reconciliation of company stats.
+    """
+
+    def setUp(self) -> None:
+        self.company = CustomUser.objects.create(
+            username="CompanyX",
+            email="company@example.com",
+            password="Test123@",
+            role="company",
+        )
+        self.offer = Offer.objects.create(
+            name="Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Python Developer",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=self.company,
+            address="Zielona 4",
+        )
+
+    def create_application(self) -> Application:
+        return Application.objects.create(
+            first_name="Jan",
+            last_name="Kowalski",
+            email="jan@example.com",
+            message="Hello",
+            offer=self.offer,
+            expected_pay=5000,
+        )
+
+    def create_review(self, rate) -> CompanyReview:
+        return CompanyReview.objects.create(
+            choose_rate=rate,
+            email="testuser@example.com",
+            username="XXXXXXXX",
+            short_description="Test description",
+            company=self.company,
+        )
+
+    def test_stats_follow_created_and_deleted_rows(self) -> None:
+        """
+        Test if offers, applications and reviews update the stats of their company.
+        """
+        application = self.create_application()
+        self.create_application()
+        self.create_review(5)
+        review = self.create_review(2)
+
+        stats = CompanyStats.objects.get(company=self.company)
+        self.assertEqual(stats.active_offer_count, 1)
+        self.assertEqual(stats.application_count, 2)
+        self.assertEqual(stats.latest_offer_date, self.offer.date_created)
+        self.assertEqual(stats.review_count, 2)
+        self.assertEqual(stats.avg_rating, 3.5)
+
+        application.delete()
+        review.delete()
+
+        stats.refresh_from_db()
+        self.assertEqual(stats.application_count, 1)
+        self.assertEqual(stats.review_count, 1)
+        self.assertEqual(stats.avg_rating, 5)
+
+        self.offer.delete()
+
+        stats.refresh_from_db()
+        self.assertEqual(stats.active_offer_count, 0)
+        self.assertEqual(stats.application_count, 0)
+        self.assertIsNone(stats.latest_offer_date)
+
+    def test_changed_rating_is_recomputed(self) -> None:
+        """
+        Test if editing the rate of a review recomputes the average rating.
+        """
+        review = self.create_review(5)
+        review.choose_rate = 1
+        review.save()
+
+        self.assertEqual(CompanyStats.objects.get(company=self.company).avg_rating, 1)
+
+    def test_role_changes_create_and_remove_stats(self) -> None:
+        """
+        Test if a user that becomes a company gets stats, and a company that stops being one loses them.
+        """
+        user = CustomUser.objects.create(username="user", role="user")
+        self.assertFalse(CompanyStats.objects.filter(company=user).exists())
+
+        user.role = "company"
+        user.save()
+        self.assertTrue(CompanyStats.objects.filter(company=user).exists())
+
+        self.company.role = "user"
+        self.company.save()
+        self.assertFalse(CompanyStats.objects.filter(company=self.company).exists())
+
+    def test_reconcile_command_fills_missing_and_removes_stale_stats(self) -> None:
+        """
+        Test if the command creates missing stats and removes those of users that are not companies.
+        """
+        CompanyStats.objects.all().delete()
+        user = CustomUser.objects.create(username="user", role="user")
+        CustomUser.objects.filter(pk=user.pk).update(role="company")
+        reconcile_company_stats()
+        CustomUser.objects.filter(pk=user.pk).update(role="user")
+
+        call_command("reconcile_company_stats", stdout=mock.Mock())
+
+        self.assertEqual(
+            list(CompanyStats.objects.values_list("company", flat=True)),
+            [self.company.pk],
+        )
+
+    def test_reconcile_corrects_drift(self) -> None:
+        """
+        Test if reconcile_company_stats() recomputes stats that drifted from the source tables.
+        """
+        self.create_application()
+        CompanyStats.objects.update(application_count=10, active_offer_count=0)
+
+        reconcile_company_stats()
+
+        stats = CompanyStats.objects.get(company=self.company)
+        self.assertEqual(stats.application_count, 1)
+        self.assertEqual(stats.active_offer_count, 1)
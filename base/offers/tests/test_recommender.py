@@ -0,0 +1,130 @@
+from io import StringIO
+
+from accounts.models import CustomUser
+from dashboard.models import (
+    Application,
+    Country,
+    Level,
+    Localization,
+    Offer,
+    Position,
+    Requirements,
+)
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from offers.models import OfferRecommendation
+from offers.recommender import recommend_offers
+
+
+class OfferRecommenderTestCase(TestCase):
+    """
+    Test cases for the offer recommendations of applicants.
+    """
+
+    def setUp(self) -> None:
+        self.company = CustomUser.objects.create(username="company", role="company")
+        self.warsaw = Localization.objects.create(
+            country=Country.objects.create(name="Poland"), city="Warsaw"
+        )
+        self.junior = Level.objects.create(level_name="Junior")
+        self.python = Position.objects.create(position_name="Python")
+        self.django = Requirements.objects.create(name="Django")
+
+        self.applied = self.create_offer("Django Developer", "Build Django apps")
+        self.similar = self.create_offer("Backend Developer", "Django and REST APIs")
+        self.other = self.create_offer(
+            "Accountant",
+            "Keep the books",
+            position=Position.objects.create(position_name="Finance"),
+            requirements=[Requirements.objects.create(name="Excel")],
+        )
+
+        self.user = CustomUser.objects.create_user(
+            username="jan", email="jan@example.com", password="Test123@", role="user"
+        )
+        Application.objects.create(
+            first_name="Jan",
+            last_name="Kowalski",
+            email="jan@example.com",
+            phone_number="+48500600700",
+            message="Hello",
+            offer=self.applied,
+            expected_pay=5000,
+        )
+
+    def create_offer(self, name, description, position=None, requirements=None):
+        offer = Offer.objects.create(
+            name=name,
+            position=position or self.python,
+            level=self.junior,
+            description=description,
+            localization=self.warsaw,
+            company=self.company,
+            address="Zielona 4",
+        )
+        offer.requirements.set(requirements or [self.django])
+        return offer
+
+    def test_similar_offers_are_recommended_first(self) -> None:
+        """
+        Test that offers similar to the applied one rank first and the applied offer is never recommended.
+        """
+        self.assertEqual(recommend_offers(), 1)
+
+        recommendations = list(
+            OfferRecommendation.objects.filter(user=self.user).order_by("rank")
+        )
+        self.assertEqual(
+            [recommendation.offer for recommendation in recommendations],
+            [self.similar, self.other],
+        )
+        self.assertEqual(
+            [recommendation.rank for recommendation in recommendations], [1, 2]
+        )
+        self.assertGreater(recommendations[0].score, recommendations[1].score)
+
+    def test_recommendations_are_replaced_and_removed(self) -> None:
+        """
+        Test that a new run replaces the recommendations and drops those of users without applications.
+        """
+        call_command("recommend_offers", top_n=1, stdout=StringIO())
+        self.assertEqual(
+            list(OfferRecommendation.objects.values_list("offer", flat=True)),
+            [self.similar.pk],
+        )
+
+        Application.objects.all().delete()
+        recommend_offers()
+
+        self.assertFalse(OfferRecommendation.objects.exists())
+
+    def test_profile_page_lists_recommendations_in_one_query(self) -> None:
+        """
+        Test that the profile page reads the recommendations with their offers in one query.
+        """
+        recommend_offers()
+        self.client.login(username="jan", password="Test123@")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("accounts:user_profile"))
+
+        self.assertContains(response, "Recommended for you")
+        self.assertEqual(
+            sum(
+                'FROM "offers_offerrecommendation"' in query["sql"] for query in queries
+            ),
+            1,
+        )
+        # The offers and their companies were loaded by the same query.
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [
+                    recommendation.offer.company.username
+                    for recommendation in response.context["recommendations"]
+                ],
+                ["company", "company"],
+            )
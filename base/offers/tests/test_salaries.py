@@ -0,0 +1,133 @@
+import numpy as np
+from accounts.models import CustomUser
+from dashboard.models import (
+    Country,
+    Level,
+    Localization,
+    Offer,
+    Position,
+    Requirements,
+)
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from offers.models import SalaryBenchmark
+from offers.salaries import (
+    benchmark_for,
+    refresh_salary_benchmarks,
+    salary_percentiles,
+)
+
+
+@override_settings(SALARY_BENCHMARK_MIN_OFFERS=3)
+class SalaryBenchmarkTestCase(TestCase):
+    """
+    Test cases for the salary benchmarks per position, level and localization.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = CustomUser.objects.create_user(
+            username="company", password="Test123@", role="company"
+        )
+        poland = Country.objects.create(name="Poland")
+        self.warsaw = Localization.objects.create(country=poland, city="Warsaw")
+        self.krakow = Localization.objects.create(country=poland, city="Krakow")
+        self.junior = Level.objects.create(level_name="Junior")
+        self.python = Position.objects.create(position_name="Python")
+        self.django = Requirements.objects.create(name="Django")
+
+        self.offers = [
+            self.create_offer(self.warsaw, salary_from, salary_to)
+            for salary_from, salary_to in (
+                (6000, 8000),
+                (8000, 10000),
+                (10000, 12000),
+                (12000, None),
+            )
+        ]
+        self.create_offer(self.krakow, 9000, 11000)
+
+    def create_offer(self, localization, salary_from, salary_to):
+        offer = Offer.objects.create(
+            name="Python Developer",
+            position=self.python,
+            level=self.junior,
+            description="Python",
+            localization=localization,
+            company=self.company,
+            address="Zielona 4",
+            salary_from=salary_from,
+            salary_to=salary_to,
+        )
+        offer.requirements.set([self.django])
+        return offer
+
+    def test_percentiles_match_numpy(self) -> None:
+        """
+        Test that the percentiles of every group match numpy.percentile and small groups are left out.
+        """
+        rng = np.random.default_rng(7)
+        keys = rng.integers(0, 4, size=(500, 2))
+        salaries = rng.integers(3000, 30000, size=500)
+
+        result = salary_percentiles(keys.tolist(), salaries.tolist(), min_count=1)
+
+        self.assertEqual(len(result), 16)
+        for key, count, *values in result:
+            group = salaries[(keys == key).all(axis=1)]
+            self.assertEqual(count, len(group))
+            self.assertEqual(
+                values, [round(v) for v in np.percentile(group, [25, 50, 75])]
+            )
+        self.assertEqual(
+            salary_percentiles([(1,), (1,), (2,)], [1, 2, 3], min_count=2),
+            [((1,), 2, 1, 2, 2)],
+        )
+
+    def test_sparse_localizations_fall_back_to_all_localizations(self) -> None:
+        """
+        Test that a localization with too few offers gets the benchmark of all localizations.
+        """
+        self.assertEqual(refresh_salary_benchmarks(), 2)
+
+        self.assertEqual(
+            benchmark_for(self.python.pk, self.junior.pk, self.warsaw.pk),
+            {"offer_count": 4, "p25": 8500, "p50": 10000, "p75": 11250, "local": True},
+        )
+        self.assertEqual(
+            benchmark_for(self.python.pk, self.junior.pk, self.krakow.pk),
+            {"offer_count": 5, "p25": 9000, "p50": 10000, "p75": 11000, "local": False},
+        )
+        self.assertIsNone(benchmark_for(self.python.pk, 0, self.warsaw.pk))
+
+    def test_offer_page_reads_the_benchmark_from_the_cache(self) -> None:
+        """
+        Test that the offer page shows the benchmark and the quartile of the offer without querying benchmarks.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_salary_benchmarks()
+        SalaryBenchmark.objects.all().delete()
+
+        response = self.client.get(
+            reverse("offers:offer-detail", args=[self.offers[0].pk])
+        )
+
+        self.assertEqual(response.context["salary_benchmark"]["quartile"], 1)
+        self.assertContains(response, "less than three quarters of them")
+
+    def test_offer_form_includes_the_benchmarks(self) -> None:
+        """
+        Test that the offer form embeds the benchmarks for its script.
+        """
+        refresh_salary_benchmarks()
+        self.client.login(username="company", password="Test123@")
+
+        response = self.client.get(reverse("dashboard:create-offer"))
+
+        key = f"{self.python.pk}-{self.junior.pk}-{self.warsaw.pk}"
+        self.assertEqual(
+            response.context["salary_benchmarks"][key], [4, 8500, 10000, 11250]
+        )
+        self.assertContains(response, 'id="salary-benchmarks"')
@@ -0,0 +1,128 @@
+from unittest import mock
+
+from accounts.models import CustomUser
+from dashboard.models import (
+    Country,
+    Level,
+    Localization,
+    Offer,
+    Position,
+    Requirements,
+)
+from django.test import TestCase
+from django.urls import reverse
+
+from offers.models import SimilarOffer
+from offers.similarity import rebuild_similar_offers, update_similar_offers
+
+
+class SimilarOffersTestCase(TestCase):
+    """
+    Test cases for the similar offers shown on the offer page.
+    """
+
+    def setUp(self) -> None:
+        self.company = CustomUser.objects.create(username="company", role="company")
+        self.warsaw = Localization.objects.create(
+            country=Country.objects.create(name="Poland"), city="Warsaw"
+        )
+        self.junior = Level.objects.create(level_name="Junior")
+        self.python = Position.objects.create(position_name="Python")
+        self.django = Requirements.objects.create(name="Django")
+        self.sql = Requirements.objects.create(name="SQL")
+
+        self.offer = self.create_offer("Django Developer", [self.django, self.sql])
+        self.close = self.create_offer("Backend Developer", [self.django, self.sql])
+        self.partial = self.create_offer("Python Developer", [self.django])
+        self.unrelated = self.create_offer(
+            "Accountant",
+            [Requirements.objects.create(name="Excel")],
+            position=Position.objects.create(position_name="Finance"),
+            level=Level.objects.create(level_name="Senior"),
+            salary=(20000, 25000),
+        )
+
+    def create_offer(self, name, requirements, position=None, level=None, salary=None):
+        salary_from, salary_to = salary or (8000, 10000)
+        offer = Offer.objects.create(
+            name=name,
+            position=position or self.python,
+            level=level or self.junior,
+            description=name,
+            localization=self.warsaw,
+            company=self.company,
+            address="Zielona 4",
+            salary_from=salary_from,
+            salary_to=salary_to,
+        )
+        offer.requirements.set(requirements)
+        return offer
+
+    def neighbours(self, offer) -> list:
+        return list(
+            SimilarOffer.objects.filter(offer=offer)
+            .order_by("rank")
+            .values_list("similar_id", flat=True)
+        )
+
+    def test_neighbours_are_ranked_by_similarity(self) -> None:
+        """
+        Test that offers sharing more attributes rank first and unrelated offers are left out.
+        """
+        rebuild_similar_offers()
+
+        self.assertEqual(self.neighbours(self.offer), [self.close.pk, self.partial.pk])
+        self.assertEqual(self.neighbours(self.unrelated), [])
+        self.assertAlmostEqual(
+            SimilarOffer.objects.get(offer=self.offer, similar=self.close).score, 1.0
+        )
+
+    def test_changes_update_the_affected_neighbours(self) -> None:
+        """
+        Test that a new offer enters the neighbours of others, and that a changed one leaves them.
+        """
+        rebuild_similar_offers()
+        twin = self.create_offer("Django Engineer", [self.django, self.sql])
+
+        update_similar_offers([twin.pk])
+        self.assertEqual(
+            self.neighbours(self.offer), [self.close.pk, twin.pk, self.partial.pk]
+        )
+
+        Offer.objects.filter(pk=self.close.pk).update(
+            position=self.unrelated.position, level=self.unrelated.level
+        )
+        self.close.requirements.clear()
+        update_similar_offers([self.close.pk])
+        self.assertEqual(self.neighbours(self.offer), [twin.pk, self.partial.pk])
+        self.assertEqual(self.neighbours(self.close), [self.unrelated.pk])
+
+    def test_signals_queue_updates(self) -> None:
+        """
+        Test that changed requirements and deleted offers queue updates of the offers they affect.
+        """
+        rebuild_similar_offers()
+        with mock.patch("offers.signals.enqueue") as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.partial.requirements.add(self.sql)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.close.delete()
+
+        self.assertEqual(
+            [call.args[1] for call in enqueue.call_args_list],
+            [[self.partial.pk], [self.offer.pk, self.partial.pk]],
+        )
+
+    def test_offer_page_lists_similar_offers(self) -> None:
+        """
+        Test that the offer page shows the similar offers in order.
+        """
+        rebuild_similar_offers()
+
+        response = self.client.get(reverse("offers:offer-detail", args=[self.offer.pk]))
+
+        self.assertEqual(
+            [neighbour.similar for neighbour in response.context["similar_offers"]],
+            [self.close, self.partial],
+        )
+        self.assertContains(response, "Backend Developer")
@@ -9,8 +9,26 @@ from dashboard.models import (
     Offer,
     Application,
 )
-from django.test import TestCase, Client
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.shortcuts import render
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    Client,
+    AsyncRequestFactory,
+    override_settings,
+)
 from django.urls import reverse
+from offers.models import CompanyReview
+from offers.views import (
+    AsyncHomePageView,
+    AsyncOfferDetailView,
+    AsyncCompanyDetailView,
+)
 
 
 class OffersViewTestCase(TestCase):
@@ -105,6 +123,47 @@ class OffersViewTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "companies_list.html")
 
+    def test_companies_list_view_sorts_and_filters_by_stats(self):
+        """
+        Test that the companies list can be sorted by applications and filtered to companies with offers.
+        """
+        busy = CustomUser.objects.create_user(
+            role="company",
+            username="busy",
+            email="busy@example.com",
+            password="Test123@",
+        )
+        offer = Offer.objects.create(
+            name="Senior Python Developer",
+            position=self.position,
+            level=self.level,
+            description=self.description,
+            localization=self.localization,
+            company=busy,
+            address="Zielona 4",
+        )
+        for _ in range(2):
+            Application.objects.create(
+                first_name="user",
+                last_name="user",
+                email="user@example.com",
+                message="Hello",
+                offer=offer,
+                expected_pay=5000,
+            )
+
+        response = self.client.get(
+            reverse("offers:companies-list"), {"order_by": "applications"}
+        )
+        companies = [stats.company for stats in response.context["object_list"]]
+        self.assertEqual(companies[0], busy)
+
+        response = self.client.get(
+            reverse("offers:companies-list"), {"has_offers": "on"}
+        )
+        for stats in response.context["object_list"]:
+            self.assertGreater(stats.active_offer_count, 0)
+
     def test_company_detail_view_get_method_returns_200_status_code(self):
         """
         Test that the company detail view returns a 200 status code and uses the correct template.
@@ -148,3 +207,285 @@ class OffersViewTestCase(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "add_company_review.html")
+
+
+class CompanyDetailPaginationTestCase(TestCase):
+    """
+    Test case for the paginated offers and reviews of the company detail page.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a company with more offers and reviews than fit on one page.
+        """
+        self.client = Client()
+        self.company = CustomUser.objects.create(
+            role="company", username="Nokia", email="nokia123@wp.pl", password="XXXXXXX"
+        )
+        position = Position.objects.create(position_name="Python")
+        level = Level.objects.create(level_name="Junior")
+        localization = Localization.objects.create(
+            country=Country.objects.create(name="Poland"), city="Warsaw"
+        )
+        requirement = Requirements.objects.create(name="Git")
+        for number in range(12):
+            offer = Offer.objects.create(
+                name=f"Offer {number}",
+                position=position,
+                level=level,
+                description="Python Developer",
+                localization=localization,
+                company=self.company,
+                address="Zielona 4",
+            )
+            offer.requirements.add(requirement)
+            CompanyReview.objects.create(
+                choose_rate=number % 5 + 1,
+                email="user@example.com",
+                short_description=f"Review {number}",
+                company=self.company,
+            )
+
+    def test_company_detail_view_renders_first_pages_only(self) -> None:
+        """
+        Test that the company page renders the first page of offers and reviews with links to the next ones.
+        """
+        response = self.client.get(
+            reverse("offers:company-detail", kwargs={"pk": self.company.id})
+        )
+        self.assertEqual(len(response.context["object_list"]), 10)
+        self.assertEqual(len(response.context["reviews"]), 10)
+        self.assertContains(response, "Load more offers")
+        self.assertContains(response, "Load more reviews")
+
+    def test_company_offers_view_returns_the_next_page(self) -> None:
+        """
+        Test that the offers fragment continues after the cursor of the first page.
+        """
+        response = self.client.get(
+            reverse("offers:company-detail", kwargs={"pk": self.company.id})
+        )
+        cursor = response.context["offers_page"].next_cursor
+        response = self.client.get(
+            reverse("offers:company-offers", kwargs={"pk": self.company.id}),
+            {"cursor": cursor},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "company_offers_list.html")
+        self.assertEqual(len(response.context["offers_page"].object_list), 2)
+        self.assertNotContains(response, "Load more offers")
+
+    def test_company_pages_query_count_does_not_grow_with_offers(self) -> None:
+        """
+        Test that the company page and its offers fragment render the requirements of every offer from one
+        prefetch query instead of queries per offer.
+        """
+        url = reverse("offers:company-detail", kwargs={"pk": self.company.id})
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertContains(response, "Git and 1 other requirement/s")
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("offers:company-offers", kwargs={"pk": self.company.id}),
+                {"cursor": response.context["offers_page"].next_cursor},
+            )
+        self.assertContains(response, "Git and 1 other requirement/s", count=2)
+
+    def test_company_reviews_view_sorts_by_rating(self) -> None:
+        """
+        Test that reviews sorted by rating come highest rated first, across pages.
+        """
+        response = self.client.get(
+            reverse("offers:company-detail", kwargs={"pk": self.company.id}),
+            {"reviews_sort": "rating"},
+        )
+        first_page = response.context["reviews"]
+        response = self.client.get(
+            reverse("offers:company-reviews", kwargs={"pk": self.company.id}),
+            {"sort": "rating", "cursor": response.context["reviews_page"].next_cursor},
+        )
+        rates = [review.choose_rate for review in first_page]
+        rates += [review.choose_rate for review in response.context["reviews_page"]]
+        self.assertEqual(rates, sorted(rates, reverse=True))
+        self.assertEqual(len(rates), 12)
+
+    def test_company_reviews_view_invalid_cursor_returns_404(self) -> None:
+        """
+        Test that a malformed cursor returns 404.
+        """
+        response = self.client.get(
+            reverse("offers:company-reviews", kwargs={"pk": self.company.id}),
+            {"cursor": "broken"},
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(ASYNC_CONCURRENT_QUERIES=False)
+class AsyncOffersViewTestCase(TestCase):
+    """
+    Test case for the async versions of the read-heavy offer views.
+    Concurrent queries are disabled because other connections cannot see the test transaction.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a company with an offer and a review, and a factory for async requests.
+        """
+        self.factory = AsyncRequestFactory()
+        self.company = CustomUser.objects.create(
+            role="company", username="Nokia", email="nokia123@wp.pl", password="XXXXXXX"
+        )
+        self.offer = Offer.objects.create(
+            name="Junior Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Junior Python Developer with 10 years exp",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=self.company,
+            address="Zielona 4",
+        )
+        self.offer.requirements.add(Requirements.objects.create(name="Git"))
+        CompanyReview.objects.create(
+            choose_rate=4,
+            email="user@example.com",
+            short_description="Good",
+            company=self.company,
+        )
+
+    def get(self, view, path, **kwargs):
+        request = self.factory.get(path)
+        request.user = AnonymousUser()
+        return async_to_sync(view.as_view())(request, **kwargs)
+
+    def test_async_home_page_view_returns_200_status_code(self) -> None:
+        """
+        Test that the async home page view renders the page of offers.
+        """
+        response = self.get(AsyncHomePageView, "/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Junior Python Developer")
+
+    def test_async_home_page_view_invalid_page_raises_404(self) -> None:
+        """
+        Test that the async home page view raises 404 for a page out of range.
+        """
+        with self.assertRaises(Http404):
+            self.get(AsyncHomePageView, "/?page=5")
+
+    def test_async_home_page_view_invalid_page_numbers_raise_404(self) -> None:
+        """
+        Test that the async home page view raises 404 for page numbers below 1 and for non-numeric pages,
+        like ListView.
+        """
+        for page in ("0", "-3", "first"):
+            with self.subTest(page=page), self.assertRaises(Http404):
+                self.get(AsyncHomePageView, f"/?page={page}")
+
+    def test_async_home_page_view_serves_the_last_page(self) -> None:
+        """
+        Test that the async home page view accepts page=last, like ListView.
+        """
+        response = self.get(AsyncHomePageView, "/?page=last")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Junior Python Developer")
+
+    def test_async_offer_detail_view_returns_200_status_code(self) -> None:
+        """
+        Test that the async offer detail view renders the offer with its requirements.
+        """
+        response = self.get(AsyncOfferDetailView, "/offer/", pk=self.offer.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Git")
+
+    def test_async_offer_detail_view_has_the_offer_sections(self) -> None:
+        """
+        Test that the async offer detail view renders the same sections as OfferDetailView.
+        """
+        with mock.patch("offers.views.render", wraps=render) as rendered:
+            self.get(AsyncOfferDetailView, "/offer/", pk=self.offer.id)
+
+        context = rendered.call_args.args[2]
+        for name in ("study_resources", "salary_benchmark", "similar_offers"):
+            self.assertIn(name, context)
+
+    def test_async_company_detail_view_returns_200_status_code(self) -> None:
+        """
+        Test that the async company detail view renders the rating, offers and reviews.
+        """
+        response = self.get(AsyncCompanyDetailView, "/company/", pk=self.company.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Company rate 4.0/5")
+        self.assertContains(response, "Junior Python Developer")
+        self.assertContains(response, "Good")
+
+    def test_async_company_detail_view_unknown_company_raises_404(self) -> None:
+        """
+        Test that the async company detail view raises 404 for a user that is not a company.
+        """
+        with self.assertRaises(Http404):
+            self.get(AsyncCompanyDetailView, "/company/", pk=self.company.id + 100)
+
+
+@override_settings(ASYNC_CONCURRENT_QUERIES=True)
+class ConcurrentAsyncOffersViewTestCase(TransactionTestCase):
+    """
+    Test case for the async offer views running their queries concurrently, each in a thread with its own
+    database connection. The data is committed, so those connections can see it.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a company with an offer and a review, and a factory for async requests.
+        """
+        self.factory = AsyncRequestFactory()
+        self.company = CustomUser.objects.create(
+            role="company", username="Nokia", email="nokia123@wp.pl", password="XXXXXXX"
+        )
+        self.offer = Offer.objects.create(
+            name="Junior Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Junior Python Developer with 10 years exp",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=self.company,
+            address="Zielona 4",
+        )
+        self.offer.requirements.add(Requirements.objects.create(name="Git"))
+        CompanyReview.objects.create(
+            choose_rate=4,
+            email="user@example.com",
+            short_description="Good",
+            company=self.company,
+        )
+
+    def get(self, view, path, **kwargs):
+        request = self.factory.get(path)
+        request.user = AnonymousUser()
+        return async_to_sync(view.as_view())(request, **kwargs)
+
+    def test_async_views_render_with_concurrent_queries(self) -> None:
+        """
+        Test that the async views render the committed data read from the worker threads.
+        """
+        response = self.get(AsyncHomePageView, "/")
+        self.assertContains(response, "Junior Python Developer")
+
+        response = self.get(AsyncOfferDetailView, "/offer/", pk=self.offer.id)
+        self.assertContains(response, "Git")
+
+        response = self.get(AsyncCompanyDetailView, "/company/", pk=self.company.id)
+        self.assertContains(response, "Company rate 4.0/5")
+        self.assertContains(response, "Good")
+
+    def test_async_home_page_view_invalid_pages_raise_404(self) -> None:
+        """
+        Test that invalid pages raise 404 before any query is sliced with concurrent queries too.
+        """
+        for page in ("0", "-3", "99"):
+            with self.subTest(page=page), self.assertRaises(Http404):
+                self.get(AsyncHomePageView, f"/?page={page}")
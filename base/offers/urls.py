@@ -1,14 +1,34 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
 app_name = "offers"
 
+if settings.ASYNC_VIEWS:
+    home_view = views.AsyncHomePageView
+    offer_detail_view = views.AsyncOfferDetailView
+    company_detail_view = views.AsyncCompanyDetailView
+else:
+    home_view = views.HomePageView
+    offer_detail_view = views.OfferDetailView
+    company_detail_view = views.CompanyDetailView
+
 urlpatterns = [
-    path("", views.HomePageView.as_view(), name="home"),
+    path("", home_view.as_view(), name="home"),
     path("companies/", views.CompaniesListView.as_view(), name="companies-list"),
-    path("offer/<int:pk>/", views.OfferDetailView.as_view(), name="offer-detail"),
-    path("company/<int:pk>/", views.CompanyDetailView.as_view(), name="company-detail"),
+    path("offer/<int:pk>/", offer_detail_view.as_view(), name="offer-detail"),
+    path("company/<int:pk>/", company_detail_view.as_view(), name="company-detail"),
+    path(
+        "company/<int:pk>/offers/",
+        views.CompanyOffersView.as_view(),
+        name="company-offers",
+    ),
+    path(
+        "company/<int:pk>/reviews/",
+        views.CompanyReviewsView.as_view(),
+        name="company-reviews",
+    ),
     path(
         "apply/<int:offer_id>/", views.ApplyForOfferView.as_view(), name="apply-offer"
     ),
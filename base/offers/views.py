@@ -1,15 +1,26 @@
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from accounts.models import CustomUser
+from asgiref.sync import sync_to_async
+from base.concurrency import gather_queries
+from base.identity import get_identity_map
+from base.ratelimit import ratelimit
 from dashboard.models import Offer, Application
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.db.models import QuerySet
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import F, QuerySet
 from django.http import Http404
+from django.shortcuts import render
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
+from django.views import View
 from django.views.generic import ListView, DetailView, CreateView, TemplateView
+from study.matching import recommended_resources
 
 from .forms import (
     ChoosePositionsForm,
+    CompanySortingForm,
     LevelFilterForm,
     LocalizationFilterForm,
     ContractFilterForm,
@@ -17,8 +28,30 @@ from .forms import (
     SearchForm,
     RemoteFilterForm,
 )
-from .models import CompanyReview
-from .report import calculate_avg_rating
+from .models import CompanyReview, CompanyStats, SimilarOffer
+from .queries import (
+    filter_offers,
+    get_company_offers_page,
+    get_company_reviews_page,
+    get_review_sort,
+)
+from .report import calculate_avg_rating, calculate_avg_rating_for_offer
+from .salaries import offer_benchmark
+
+
+def get_filter_forms(params) -> Dict[str, Any]:
+    """
+    Returns the forms for filtering and searching offers on the home page, bound to the GET parameters.
+    """
+    return {
+        "positions_form": ChoosePositionsForm(params),
+        "level_form": LevelFilterForm(params),
+        "localization_form": LocalizationFilterForm(params),
+        "contract_form": ContractFilterForm(params),
+        "date_sorting_form": DateSortingForm(params),
+        "search_form": SearchForm(params),
+        "remote_form": RemoteFilterForm(params),
+    }
 
 
 class HomePageView(ListView):
@@ -42,39 +75,7 @@ class HomePageView(ListView):
         name, remote, choose_positions, level, localization, contract and order_by.
         """
         queryset = super().get_queryset()
-
-        name = self.request.GET.get("name")
-        if name:
-            queryset = queryset.filter(name__icontains=name)
-
-        remote = self.request.GET.get("remote")
-        if remote:
-            queryset = queryset.filter(remote=True)
-
-        positions = self.request.GET.getlist("choose_positions")
-        if positions:
-            queryset = queryset.filter(position__in=positions)
-
-        level = self.request.GET.get("level")
-        if level:
-            queryset = queryset.filter(level=level)
-
-        localization = self.request.GET.get("localization")
-        if localization:
-            queryset = queryset.filter(localization=localization)
-
-        contract = self.request.GET.get("contract")
-        if contract:
-            queryset = queryset.filter(contract=contract)
-
-        order_by = self.request.GET.get("order_by")
-        if order_by:
-            if order_by == "1":
-                queryset = queryset.order_by("date_created")
-            if order_by == "2":
-                queryset = queryset.order_by("-date_created")
-
-        return queryset
+        return filter_offers(queryset, self.request.GET)
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         """
@@ -82,16 +83,48 @@ class HomePageView(ListView):
         It adds different forms for filtering and searching the queryset to the context data.
         """
         context = super().get_context_data(**kwargs)
+        context.update(get_filter_forms(self.request.GET))
+        return context
 
-        context["positions_form"] = ChoosePositionsForm(self.request.GET)
-        context["level_form"] = LevelFilterForm(self.request.GET)
-        context["localization_form"] = LocalizationFilterForm(self.request.GET)
-        context["contract_form"] = ContractFilterForm(self.request.GET)
-        context["date_sorting_form"] = DateSortingForm(self.request.GET)
-        context["search_form"] = SearchForm(self.request.GET)
-        context["remote_form"] = RemoteFilterForm(self.request.GET)
 
-        return context
+def get_offer_sections(pk, offer=None) -> Dict[str, Callable[[], Any]]:
+    """
+    Returns the functions that fetch the sections of the offer detail page below the offer itself, keyed by
+    their name in the context. They only need the offer's pk, so AsyncOfferDetailView runs them concurrently
+    with fetching the offer. The salary benchmark reads the offer's group from offer when it is given.
+    """
+
+    def study_resources():
+        requirement_ids = Offer.requirements.through.objects.filter(
+            offer_id=pk
+        ).values_list("requirements_id", flat=True)
+        return recommended_resources(
+            list(requirement_ids), settings.STUDY_OFFER_RESOURCES
+        )
+
+    def salary_benchmark():
+        current = offer
+        if current is None:
+            current = (
+                Offer.objects.filter(pk=pk)
+                .only("position", "level", "localization", "salary_from", "salary_to")
+                .first()
+            )
+        return offer_benchmark(current) if current is not None else None
+
+    def similar_offers():
+        # Precomputed in the background, see offers/similarity.py.
+        return list(
+            SimilarOffer.objects.filter(offer_id=pk)
+            .select_related("similar__company", "similar__localization")
+            .order_by("rank")
+        )
+
+    return {
+        "study_resources": study_resources,
+        "salary_benchmark": salary_benchmark,
+        "similar_offers": similar_offers,
+    }
 
 
 class OfferDetailView(DetailView):
@@ -111,38 +144,65 @@ class OfferDetailView(DetailView):
         company = self.object.company
         avg_rating = calculate_avg_rating(company)
         context["avg_rating"] = avg_rating
+        context.update(
+            {
+                name: fetch()
+                for name, fetch in get_offer_sections(
+                    self.object.pk, self.object
+                ).items()
+            }
+        )
         return context
 
 
 class CompaniesListView(ListView):
     """
     This module defines a class called CompaniesListView which is a subclass of the built-in ListView class.
-    This view renders a template 'companies_list.html' and displays a paginated list of CustomUser objects that
-    have a role of 'company'.
+    This view renders a template 'companies_list.html' and displays a paginated list of companies, read from the
+    materialized CompanyStats table so sorting and filtering by activity is a single indexed query.
     Attributes:
-        - model (CustomUser): The model that the view is based on.
+        - model (CompanyStats): The model that the view is based on.
         - paginate_by (int): The number of objects to display per page.
         - template_name (str): The name of the template that will be used to render the view.
     """
 
-    model = CustomUser
+    model = CompanyStats
     paginate_by = 10
     template_name = "companies_list.html"
 
+    ORDERINGS = {
+        "offers": ("-active_offer_count", "-company"),
+        "applications": ("-application_count", "-company"),
+        "latest": (F("latest_offer_date").desc(nulls_last=True), "-company"),
+        "rating": (F("avg_rating").desc(nulls_last=True), "-company"),
+    }
+
     def get_queryset(self) -> QuerySet[Any]:
         """
         Returns the queryset that will be used to display the list of objects on the page.
-        It filters the queryset to only include objects with a role of 'company'.
+        It filters and sorts the company stats by the GET parameters min_rating, has_offers and order_by.
         """
-        queryset = super().get_queryset()
-        queryset = queryset.filter(role="company")
-        return queryset
+        queryset = super().get_queryset().select_related("company")
+
+        min_rating = self.request.GET.get("min_rating")
+        if min_rating and min_rating.isdigit():
+            queryset = queryset.filter(avg_rating__gte=int(min_rating))
+
+        if self.request.GET.get("has_offers"):
+            queryset = queryset.filter(active_offer_count__gt=0)
+
+        ordering = self.ORDERINGS.get(
+            self.request.GET.get("order_by"), self.ORDERINGS["offers"]
+        )
+        return queryset.order_by(*ordering)
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         """
         Returns the context data that will be used to render the template.
+        It adds the form for sorting and filtering companies to the context data.
         """
         context = super().get_context_data(**kwargs)
+        context["sorting_form"] = CompanySortingForm(self.request.GET)
         return context
 
 
@@ -171,16 +231,75 @@ class CompanyDetailView(DetailView):
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         """
         Returns the context data that will be used to render the template.
-        It adds the related Offer objects to the context data.
+        It adds the first pages of the related Offer and CompanyReview objects to the context data,
+        further pages are loaded from CompanyOffersView and CompanyReviewsView.
         """
         context = super().get_context_data(**kwargs)
-        avg_rating = calculate_avg_rating(self.object)
-        context["object_list"] = Offer.objects.filter(company=self.kwargs["pk"])
-        context["avg_rating"] = avg_rating
-        context["reviews"] = CompanyReview.objects.filter(company=self.kwargs["pk"])
+        review_sort = get_review_sort(self.request.GET.get("reviews_sort"))
+        offers_page = get_company_offers_page(self.object.pk)
+        reviews_page = get_company_reviews_page(self.object.pk, review_sort)
+        context["avg_rating"] = calculate_avg_rating(self.object)
+        context.update(
+            get_company_pages_context(offers_page, reviews_page, review_sort)
+        )
         return context
 
 
+def get_company_pages_context(offers_page, reviews_page, review_sort) -> Dict[str, Any]:
+    """
+    Returns the context for the offers and reviews sections of the company detail page.
+    """
+    return {
+        "object_list": offers_page.object_list,
+        "offers_page": offers_page,
+        "reviews": reviews_page.object_list,
+        "reviews_page": reviews_page,
+        "review_sort": review_sort,
+    }
+
+
+class CompanyOffersView(View):
+    """
+    Returns a further page of a company's offers as an HTML fragment, loaded by the company detail page.
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        """
+        Renders the page of offers that follows the cursor given in the GET parameters.
+        """
+        try:
+            offers_page = get_company_offers_page(pk, request.GET.get("cursor"))
+        except InvalidPage:
+            raise Http404("Invalid cursor.")
+        context = {"company_id": pk, "offers_page": offers_page}
+        return render(request, "company_offers_list.html", context)
+
+
+class CompanyReviewsView(View):
+    """
+    Returns a further page of a company's reviews as an HTML fragment, loaded by the company detail page.
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        """
+        Renders the page of reviews that follows the cursor given in the GET parameters, in the requested order.
+        """
+        review_sort = get_review_sort(request.GET.get("sort"))
+        try:
+            reviews_page = get_company_reviews_page(
+                pk, review_sort, request.GET.get("cursor")
+            )
+        except InvalidPage:
+            raise Http404("Invalid cursor.")
+        context = {
+            "company_id": pk,
+            "reviews_page": reviews_page,
+            "review_sort": review_sort,
+        }
+        return render(request, "company_reviews_list.html", context)
+
+
+@method_decorator(ratelimit("apply"), name="dispatch")
 class ApplyForOfferView(CreateView):
     """
     This module defines a class called ApplyForOfferView which is a subclass of the built-in CreateView class.
@@ -227,6 +346,7 @@ class ApplySuccessView(TemplateView):
     template_name = "apply_success.html"
 
 
+@method_decorator(ratelimit("review"), name="dispatch")
 class AddCompanyReviewView(UserPassesTestMixin, CreateView):
     """
     View that handles the creation of a new company review by a user.
@@ -241,7 +361,9 @@ class AddCompanyReviewView(UserPassesTestMixin, CreateView):
         """
         Tests if the user is authorized to create a review for the company.
         """
-        company = CustomUser.objects.get(pk=self.kwargs["company_id"])
+        company = get_identity_map(self.request).get(
+            CustomUser, self.kwargs["company_id"]
+        )
         return company.role == "company"
 
     def get_initial(self):
@@ -267,3 +389,129 @@ class AddCompanyReviewView(UserPassesTestMixin, CreateView):
         if not self.test_func():
             raise Http404
         return super().dispatch(request, *args, **kwargs)
+
+
+class AsyncHomePageView(View):
+    """
+    An async version of HomePageView for ASGI deployments.
+    The total count and the requested page of offers are fetched concurrently instead of one after another.
+    Attributes:
+        - template_name (str): The name of the template that will be used to render the view.
+        - paginate_by (int): The number of objects to display per page.
+    """
+
+    template_name = "home_page.html"
+    paginate_by = 10
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Fetches the filtered offers of the requested page and their total count concurrently and renders them.
+        """
+        queryset = filter_offers(Offer.objects.all(), request.GET)
+        paginator = Paginator(queryset, self.paginate_by)
+
+        def page_objects(number):
+            offset = (number - 1) * self.paginate_by
+            return list(queryset[offset : offset + self.paginate_by])
+
+        # The same page numbers as ListView: a positive number, or "last" which needs the count first.
+        page_param = request.GET.get("page") or 1
+        if page_param == "last":
+            (paginator.count,) = await gather_queries(queryset.count)
+            number = paginator.num_pages
+            (objects,) = await gather_queries(lambda: page_objects(number))
+        else:
+            try:
+                number = int(page_param)
+            except ValueError:
+                raise Http404("Invalid page.")
+            if number < 1:
+                raise Http404("Invalid page.")
+            paginator.count, objects = await gather_queries(
+                queryset.count, lambda: page_objects(number)
+            )
+
+        try:
+            paginator.validate_number(number)
+        except InvalidPage:
+            raise Http404("Invalid page.")
+        page = Page(objects, number, paginator)
+
+        context = {
+            "paginator": paginator,
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+            "object_list": objects,
+            "offer_list": objects,
+            **get_filter_forms(request.GET),
+        }
+        return await sync_to_async(render)(request, self.template_name, context)
+
+
+class AsyncOfferDetailView(View):
+    """
+    An async version of OfferDetailView for ASGI deployments.
+    The offer, the average rating of its company and the sections of get_offer_sections are fetched concurrently.
+    Attributes:
+        - template_name (str): The name of the template that will be used to render the view.
+    """
+
+    template_name = "offer_detail.html"
+
+    async def get(self, request, pk, *args, **kwargs):
+        """
+        Fetches the offer, its company rating and the other sections of the page concurrently and renders them.
+        """
+        offers = Offer.objects.select_related(
+            "company", "level", "position", "localization"
+        ).prefetch_related("requirements", "contract")
+        sections = get_offer_sections(pk)
+
+        offer, avg_rating, *section_values = await gather_queries(
+            lambda: offers.filter(pk=pk).first(),
+            lambda: calculate_avg_rating_for_offer(pk),
+            *sections.values(),
+        )
+        if offer is None:
+            raise Http404("No offer found matching the query")
+
+        context = {
+            "object": offer,
+            "offer": offer,
+            "avg_rating": avg_rating,
+            **dict(zip(sections, section_values)),
+        }
+        return await sync_to_async(render)(request, self.template_name, context)
+
+
+class AsyncCompanyDetailView(View):
+    """
+    An async version of CompanyDetailView for ASGI deployments.
+    The company, its rating, its offers and its reviews are fetched concurrently.
+    Attributes:
+        - template_name (str): The name of the template that will be used to render the view.
+    """
+
+    template_name = "company_detail.html"
+
+    async def get(self, request, pk, *args, **kwargs):
+        """
+        Fetches the company, its average rating, offers and reviews concurrently and renders them.
+        """
+        review_sort = get_review_sort(request.GET.get("reviews_sort"))
+        company, avg_rating, offers_page, reviews_page = await gather_queries(
+            lambda: CustomUser.objects.filter(pk=pk, role="company").first(),
+            lambda: calculate_avg_rating(pk),
+            lambda: get_company_offers_page(pk),
+            lambda: get_company_reviews_page(pk, review_sort),
+        )
+        if company is None:
+            raise Http404("No company found matching the query")
+
+        context = {
+            "object": company,
+            "customuser": company,
+            "avg_rating": avg_rating,
+            **get_company_pages_context(offers_page, reviews_page, review_sort),
+        }
+        return await sync_to_async(render)(request, self.template_name, context)
@@ -1,6 +1,12 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 
-from .models import Category, Resources
+from . import importer
+from .forms import ResourceImportForm
+from .models import Category, ResourceLinkStatus, Resources
 
 
 @admin.register(Category)
@@ -11,7 +17,61 @@ class ProductAdmin(admin.ModelAdmin):
 
 
 @admin.register(Resources)
-class ProductAdmin(admin.ModelAdmin):
+class ResourcesAdmin(admin.ModelAdmin):
     list_display = ["name", "category", "url", "date_created"]
 
     list_filter = ["name", "category", "date_created"]
+
+    change_list_template = "admin/study/resources/change_list.html"
+
+    def get_urls(self):
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="study_resources_import",
+            ),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        """
+        Imports an uploaded file of resources and lists the rows that were rejected.
+        """
+        if not self.has_add_permission(request):
+            return redirect("admin:study_resources_changelist")
+        form = ResourceImportForm(request.POST or None, request.FILES or None)
+        report = None
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            try:
+                report = importer.import_resources(
+                    upload.read().decode("utf-8-sig"),
+                    format=form.cleaned_data["format"],
+                    filename=upload.name,
+                    default_category=form.cleaned_data["category"],
+                    dry_run=form.cleaned_data["dry_run"],
+                )
+            except (UnicodeDecodeError, ValueError) as error:
+                form.add_error("file", str(error))
+            else:
+                messages.success(request, report.summary)
+                if not report.rejected and not form.cleaned_data["dry_run"]:
+                    return redirect("admin:study_resources_changelist")
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Import resources",
+            "form": form,
+            "report": report,
+            "rejected": report.rejected[: settings.STUDY_IMPORT_REPORT_LIMIT]
+            if report
+            else [],
+        }
+        return TemplateResponse(request, "admin/study/resources/import.html", context)
+
+
+@admin.register(ResourceLinkStatus)
+class ResourceLinkStatusAdmin(admin.ModelAdmin):
+    list_display = ["resource", "status_code", "failures", "is_dead", "date_checked"]
+
+    list_filter = ["is_dead", "date_checked"]
@@ -34,3 +34,43 @@ class ChooseCategoriesForm(forms.Form):
         required=False,
         label="Choose positions",
     )
+
+
+class LinkStatusForm(forms.Form):
+    """
+    LinkStatusForm is a Django form that provides a checkbox to hide the resources whose links are dead.
+    Attributes:
+        - hide_dead (BooleanField): A field that represents whether resources with dead links are hidden.
+    """
+
+    hide_dead = forms.BooleanField(required=False, label="Hide dead links")
+
+
+class ResourceImportForm(forms.Form):
+    """
+    ResourceImportForm is a Django form for uploading a file of study resources in the admin.
+    Attributes:
+        - file (FileField): A CSV, JSON or browser bookmarks file.
+        - format (ChoiceField): The format of the file, detected when left empty.
+        - category (CharField): The category of the rows that have none.
+        - dry_run (BooleanField): Whether the file is only checked.
+    """
+
+    FORMATS = (
+        ("", "Detect"),
+        ("csv", "CSV"),
+        ("json", "JSON"),
+        ("bookmarks", "Browser bookmarks"),
+    )
+
+    file = forms.FileField()
+    format = forms.ChoiceField(choices=FORMATS, required=False)
+    category = forms.CharField(
+        max_length=50,
+        required=False,
+        label="Default category",
+        help_text="Used for rows without a category, created if it does not exist.",
+    )
+    dry_run = forms.BooleanField(
+        required=False, help_text="Only check the file, without importing it."
+    )
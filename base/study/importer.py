@@ -0,0 +1,385 @@
+"""
+Bulk import of study resources from CSV, JSON and browser bookmark exports.
+
+Every row is validated and its URL normalized (see study/urlnorm.py). Rows whose URL is already stored, or
+appears earlier in the same file, are skipped by looking their hashes up in the url_hash index, after the hashes
+of resources stored before url_hash existed are filled in. Categories are
+matched by name, case-insensitively, and the missing ones are created in one statement. The new resources are
+inserted with bulk_create in batches of STUDY_IMPORT_BATCH_SIZE, all in one transaction, and queued for
+matching to offer requirements once it is committed.
+"""
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone as dt_timezone
+from html.parser import HTMLParser
+from typing import Optional
+
+from base.enqueue import enqueue
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Category, Resources
+from .tasks import index_resources_task
+from .urlnorm import hash_url, normalize_url
+
+FORMATS = ("csv", "json", "bookmarks")
+
+validate_url = URLValidator(schemes=["http", "https"])
+
+# Resources indexed by one task.
+INDEX_BATCH_SIZE = 500
+
+# SQLite allows 999 parameters per statement.
+LOOKUP_CHUNK_SIZE = 900
+
+
+@dataclass
+class ImportRow:
+    """
+    One resource read from an import file.
+    Attributes:
+        - line (int): The line of the row in a CSV or bookmarks file, or its position in a JSON list.
+        - url (str): The URL of the resource.
+        - name (str): The name of the resource, the host of the URL when empty.
+        - description (str): The description of the resource.
+        - category (str): The name of the category, the default category of the import when empty.
+        - date_created (datetime.datetime, optional): When the resource was added, the import time when empty.
+    """
+
+    line: int
+    url: str
+    name: str = ""
+    description: str = ""
+    category: str = ""
+    date_created: Optional[datetime] = None
+
+
+@dataclass
+class ImportReport:
+    """
+    The outcome of an import.
+    Attributes:
+        - created (int): The number of resources inserted.
+        - duplicates (int): The number of rows skipped because their URL is stored or repeated in the file.
+        - categories_created (list): The names of the categories created.
+        - rejected (list): (line, reason) pairs of the invalid rows.
+    """
+
+    created: int = 0
+    duplicates: int = 0
+    categories_created: list = field(default_factory=list)
+    rejected: list = field(default_factory=list)
+
+    @property
+    def summary(self) -> str:
+        summary = (
+            f"Imported {self.created} resources, skipped {self.duplicates} duplicates "
+            f"and rejected {len(self.rejected)} rows."
+        )
+        if self.categories_created:
+            summary += f" Created the categories {', '.join(self.categories_created)}."
+        return summary
+
+
+class BookmarksParser(HTMLParser):
+    """
+    Reads the links of a Netscape bookmark file, the export format of all major browsers.
+    The folder a link is in becomes its category.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.folders = []
+        self.folder = None
+        self.text = None
+        self.target = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "dl":
+            self.folders.append(self.folder)
+            self.folder = None
+        elif tag == "h3":
+            self.text, self.target = "", "folder"
+        elif tag == "a":
+            self.rows.append(
+                ImportRow(
+                    line=self.getpos()[0],
+                    url=attrs.get("href") or "",
+                    category=next(
+                        (name for name in reversed(self.folders) if name), ""
+                    ),
+                    date_created=parse_timestamp(attrs.get("add_date")),
+                )
+            )
+            self.text, self.target = "", "name"
+        elif tag == "dd" and self.rows:
+            self.text, self.target = "", "description"
+        elif tag == "dt":
+            self.finish()
+
+    def handle_endtag(self, tag):
+        if tag == "dl":
+            self.finish()
+            if self.folders:
+                self.folders.pop()
+            self.folder = None
+        elif tag in ("h3", "a"):
+            self.finish()
+
+    def handle_data(self, data):
+        if self.text is not None:
+            self.text += data
+
+    def finish(self):
+        text = " ".join((self.text or "").split())
+        if self.target == "folder":
+            self.folder = text
+        elif self.target == "name":
+            self.rows[-1].name = text
+        elif self.target == "description":
+            self.rows[-1].description = text
+        self.text = self.target = None
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    try:
+        return datetime.fromtimestamp(int(value), tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def parse_csv(text: str) -> list:
+    """
+    Reads a CSV file with a header of url, name, description and category columns, only url is required.
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    rows = []
+    for record in reader:
+        record = {
+            (key or "").strip().lower(): (value or "").strip()
+            for key, value in record.items()
+            if isinstance(value, str) or value is None
+        }
+        rows.append(
+            ImportRow(
+                line=reader.line_num,
+                url=record.get("url", ""),
+                name=record.get("name", ""),
+                description=record.get("description", ""),
+                category=record.get("category", ""),
+            )
+        )
+    return rows
+
+
+def parse_json(text: str) -> list:
+    """
+    Reads a JSON list of objects with url, name, description and category keys, or an object with such a
+    list under "resources".
+    """
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("resources", [])
+    if not isinstance(data, list):
+        raise ValueError("Expected a list of resources.")
+    rows = []
+    for position, record in enumerate(data, start=1):
+        if not isinstance(record, dict):
+            record = {}
+        rows.append(
+            ImportRow(
+                line=position,
+                **{
+                    key: str(record.get(key) or "").strip()
+                    for key in ("url", "name", "description", "category")
+                },
+            )
+        )
+    return rows
+
+
+def parse_bookmarks(text: str) -> list:
+    parser = BookmarksParser()
+    parser.feed(text)
+    parser.close()
+    parser.finish()
+    return parser.rows
+
+
+PARSERS = {"csv": parse_csv, "json": parse_json, "bookmarks": parse_bookmarks}
+
+
+def detect_format(filename: str, text: str) -> str:
+    """
+    Guesses the format of an import file from its extension, or else from its content.
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension in (".csv", ".json"):
+        return extension[1:]
+    if extension in (".html", ".htm"):
+        return "bookmarks"
+    start = text.lstrip()[:1024]
+    if start[:1] in ("[", "{"):
+        return "json"
+    if "NETSCAPE-Bookmark-file" in start or "<DL" in start.upper():
+        return "bookmarks"
+    return "csv"
+
+
+def validate(row: ImportRow, default_category: str = "") -> Optional[str]:
+    """
+    Normalizes a row in place and returns why it is invalid, or None if it can be imported.
+    """
+    if not row.url:
+        return "The URL is missing."
+    try:
+        row.url = normalize_url(row.url)
+        validate_url(row.url)
+    except (ValueError, ValidationError):
+        return f"The URL {row.url[:100]!r} is not valid."
+    row.category = (row.category or default_category)[:50]
+    if not row.category:
+        return "The category is missing."
+    row.name = (row.name or row.url.split("/")[2])[:50]
+    row.description = row.description[:200]
+    return None
+
+
+def backfill_url_hashes(batch_size=None) -> int:
+    """
+    Hashes the URLs of the resources stored without a hash, e.g. before url_hash existed.
+    Returns the number of resources updated.
+    """
+    batch_size = batch_size or settings.STUDY_IMPORT_BATCH_SIZE
+    updated = 0
+    while True:
+        resources = list(
+            Resources.objects.filter(url_hash="")
+            .order_by()
+            .only("pk", "url")[:batch_size]
+        )
+        if not resources:
+            return updated
+        for resource in resources:
+            resource.url_hash = hash_url(resource.url)
+        Resources.objects.bulk_update(resources, ["url_hash"])
+        updated += len(resources)
+
+
+def stored_hashes(hashes) -> set:
+    """
+    Returns the hashes of the URLs already stored, looked up in chunks.
+    """
+    hashes = list(hashes)
+    stored = set()
+    for start in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+        stored.update(
+            Resources.objects.filter(
+                url_hash__in=hashes[start : start + LOOKUP_CHUNK_SIZE]
+            )
+            .order_by()
+            .values_list("url_hash", flat=True)
+        )
+    return stored
+
+
+def resolve_categories(names, dry_run=False) -> tuple:
+    """
+    Returns the categories of the names, keyed by the lowercased name, and the names of the created ones.
+    """
+    categories = {}
+    for category in Category.objects.order_by("pk"):
+        categories.setdefault(category.name.lower(), category)
+    missing = {}
+    for name in names:
+        if name.lower() not in categories:
+            missing.setdefault(name.lower(), name)
+    if missing and not dry_run:
+        Category.objects.bulk_create(Category(name=name) for name in missing.values())
+        for category in Category.objects.filter(name__in=missing.values()):
+            categories.setdefault(category.name.lower(), category)
+    return categories, sorted(missing.values())
+
+
+def import_resources(
+    text: str,
+    format: str = None,
+    filename: str = "",
+    default_category: str = "",
+    batch_size: int = None,
+    dry_run: bool = False,
+) -> ImportReport:
+    """
+    Imports the resources of an import file and reports what was created and rejected.
+    The format is detected when not given. Rows without a category get default_category, which is created
+    like the categories of the file if it does not exist. With dry_run the file is checked without writing anything.
+    Raises ValueError if the file cannot be read in the format.
+    """
+    batch_size = batch_size or settings.STUDY_IMPORT_BATCH_SIZE
+    format = format or detect_format(filename, text)
+    try:
+        rows = PARSERS[format](text)
+    except (csv.Error, json.JSONDecodeError) as error:
+        raise ValueError(f"The file is not valid {format}: {error}") from error
+
+    report = ImportReport()
+    valid = {}
+    for row in rows:
+        reason = validate(row, default_category)
+        if reason:
+            report.rejected.append((row.line, reason))
+            continue
+        url_hash = hash_url(row.url)
+        if url_hash in valid:
+            report.duplicates += 1
+        else:
+            valid[url_hash] = row
+
+    # Derived from stored data only, so it is also done in a dry run.
+    backfill_url_hashes(batch_size)
+    stored = stored_hashes(valid)
+    report.duplicates += len(stored)
+    new = {url_hash: row for url_hash, row in valid.items() if url_hash not in stored}
+    report.created = len(new)
+
+    with transaction.atomic():
+        categories, report.categories_created = resolve_categories(
+            {row.category for row in new.values()}, dry_run
+        )
+        if dry_run:
+            return report
+        now = timezone.now()
+        created = Resources.objects.bulk_create(
+            (
+                Resources(
+                    name=row.name,
+                    description=row.description,
+                    url=row.url,
+                    url_hash=url_hash,
+                    date_created=row.date_created or now,
+                    category=categories[row.category.lower()],
+                )
+                for url_hash, row in new.items()
+            ),
+            batch_size=batch_size,
+        )
+        # bulk_create() sends no post_save signals, so the new resources are queued for matching here.
+        resource_ids = [resource.pk for resource in created if resource.pk is not None]
+        transaction.on_commit(lambda: queue_indexing(resource_ids))
+    return report
+
+
+def queue_indexing(resource_ids):
+    """
+    Queues the indexing of resources in batches of INDEX_BATCH_SIZE, see study/matching.py.
+    """
+    for start in range(0, len(resource_ids), INDEX_BATCH_SIZE):
+        enqueue(index_resources_task, resource_ids[start : start + INDEX_BATCH_SIZE])
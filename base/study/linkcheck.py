@@ -0,0 +1,282 @@
+"""
+Concurrent health checks and previews of the URLs of study resources.
+
+All URLs are fetched concurrently on one event loop. The connection pool is bounded by LINKCHECK_CONCURRENCY,
+and every host gets at most LINKCHECK_PER_HOST requests at a time, started at least LINKCHECK_HOST_DELAY
+seconds apart, so a category full of links to one site does not hammer it. The check records the status,
+the URL after redirects and the OpenGraph title and image of every page, and stores a thumbnail of the image.
+Thumbnails are only fetched again when the page points to another image.
+"""
+import asyncio
+import contextlib
+import io
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+from base.metrics import Counter
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from .models import ResourceLinkStatus, Resources
+
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+LINKCHECK_RESULTS = Counter(
+    "linkcheck_results", "Checked resource links, by outcome (ok, failed)."
+)
+
+
+class OpenGraphParser(HTMLParser):
+    """
+    Collects the OpenGraph title and image of a page, and its <title> as a fallback.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.properties = {}
+        self.title = ""
+        self.in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            attrs = dict(attrs)
+            key = attrs.get("property") or attrs.get("name")
+            if key in ("og:title", "og:image") and attrs.get("content"):
+                self.properties.setdefault(key, attrs["content"].strip())
+        elif tag == "title":
+            self.in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self.in_title = False
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title += data
+
+
+def parse_open_graph(html: str, base_url: str) -> tuple:
+    """
+    Returns the title and the absolute URL of the image of a page, both empty if the page has none.
+    """
+    parser = OpenGraphParser()
+    parser.feed(html)
+    parser.close()
+    title = parser.properties.get("og:title") or " ".join(parser.title.split())
+    image = parser.properties.get("og:image", "")
+    return title[:255], urljoin(base_url, image)[:500] if image else ""
+
+
+def make_thumbnail(data: bytes) -> Optional[bytes]:
+    """
+    Returns a JPEG thumbnail of an image that fits LINKCHECK_PREVIEW_SIZE, or None if it is not a valid image.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail(settings.LINKCHECK_PREVIEW_SIZE)
+            output = io.BytesIO()
+            image.convert("RGB").save(output, format="JPEG", quality=80, optimize=True)
+    except (OSError, Image.DecompressionBombError):
+        return None
+    return output.getvalue()
+
+
+@dataclass
+class LinkCheck:
+    """
+    The result of checking one URL.
+    Attributes:
+        - url (str): The checked URL.
+        - status_code (int, optional): The HTTP status of the response, None when the request failed.
+        - final_url (str): The URL of the response after redirects.
+        - error (str): Why the request failed, empty on success.
+        - og_title (str): The OpenGraph title of the page.
+        - og_image (str): The URL of the OpenGraph image of the page.
+        - preview (bytes, optional): A new thumbnail of the image, None when it was not fetched.
+    """
+
+    url: str
+    status_code: Optional[int] = None
+    final_url: str = ""
+    error: str = ""
+    og_title: str = ""
+    og_image: str = ""
+    preview: Optional[bytes] = None
+
+    @property
+    def ok(self) -> bool:
+        return (
+            not self.error and self.status_code is not None and self.status_code < 400
+        )
+
+
+class HostThrottle:
+    """
+    Limits the requests to every host to concurrency at a time, started at least delay seconds apart.
+    Only used from one event loop, so it needs no locks.
+    """
+
+    def __init__(self, concurrency, delay):
+        self.concurrency = concurrency
+        self.delay = delay
+        self.semaphores = {}
+        self.next_start = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url):
+        host = urlsplit(url).hostname or ""
+        semaphore = self.semaphores.setdefault(
+            host, asyncio.Semaphore(self.concurrency)
+        )
+        async with semaphore:
+            now = asyncio.get_running_loop().time()
+            start = max(now, self.next_start.get(host, now))
+            self.next_start[host] = start + self.delay
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+async def fetch_preview(session, throttle, url) -> Optional[bytes]:
+    """
+    Fetches an image and returns its thumbnail, or None if it cannot be fetched or is too large.
+    """
+    limit = settings.LINKCHECK_MAX_IMAGE_BYTES
+    try:
+        async with throttle.slot(url):
+            async with session.get(url) as response:
+                if response.status >= 400 or not response.content_type.startswith(
+                    "image/"
+                ):
+                    return None
+                data = await response.content.read(limit + 1)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None
+    if len(data) > limit:
+        return None
+    return await asyncio.to_thread(make_thumbnail, data)
+
+
+async def check_link(session, throttle, url, previous_image="") -> LinkCheck:
+    """
+    Checks one URL and reads the preview of its page. The thumbnail is only fetched when the image differs
+    from previous_image, the image the stored thumbnail was made from.
+    """
+    result = LinkCheck(url)
+    try:
+        async with throttle.slot(url):
+            async with session.get(
+                url, max_redirects=settings.LINKCHECK_MAX_REDIRECTS
+            ) as response:
+                result.status_code = response.status
+                result.final_url = str(response.url)[:500]
+                if response.status < 400 and response.content_type in HTML_TYPES:
+                    body = await response.content.read(
+                        settings.LINKCHECK_MAX_PAGE_BYTES
+                    )
+                    html = body.decode(response.charset or "utf-8", errors="replace")
+                    result.og_title, result.og_image = parse_open_graph(
+                        html, result.final_url
+                    )
+    except (aiohttp.ClientError, asyncio.TimeoutError, LookupError) as error:
+        result.error = f"{type(error).__name__}: {error}"[:255]
+        return result
+    if result.og_image and result.og_image != previous_image:
+        result.preview = await fetch_preview(session, throttle, result.og_image)
+    return result
+
+
+async def check_links(links) -> list:
+    """
+    Checks (url, previous_image) pairs concurrently and returns their LinkChecks in order.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=settings.LINKCHECK_CONCURRENCY,
+        limit_per_host=settings.LINKCHECK_PER_HOST,
+    )
+    throttle = HostThrottle(settings.LINKCHECK_PER_HOST, settings.LINKCHECK_HOST_DELAY)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=settings.LINKCHECK_TIMEOUT),
+        headers={"User-Agent": settings.LINKCHECK_USER_AGENT},
+    ) as session:
+        return await asyncio.gather(
+            *(check_link(session, throttle, url, image) for url, image in links)
+        )
+
+
+def save_results(resources, results, statuses):
+    """
+    Stores the LinkChecks of the resources, updating their statuses keyed by resource id. A link is dead after
+    LINKCHECK_DEAD_AFTER failed checks in a row, so one timeout does not hide it.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        for resource, result in zip(resources, results):
+            status = statuses.get(resource.pk) or ResourceLinkStatus(resource=resource)
+            LINKCHECK_RESULTS.inc(outcome="ok" if result.ok else "failed")
+            status.status_code = result.status_code
+            status.final_url = result.final_url
+            status.error = result.error
+            status.failures = 0 if result.ok else status.failures + 1
+            status.is_dead = status.failures >= settings.LINKCHECK_DEAD_AFTER
+            status.date_checked = now
+            if result.ok:
+                status.og_title = result.og_title
+                previous = status.preview.name
+                if result.preview is not None:
+                    status.preview.save(
+                        "preview.jpg", ContentFile(result.preview), save=False
+                    )
+                elif result.og_image != status.og_image:
+                    # The page has no image anymore, or the new one could not be fetched.
+                    status.preview = None
+                status.og_image = result.og_image
+                if previous and previous != status.preview.name:
+                    discard_preview(previous)
+            status.save()
+
+
+def discard_preview(name):
+    """
+    Deletes a replaced thumbnail once the transaction is committed, unless a status still uses it: the storage
+    names files by their content, so statuses with identical thumbnails share one file.
+    """
+    field = ResourceLinkStatus._meta.get_field("preview")
+
+    def delete():
+        if not ResourceLinkStatus.objects.filter(preview=name).exists():
+            field.storage.delete(name)
+
+    transaction.on_commit(delete)
+
+
+def check_resource_links(batch_size=None) -> int:
+    """
+    Checks the URLs of all resources, batch by batch, and stores the results. Returns the number of dead links.
+    """
+    batch_size = batch_size or settings.LINKCHECK_BATCH_SIZE
+    ids = list(Resources.objects.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start : start + batch_size]
+        resources = list(Resources.objects.filter(pk__in=batch).order_by("pk"))
+        statuses = ResourceLinkStatus.objects.in_bulk(batch)
+        links = [
+            (resource.url, _previous_image(statuses.get(resource.pk)))
+            for resource in resources
+        ]
+        save_results(resources, asyncio.run(check_links(links)), statuses)
+    return ResourceLinkStatus.objects.filter(is_dead=True).count()
+
+
+def _previous_image(status) -> str:
+    # The image the stored thumbnail was made from, a thumbnail that could not be made is tried again.
+    if status is None or not status.preview:
+        return ""
+    return status.og_image
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from study import importer
+
+
+class Command(BaseCommand):
+    """
+    Imports study resources from a CSV, JSON or browser bookmarks file, skipping URLs that are already stored.
+    """
+
+    help = "Imports study resources from a CSV, JSON or bookmarks file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The file to import.")
+        parser.add_argument(
+            "--format",
+            choices=importer.FORMATS,
+            help="The format of the file, detected from its name and content by default.",
+        )
+        parser.add_argument(
+            "--category",
+            help="The category of the rows that have none, created if it does not exist.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="The number of resources inserted in one statement.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Check the file and report what would be imported without writing.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], encoding="utf-8-sig") as file:
+                text = file.read()
+        except (OSError, UnicodeDecodeError) as error:
+            raise CommandError(f"Cannot read {options['path']}: {error}")
+
+        try:
+            report = importer.import_resources(
+                text,
+                format=options["format"],
+                filename=options["path"],
+                default_category=options["category"] or "",
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        for line, reason in report.rejected:
+            self.stderr.write(f"Line {line}: {reason}")
+        self.stdout.write(self.style.SUCCESS(report.summary))
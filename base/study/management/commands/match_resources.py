@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from study.matching import index_resources
+from study.models import Resources
+
+
+class Command(BaseCommand):
+    """
+    Indexes the terms of all study resources and matches them to all offer requirements from scratch.
+    Changes are matched incrementally afterwards, run it once after deploying the matching, or to repair it.
+    """
+
+    help = "Indexes all study resources and matches them to offer requirements."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="The number of resources indexed in one transaction.",
+        )
+
+    def handle(self, *args, **options):
+        resource_ids = list(
+            Resources.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        batch_size = options["batch_size"]
+        matches = 0
+        for start in range(0, len(resource_ids), batch_size):
+            matches += index_resources(resource_ids[start : start + batch_size])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {len(resource_ids)} resources with {matches} matches."
+            )
+        )
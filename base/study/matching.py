@@ -0,0 +1,225 @@
+"""
+Study resources recommended for the requirements of offers.
+
+Every resource is indexed as its distinct terms in ResourceTerm, weighted by the most prominent field they occur
+in: the name counts most, then the category, then the description. A requirement scores a resource by the
+weighted share of its own terms the resource contains, and the resources scoring at least STUDY_MATCH_MIN_SCORE
+are stored in RequirementResource. Both sides are matched incrementally: a changed resource is scored against
+all requirements, which are few and short, and a changed requirement only reads the postings of its own terms.
+Offer pages read the best matches of their requirements through the cache, so rendering them scores nothing.
+"""
+from dashboard import cvindex
+from dashboard.cvindex import normalize, tokenize
+from dashboard.models import Requirements
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Sum, Window
+from django.db.models.functions import RowNumber
+
+from .models import RequirementResource, Resources, ResourceTerm
+
+FIELD_WEIGHTS = (("name", 3), ("category", 2), ("description", 1))
+MAX_WEIGHT = 3
+
+
+def stem(term: str) -> str:
+    """
+    Folds plurals such as "apis" into their singular, the same on both sides, so the stem need not be a real word.
+    """
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def terms_of(text: str) -> set:
+    return {stem(term) for term in tokenize(normalize(text))}
+
+
+def requirement_terms(name: str) -> set:
+    return {stem(term) for term in cvindex.requirement_terms(name)}
+
+
+def resource_terms(resource: Resources) -> dict:
+    """
+    Returns the distinct terms of a resource with the weight of the most prominent field they occur in.
+    """
+    weights = {}
+    for field, weight in FIELD_WEIGHTS:
+        text = (
+            resource.category.name if field == "category" else getattr(resource, field)
+        )
+        for term in terms_of(text):
+            weights[term] = max(weight, weights.get(term, 0))
+    return weights
+
+
+def score(terms: set, weights: dict) -> float:
+    """
+    Returns the weighted share of the requirement terms among the weighted terms of a resource, from 0 to 1.
+    """
+    if not terms:
+        return 0.0
+    return sum(weights.get(term, 0) for term in terms) / (MAX_WEIGHT * len(terms))
+
+
+def _cache():
+    return caches[settings.STUDY_MATCH_CACHE]
+
+
+def _cache_key(requirement_id) -> str:
+    return f"study:requirement-resources:{requirement_id}"
+
+
+def invalidate(requirement_ids):
+    """
+    Drops the cached matches of requirements.
+    """
+    if requirement_ids:
+        _cache().delete_many([_cache_key(pk) for pk in requirement_ids])
+
+
+def index_resources(resource_ids) -> int:
+    """
+    Indexes the terms of resources and matches them against all requirements, replacing their previous matches.
+    Ids of deleted resources are skipped. Returns the number of matches stored.
+    """
+    resources = list(
+        Resources.objects.filter(pk__in=resource_ids).select_related("category")
+    )
+    requirements = [
+        (pk, requirement_terms(name))
+        for pk, name in Requirements.objects.values_list("pk", "name")
+    ]
+    postings = []
+    matches = []
+    for resource in resources:
+        weights = resource_terms(resource)
+        postings.extend(
+            ResourceTerm(resource=resource, term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+        for requirement_id, terms in requirements:
+            value = score(terms, weights)
+            if value >= settings.STUDY_MATCH_MIN_SCORE:
+                matches.append(
+                    RequirementResource(
+                        requirement_id=requirement_id, resource=resource, score=value
+                    )
+                )
+
+    with transaction.atomic():
+        changed = set(
+            RequirementResource.objects.filter(resource__in=resources).values_list(
+                "requirement_id", flat=True
+            )
+        )
+        changed.update(match.requirement_id for match in matches)
+        ResourceTerm.objects.filter(resource__in=resources).delete()
+        ResourceTerm.objects.bulk_create(postings, batch_size=1000)
+        RequirementResource.objects.filter(resource__in=resources).delete()
+        RequirementResource.objects.bulk_create(matches, batch_size=1000)
+        transaction.on_commit(lambda: invalidate(changed))
+    return len(matches)
+
+
+def match_requirements(requirement_ids) -> int:
+    """
+    Matches requirements against the term index of resources, replacing their previous matches.
+    Returns the number of matches stored.
+    """
+    matches = []
+    for requirement in Requirements.objects.filter(pk__in=requirement_ids):
+        terms = requirement_terms(requirement.name)
+        if not terms:
+            continue
+        most = MAX_WEIGHT * len(terms)
+        totals = (
+            ResourceTerm.objects.filter(term__in=terms)
+            .values("resource_id")
+            .annotate(total=Sum("weight"))
+            .filter(total__gte=settings.STUDY_MATCH_MIN_SCORE * most)
+            .order_by()
+        )
+        matches.extend(
+            RequirementResource(
+                requirement=requirement,
+                resource_id=row["resource_id"],
+                score=row["total"] / most,
+            )
+            for row in totals
+        )
+
+    with transaction.atomic():
+        RequirementResource.objects.filter(requirement__in=requirement_ids).delete()
+        RequirementResource.objects.bulk_create(matches, batch_size=1000)
+        transaction.on_commit(lambda: invalidate(requirement_ids))
+    return len(matches)
+
+
+def _load_matches(requirement_ids) -> dict:
+    """
+    Returns the best STUDY_RESOURCES_PER_REQUIREMENT matches of every requirement, skipping dead links.
+    """
+    rows = (
+        RequirementResource.objects.filter(requirement_id__in=requirement_ids)
+        .exclude(resource__link_status__is_dead=True)
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=F("requirement_id"),
+                order_by=(F("score").desc(), F("resource_id")),
+            )
+        )
+        .filter(rank__lte=settings.STUDY_RESOURCES_PER_REQUIREMENT)
+        .values(
+            "requirement_id",
+            "score",
+            "resource_id",
+            "resource__name",
+            "resource__description",
+            "resource__url",
+            "resource__category__name",
+        )
+    )
+    matches = {pk: [] for pk in requirement_ids}
+    for row in rows:
+        matches[row["requirement_id"]].append(
+            {
+                "id": row["resource_id"],
+                "name": row["resource__name"],
+                "description": row["resource__description"],
+                "url": row["resource__url"],
+                "category": row["resource__category__name"],
+                "score": row["score"],
+            }
+        )
+    return matches
+
+
+def recommended_resources(requirement_ids, limit=None) -> list:
+    """
+    Returns the best resources for a set of requirements as dicts of their name, description, url, category
+    and score, best first. A resource recommended for several requirements is ranked by its best score.
+    The matches of every requirement are cached until they change.
+    """
+    cache = _cache()
+    keys = {_cache_key(pk): pk for pk in requirement_ids}
+    cached = cache.get_many(keys)
+    missing = [pk for key, pk in keys.items() if key not in cached]
+    if missing:
+        loaded = {
+            _cache_key(pk): matches for pk, matches in _load_matches(missing).items()
+        }
+        cache.set_many(loaded, settings.STUDY_MATCH_CACHE_TIMEOUT)
+        cached.update(loaded)
+
+    best = {}
+    for matches in cached.values():
+        for match in matches:
+            if match["id"] not in best or match["score"] > best[match["id"]]["score"]:
+                best[match["id"]] = match
+    resources = sorted(
+        best.values(), key=lambda match: (-match["score"], match["name"])
+    )
+    return resources[:limit]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from .urlnorm import hash_url
+
 
 class Category(models.Model):
     """
@@ -28,6 +30,11 @@ class Resources(models.Model):
     name = models.CharField(max_length=50)
     description = models.CharField(max_length=200)
     url = models.URLField()
+    # The hash of the normalized URL, see study/urlnorm.py. Set on save, and by the bulk import, which first
+    # fills in the hashes of resources stored before the field existed.
+    url_hash = models.CharField(
+        max_length=64, db_index=True, default="", editable=False
+    )
     date_created = models.DateTimeField(auto_created=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
 
@@ -41,3 +48,113 @@ class Resources(models.Model):
         Return the name of the resource
         """
         return self.name
+
+    def save(self, *args, **kwargs):
+        """
+        Updates the hash of the URL before saving.
+        """
+        self.url_hash = hash_url(self.url)
+        if "update_fields" in kwargs and "url" in kwargs["update_fields"]:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "url_hash"}
+        super().save(*args, **kwargs)
+
+
+class ResourceLinkStatus(models.Model):
+    """
+    The last health check of a resource's URL and the preview read from its page, written by the periodic
+    link check (see study/linkcheck.py), so the study page never fetches anything while rendering.
+    Attributes:
+        - resource (Resources): The checked resource.
+        - status_code (int, optional): The HTTP status of the last check, empty when the request failed.
+        - final_url (str): The URL the last check ended at after redirects.
+        - error (str): Why the last check failed, empty on success.
+        - failures (int): The number of consecutive failed checks.
+        - is_dead (bool): Whether the link failed LINKCHECK_DEAD_AFTER checks in a row.
+        - og_title (str): The OpenGraph title of the page.
+        - og_image (str): The URL of the OpenGraph image of the page.
+        - preview (django.core.files.File, optional): A thumbnail of the OpenGraph image.
+        - date_checked (datetime.datetime): The date and time of the last check.
+    """
+
+    resource = models.OneToOneField(
+        Resources,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="link_status",
+    )
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    final_url = models.URLField(max_length=500, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    failures = models.PositiveIntegerField(default=0)
+    is_dead = models.BooleanField(default=False, db_index=True)
+    og_title = models.CharField(max_length=255, blank=True)
+    og_image = models.URLField(max_length=500, blank=True)
+    preview = models.ImageField(upload_to="previews", null=True, blank=True)
+    date_checked = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Resource link status"
+        verbose_name_plural = "Resource link statuses"
+
+    def __str__(self):
+        return f"{self.resource} {self.status_code or self.error}"
+
+
+class ResourceTerm(models.Model):
+    """
+    A posting of the term index of resources, one row for every distinct term of a resource (see study/matching.py).
+    Attributes:
+        - resource (Resources): The resource the term occurs in.
+        - term (str): A normalized term of the name, category or description of the resource.
+        - weight (int): How much the term counts, by the most prominent field it occurs in.
+    """
+
+    resource = models.ForeignKey(
+        Resources, on_delete=models.CASCADE, related_name="terms"
+    )
+    term = models.CharField(max_length=64, db_index=True)
+    weight = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["resource", "term"], name="unique_resource_term"
+            )
+        ]
+        verbose_name = "Resource term"
+        verbose_name_plural = "Resource terms"
+
+
+class RequirementResource(models.Model):
+    """
+    A resource recommended for an offer requirement, precomputed from the overlap of their terms.
+    Attributes:
+        - requirement (Requirements): The requirement of offers.
+        - resource (Resources): The recommended resource.
+        - score (float): The share of the requirement's terms the resource covers, weighted by field, from 0 to 1.
+    """
+
+    requirement = models.ForeignKey(
+        "dashboard.Requirements",
+        on_delete=models.CASCADE,
+        related_name="recommended_resources",
+    )
+    resource = models.ForeignKey(
+        Resources, on_delete=models.CASCADE, related_name="requirement_matches"
+    )
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["requirement", "resource"],
+                name="unique_requirement_resource",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["requirement", "-score"], name="requirement_resource_idx"
+            )
+        ]
+        verbose_name = "Requirement resource"
+        verbose_name_plural = "Requirement resources"
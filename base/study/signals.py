@@ -0,0 +1,60 @@
+from base.enqueue import enqueue
+from dashboard.models import Requirements
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import matching
+from .models import Category, RequirementResource, Resources
+from .tasks import (
+    index_category_resources_task,
+    index_resources_task,
+    match_requirements_task,
+)
+
+
+@receiver(post_save, sender=Resources)
+def queue_resource_indexing(sender, instance, raw=False, **kwargs):
+    """
+    Queues the indexing and matching of a saved resource once it is committed.
+    """
+    if not raw:
+        transaction.on_commit(lambda: enqueue(index_resources_task, [instance.pk]))
+
+
+@receiver(post_save, sender=Category)
+def queue_category_indexing(sender, instance, created, raw=False, **kwargs):
+    """
+    Queues the indexing of the resources of a renamed category, whose name is part of their terms.
+    """
+    if not created and not raw:
+        transaction.on_commit(
+            lambda: enqueue(index_category_resources_task, instance.pk)
+        )
+
+
+@receiver(pre_delete, sender=Resources)
+def invalidate_resource_matches(sender, instance, **kwargs):
+    """
+    Drops the cached matches of the requirements a deleted resource was recommended for.
+    """
+    requirement_ids = list(
+        RequirementResource.objects.filter(resource=instance).values_list(
+            "requirement_id", flat=True
+        )
+    )
+    transaction.on_commit(lambda: matching.invalidate(requirement_ids))
+
+
+@receiver(post_save, sender=Requirements)
+def queue_requirement_matching(sender, instance, raw=False, **kwargs):
+    """
+    Queues the matching of a saved requirement once it is committed.
+    """
+    if not raw:
+        transaction.on_commit(lambda: enqueue(match_requirements_task, [instance.pk]))
+
+
+@receiver(post_delete, sender=Requirements)
+def invalidate_requirement_matches(sender, instance, **kwargs):
+    transaction.on_commit(lambda: matching.invalidate([instance.pk]))
@@ -0,0 +1,43 @@
+from celery import shared_task
+
+from .linkcheck import check_resource_links
+from .matching import index_resources, match_requirements
+from .models import Resources
+
+
+@shared_task()
+def check_resource_links_task():
+    """
+    A periodic Celery task that checks the URLs of all study resources and refreshes their previews.
+    """
+    check_resource_links()
+
+
+@shared_task()
+def index_resources_task(resource_ids):
+    """
+    A Celery task that indexes the terms of new or changed resources and matches them to offer requirements.
+    """
+    index_resources(resource_ids)
+
+
+@shared_task()
+def index_category_resources_task(category_id):
+    """
+    A Celery task that indexes the resources of a renamed category again, in batches.
+    """
+    resource_ids = list(
+        Resources.objects.filter(category_id=category_id)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    for start in range(0, len(resource_ids), 500):
+        index_resources(resource_ids[start : start + 500])
+
+
+@shared_task()
+def match_requirements_task(requirement_ids):
+    """
+    A Celery task that matches new or renamed offer requirements to the indexed resources.
+    """
+    match_requirements(requirement_ids)
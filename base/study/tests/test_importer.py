@@ -0,0 +1,166 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from accounts.models import CustomUser
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from study.importer import import_resources
+from study.models import Category, Resources
+from study.urlnorm import hash_url, normalize_url
+
+BOOKMARKS = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+    <DT><H3 ADD_DATE="1650000000">Python</H3>
+    <DL><p>
+        <DT><A HREF="https://docs.python.org/3/" ADD_DATE="1650000000">Python docs</A>
+        <DD>The official documentation
+        <DT><H3>Testing</H3>
+        <DL><p>
+            <DT><A HREF="https://docs.pytest.org/">pytest</A>
+        </DL><p>
+    </DL><p>
+    <DT><A HREF="https://example.com/">Example</A>
+</DL><p>
+"""
+
+
+class ResourceImportTestCase(TestCase):
+    """
+    Test cases for the bulk import of study resources.
+    """
+
+    def setUp(self) -> None:
+        self.category = Category.objects.create(name="Django")
+        self.resource = Resources.objects.create(
+            name="Django docs",
+            description="Django docs",
+            url="https://docs.djangoproject.com/en/4.2/",
+            date_created=timezone.now(),
+            category=self.category,
+        )
+
+    def test_urls_are_normalized(self) -> None:
+        """
+        Test that spellings of the same URL normalize to one form.
+        """
+        self.assertEqual(
+            normalize_url("HTTPS://Docs.Python.org:443?b=2&utm_source=x&a=1#intro"),
+            "https://docs.python.org/?a=1&b=2",
+        )
+        with self.assertRaises(ValueError):
+            normalize_url("ftp://example.com/file")
+
+    def test_csv_import_skips_duplicates_and_reports_rejected_rows(self) -> None:
+        """
+        Test that stored and repeated URLs are skipped, categories are matched by name and invalid rows reported.
+        """
+        text = (
+            "url,name,description,category\n"
+            "https://DOCS.djangoproject.com/en/4.2/#models,Django,Again,django\n"
+            "https://realpython.com/?utm_source=feed,Real Python,Tutorials,Python\n"
+            "https://realpython.com/,Real Python,Same link,Python\n"
+            "not a url,Broken,,Python\n"
+            "https://peps.python.org/,PEPs,,\n"
+        )
+
+        report = import_resources(text, filename="links.csv")
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.duplicates, 2)
+        self.assertEqual(report.categories_created, ["Python"])
+        self.assertEqual([line for line, _ in report.rejected], [5, 6])
+        resource = Resources.objects.get(name="Real Python")
+        self.assertEqual(resource.url, "https://realpython.com/")
+        self.assertEqual(resource.category.name, "Python")
+
+    def test_resources_stored_without_a_hash_are_deduplicated(self) -> None:
+        """
+        Test that resources stored before url_hash existed are hashed before the import looks duplicates up.
+        """
+        Resources.objects.update(url_hash="")
+
+        report = import_resources(
+            "url,name,category\nhttps://docs.djangoproject.com/en/4.2/,Django,Django\n",
+            filename="links.csv",
+            dry_run=True,
+        )
+
+        self.assertEqual((report.created, report.duplicates), (0, 1))
+        self.resource.refresh_from_db()
+        self.assertEqual(self.resource.url_hash, hash_url(self.resource.url))
+
+    def test_bookmarks_import_uses_folders_as_categories(self) -> None:
+        """
+        Test that the links of a bookmarks file are imported into the categories of their folders.
+        """
+        report = import_resources(BOOKMARKS, default_category="Other")
+
+        self.assertEqual(report.created, 3)
+        self.assertEqual(
+            {
+                resource.url: (resource.name, resource.category.name)
+                for resource in Resources.objects.exclude(pk=self.resource.pk)
+            },
+            {
+                "https://docs.python.org/3/": ("Python docs", "Python"),
+                "https://docs.pytest.org/": ("pytest", "Testing"),
+                "https://example.com/": ("Example", "Other"),
+            },
+        )
+        python_docs = Resources.objects.get(name="Python docs")
+        self.assertEqual(python_docs.description, "The official documentation")
+        self.assertEqual(python_docs.date_created.year, 2022)
+
+    def test_command_imports_json_in_batches(self) -> None:
+        """
+        Test that the command imports a JSON file and that dry runs write nothing.
+        """
+        resources = [
+            {"url": f"https://example.com/{number}", "category": "Examples"}
+            for number in range(25)
+        ]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "resources.json")
+        with open(path, "w") as file:
+            json.dump({"resources": resources}, file)
+
+        call_command("import_resources", path, dry_run=True, stdout=StringIO())
+        self.assertFalse(Category.objects.filter(name="Examples").exists())
+
+        with self.assertNumQueries(10):
+            call_command("import_resources", path, batch_size=10, stdout=StringIO())
+        self.assertEqual(
+            Resources.objects.filter(category__name="Examples").count(), 25
+        )
+
+    def test_admin_upload(self) -> None:
+        """
+        Test that staff can import a file through the admin.
+        """
+        CustomUser.objects.create_superuser(
+            username="admin", email="admin@example.com", password="Test123@"
+        )
+        self.client.login(username="admin", password="Test123@")
+        upload = SimpleUploadedFile(
+            "links.csv", b"\xef\xbb\xbfurl,name\nhttps://www.python.org/,Python\n"
+        )
+
+        response = self.client.post(
+            reverse("admin:study_resources_import"),
+            {"file": upload, "category": "Python"},
+        )
+
+        self.assertRedirects(response, reverse("admin:study_resources_changelist"))
+        self.assertTrue(
+            Resources.objects.filter(url="https://www.python.org/").exists()
+        )
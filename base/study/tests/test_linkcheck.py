@@ -0,0 +1,172 @@
+import io
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from base.storage import ContentAddressedStorage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from study.linkcheck import check_resource_links
+from study.models import Category, ResourceLinkStatus, Resources
+
+
+def png(color="red") -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (640, 480), color).save(output, format="PNG")
+    return output.getvalue()
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """
+    A small site with a page carrying OpenGraph tags, a redirect to it, its image and a missing page.
+    """
+
+    image = png()
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        if self.path == "/article":
+            body = (
+                b"<html><head><title>Fallback</title>"
+                b'<meta property="og:title" content="Learn Django">'
+                b'<meta property="og:image" content="/cover.png">'
+                b"</head><body>Article</body></html>"
+            )
+            self.respond(200, "text/html; charset=utf-8", body)
+        elif self.path == "/old-article":
+            self.send_response(301)
+            self.send_header("Location", "/article")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path == "/cover.png":
+            self.respond(200, "image/png", self.image)
+        else:
+            self.respond(404, "text/html", b"Not found")
+
+    def respond(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(LINKCHECK_HOST_DELAY=0, LINKCHECK_DEAD_AFTER=2)
+class LinkCheckTestCase(TestCase):
+    """
+    Test cases for the link health checks and previews of study resources.
+    """
+
+    def setUp(self) -> None:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = f"http://127.0.0.1:{server.server_port}"
+        SiteHandler.requests = []
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        preview_field = ResourceLinkStatus._meta.get_field("preview")
+        original_storage = preview_field.storage
+        preview_field.storage = ContentAddressedStorage(location=directory.name)
+        self.addCleanup(setattr, preview_field, "storage", original_storage)
+
+        self.category = Category.objects.create(name="Django")
+
+    def create_resource(self, name, path) -> Resources:
+        return Resources.objects.create(
+            name=name,
+            description=name,
+            url=self.base_url + path,
+            date_created=timezone.now(),
+            category=self.category,
+        )
+
+    def test_pages_are_checked_and_previewed(self) -> None:
+        """
+        Test that a redirected page gets its final URL, title and a thumbnail of its image.
+        """
+        resource = self.create_resource("Article", "/old-article")
+
+        check_resource_links()
+
+        status = ResourceLinkStatus.objects.get(resource=resource)
+        self.assertEqual(status.status_code, 200)
+        self.assertEqual(status.final_url, self.base_url + "/article")
+        self.assertEqual(status.og_title, "Learn Django")
+        self.assertEqual(status.og_image, self.base_url + "/cover.png")
+        self.assertFalse(status.is_dead)
+        with status.preview.open() as file, Image.open(file) as image:
+            self.assertEqual(image.format, "JPEG")
+            self.assertLessEqual(image.width, 320)
+            self.assertLessEqual(image.height, 180)
+
+    def test_unchanged_image_is_not_fetched_again(self) -> None:
+        """
+        Test that the image is only fetched for the first check while the page keeps pointing to it.
+        """
+        self.create_resource("Article", "/article")
+
+        check_resource_links()
+        check_resource_links()
+
+        self.assertEqual(SiteHandler.requests.count("/cover.png"), 1)
+        self.assertEqual(SiteHandler.requests.count("/article"), 2)
+
+    def test_replaced_previews_are_deleted(self) -> None:
+        """
+        Test that the file of a replaced thumbnail is deleted, unless another resource shares it.
+        """
+        first = self.create_resource("Article", "/article")
+        self.create_resource("Same article", "/article")
+        with self.captureOnCommitCallbacks(execute=True):
+            check_resource_links()
+        status = ResourceLinkStatus.objects.get(resource=first)
+        storage = status.preview.storage
+        old_name = status.preview.name
+
+        # The image changes for the first resource only, the second one keeps sharing the old file.
+        ResourceLinkStatus.objects.filter(pk=status.pk).update(og_image="")
+        SiteHandler.image = png("blue")
+        self.addCleanup(setattr, SiteHandler, "image", png())
+        with self.captureOnCommitCallbacks(execute=True):
+            check_resource_links()
+
+        status.refresh_from_db()
+        self.assertNotEqual(status.preview.name, old_name)
+        self.assertTrue(storage.exists(old_name))
+
+        ResourceLinkStatus.objects.exclude(pk=status.pk).update(og_image="")
+        with self.captureOnCommitCallbacks(execute=True):
+            check_resource_links()
+
+        self.assertFalse(storage.exists(old_name))
+        self.assertTrue(storage.exists(status.preview.name))
+
+    def test_links_are_dead_after_repeated_failures(self) -> None:
+        """
+        Test that a link is only dead after LINKCHECK_DEAD_AFTER failed checks and is hidden on request.
+        """
+        self.create_resource("Alive", "/article")
+        missing = self.create_resource("Missing", "/missing")
+
+        self.assertEqual(check_resource_links(), 0)
+        status = ResourceLinkStatus.objects.get(resource=missing)
+        self.assertEqual((status.status_code, status.failures), (404, 1))
+
+        self.assertEqual(check_resource_links(), 1)
+
+        response = self.client.get(reverse("study:study_list"))
+        self.assertContains(response, "Dead link")
+        response = self.client.get(reverse("study:study_list"), {"hide_dead": "on"})
+        self.assertEqual(
+            [resource.name for resource in response.context["object_list"]], ["Alive"]
+        )
@@ -0,0 +1,115 @@
+from accounts.models import CustomUser
+from dashboard.models import Country, Level, Localization, Offer, Position, Requirements
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from study.matching import index_resources, match_requirements, recommended_resources
+from study.models import Category, RequirementResource, Resources
+
+
+class ResourceMatchingTestCase(TestCase):
+    """
+    Test cases for the study resources recommended for offer requirements.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.python = Requirements.objects.create(name="Python")
+        self.rest = Requirements.objects.create(name="Knowledge of REST API")
+        category = Category.objects.create(name="Backend")
+        self.tutorial = self.create_resource(
+            "Python tutorial", "Learn the basics", category
+        )
+        self.apis = self.create_resource(
+            "Designing APIs", "REST API design with Python", category
+        )
+        self.other = self.create_resource("Kubernetes", "Containers at scale", category)
+
+    def create_resource(self, name, description, category) -> Resources:
+        return Resources.objects.create(
+            name=name,
+            description=description,
+            url=f"https://example.com/{name.lower().replace(' ', '-')}",
+            date_created=timezone.now(),
+            category=category,
+        )
+
+    def test_resources_are_scored_by_term_overlap(self) -> None:
+        """
+        Test that resources are matched to requirements by their terms, names weighing most.
+        """
+        index_resources([self.tutorial.pk, self.apis.pk, self.other.pk])
+
+        scores = {
+            (match.requirement_id, match.resource_id): match.score
+            for match in RequirementResource.objects.all()
+        }
+        self.assertEqual(scores[(self.python.pk, self.tutorial.pk)], 1.0)
+        self.assertAlmostEqual(scores[(self.python.pk, self.apis.pk)], 1 / 3)
+        # "knowledge" and "of" are stop words, "api" is in the name and "rest" in the description.
+        self.assertAlmostEqual(scores[(self.rest.pk, self.apis.pk)], 4 / 6)
+        self.assertNotIn(self.other.pk, {resource_id for _, resource_id in scores})
+
+    def test_new_requirements_are_matched_from_the_index(self) -> None:
+        """
+        Test that a requirement created after the resources is matched from the term index.
+        """
+        index_resources([self.tutorial.pk, self.apis.pk, self.other.pk])
+        kubernetes = Requirements.objects.create(name="Kubernetes")
+
+        match_requirements([kubernetes.pk])
+
+        self.assertEqual(
+            list(
+                RequirementResource.objects.filter(requirement=kubernetes).values_list(
+                    "resource_id", "score"
+                )
+            ),
+            [(self.other.pk, 1.0)],
+        )
+
+    def test_offer_page_reads_recommendations_from_the_cache(self) -> None:
+        """
+        Test that the offer page shows the best resources of its requirements, cached until they change.
+        """
+        index_resources([self.tutorial.pk, self.apis.pk, self.other.pk])
+        offer = Offer.objects.create(
+            name="Python Developer",
+            position=Position.objects.create(position_name="Python"),
+            level=Level.objects.create(level_name="Junior"),
+            description="Python Developer",
+            localization=Localization.objects.create(
+                country=Country.objects.create(name="Poland"), city="Warsaw"
+            ),
+            company=CustomUser.objects.create(username="company", role="company"),
+            address="Zielona 4",
+        )
+        offer.requirements.add(self.python, self.rest)
+
+        response = self.client.get(reverse("offers:offer-detail", args=[offer.pk]))
+        self.assertEqual(
+            [resource["name"] for resource in response.context["study_resources"]],
+            ["Python tutorial", "Designing APIs"],
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("offers:offer-detail", args=[offer.pk]))
+        self.assertFalse(
+            any("study_requirementresource" in query["sql"] for query in queries)
+        )
+
+        self.tutorial.name = "Go tutorial"
+        self.tutorial.description = "Learn Go"
+        self.tutorial.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            index_resources([self.tutorial.pk])
+
+        self.assertEqual(
+            [resource["name"] for resource in recommended_resources([self.python.pk])],
+            ["Designing APIs"],
+        )
@@ -0,0 +1,49 @@
+"""
+Normalization of resource URLs, so the same link written differently is stored once.
+
+Scheme and host are lowercased, default ports, fragments and tracking parameters such as utm_source are
+dropped and the remaining query parameters are sorted. The SHA-256 of the normalized URL is indexed as
+Resources.url_hash, so checking tens of thousands of links for duplicates is a series of index lookups.
+"""
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMETERS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref_src"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Returns the normalized form of an http(s) URL. Raises ValueError if it is not one.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        raise ValueError(f"Not an http(s) URL: {url!r}")
+    host = parts.hostname.lower()
+    if ":" in host:
+        host = f"[{host}]"
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+    if parts.username or parts.password:
+        credentials = parts.username or ""
+        if parts.password:
+            credentials += f":{parts.password}"
+        host = f"{credentials}@{host}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMETERS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def hash_url(url: str) -> str:
+    """
+    Returns the hex SHA-256 of the normalized URL, or of the URL as given if it cannot be normalized.
+    """
+    try:
+        url = normalize_url(url)
+    except ValueError:
+        pass
+    return hashlib.sha256(url.encode()).hexdigest()
@@ -3,7 +3,7 @@ from typing import Any, Dict
 from django.db.models import QuerySet
 from django.views.generic import ListView
 
-from .forms import DateSortingForm, ChooseCategoriesForm
+from .forms import ChooseCategoriesForm, DateSortingForm, LinkStatusForm
 from .models import Resources
 
 
@@ -29,7 +29,8 @@ class StudyHomePageListView(ListView):
         Returns:
             django.db.models.QuerySet: The queryset to use for the view.
         """
-        queryset = super().get_queryset()
+        # The link status of every resource is shown on its card.
+        queryset = super().get_queryset().select_related("link_status")
 
         order_by = self.request.GET.get("order_by")
         if order_by:
@@ -42,6 +43,9 @@ class StudyHomePageListView(ListView):
         if categories:
             queryset = queryset.filter(category__in=categories)
 
+        if self.request.GET.get("hide_dead"):
+            queryset = queryset.exclude(link_status__is_dead=True)
+
         return queryset
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
@@ -55,5 +59,6 @@ class StudyHomePageListView(ListView):
         context = super().get_context_data(**kwargs)
         context["date_sorting_form"] = DateSortingForm(self.request.GET)
         context["filter_by_categories"] = ChooseCategoriesForm(self.request.GET)
+        context["link_status_form"] = LinkStatusForm(self.request.GET)
 
         return context